@@ -0,0 +1,319 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+
+"""
+The Benchmark Suite
+
+Role: Measures how fast the hot path is: engine reset / step / observe, search nodes (restore + observation-free
+      step), the single-player wrapper, the batched engine at several board sizes and env counts,
+      and PPO rollout collection.
+      Also the cold-start import time of the framework-free modules, checked against a budget.
+      PettingZoo / SB3 / torch are imported by the benchmarks that use them, so `--only import` runs without them.
+
+Goal: steps/sec + latency percentiles as JSON, compared against a stored baseline so a slowdown
+      shows up here before it shows up in a training run.
+
+Usage:
+    python benchmark.py --output benchmarks/baseline.json        # record a baseline
+    python benchmark.py --baseline benchmarks/baseline.json      # compare (exit code 1 on regression)
+    python benchmark.py --only import --import-budget-ms 300      # cold-start check only
+"""
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+# modules that workers, replays and the game server import: NumPy only, no ML frameworks
+LIGHT_MODULES = ["tron_core", "tron_maps", "tron_bots", "tron_territory", "tron_replay", "tron_server"]
+FRAMEWORKS = ["pettingzoo", "gymnasium", "stable_baselines3", "torch"]
+IMPORT_BUDGET_MS = 500
+
+# run in a fresh interpreter: prints the import time (ns) and the frameworks it pulled in
+IMPORT_PROBE = """
+import sys, time
+start = time.perf_counter_ns()
+import {module}
+elapsed = time.perf_counter_ns() - start
+print(elapsed, *[name for name in {frameworks!r} if name in sys.modules])
+"""
+
+
+def _summary(latencies_ns, items_per_call=1):
+    latencies_us = np.asarray(latencies_ns, dtype=np.float64) / 1000.0
+    total_s = latencies_us.sum() / 1e6
+    return {
+        "calls": len(latencies_us),
+        "steps_per_sec": len(latencies_us) * items_per_call / total_s if total_s > 0 else float("inf"),
+        "p50_us": float(np.percentile(latencies_us, 50)),
+        "p90_us": float(np.percentile(latencies_us, 90)),
+        "p99_us": float(np.percentile(latencies_us, 99)),
+    }
+
+
+def _timed(fn, calls, items_per_call=1, between=None):
+    # `between` runs outside the timed region (e.g. resetting a finished game)
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter_ns()
+        fn()
+        latencies.append(time.perf_counter_ns() - start)
+        if between is not None:
+            between()
+    return _summary(latencies, items_per_call)
+
+
+def _random_env_actions(env, rng):
+    return {agent: rng.integers(env.action_space(agent).nvec) for agent in env.agents}
+
+
+# --- BENCHMARKS ---
+
+def bench_env_reset(calls, rng):
+    from tron_env import TronEnv
+    env = TronEnv()
+    return _timed(env.reset, calls)
+
+
+def bench_env_step(calls, rng):
+    from tron_env import TronEnv
+    env = TronEnv()
+    env.reset(seed=0)
+    state = {}
+
+    def step():
+        _, _, terms, _, _ = env.step(state["actions"])
+        state["done"] = any(terms.values()) or not env.agents
+
+    def prepare():
+        if state.get("done", False):
+            env.reset()
+            state["done"] = False
+        state["actions"] = _random_env_actions(env, rng)
+
+    prepare()
+    return _timed(step, calls, between=prepare)
+
+
+def bench_env_observe(calls, rng):
+    from tron_env import TronEnv
+    env = TronEnv()
+    env.reset(seed=0)
+    out = np.zeros(env.observation_space("player_1").shape, dtype=np.uint8)
+    return _timed(lambda: env.observe("player_1", out=out), calls)
+
+
+def bench_env_search(calls, rng):
+    # one search node: restore a snapshot, then one observation-free step with any action (boosts included)
+    from tron_env import TronEnv
+    env = TronEnv()
+    env.reset(seed=0)
+    state = env.snapshot()
+    actions = {}
+
+    def node():
+        env.restore(state)
+        env.step(actions, observe=False)
+
+    def prepare():
+        actions.update(_random_env_actions(env, rng))
+
+    prepare()
+    return _timed(node, calls, between=prepare)
+
+
+def bench_wrapper_step(calls, rng):
+    from tron_wrappers import TronSinglePlayerWrapper
+    env = TronSinglePlayerWrapper()
+    env.reset(seed=0)
+    state = {"done": False}
+
+    def step():
+        _, _, terminated, truncated, _ = env.step(state["action"])
+        state["done"] = terminated or truncated
+
+    def prepare():
+        if state["done"]:
+            env.reset()
+            state["done"] = False
+        state["action"] = rng.integers(env.action_space.nvec)
+
+    prepare()
+    return _timed(step, calls, between=prepare)
+
+
+def bench_import(calls, rng, module):
+    # cold start: every call is a new interpreter, only the import statement itself is timed
+    latencies, loaded = [], set()
+    for _ in range(calls):
+        out = subprocess.run([sys.executable, "-c", IMPORT_PROBE.format(module=module, frameworks=FRAMEWORKS)],
+                             cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True)
+        fields = out.stdout.split()
+        latencies.append(int(fields[0]))
+        loaded.update(fields[1:])
+    result = _summary(latencies)
+    result["frameworks"] = sorted(loaded)
+    return result
+
+
+def bench_batch_step(calls, rng, num_envs, size):
+    from tron_batch_env import TronBatchEnv
+    env = TronBatchEnv(num_envs, width=size, height=size, seed=0)
+    env.reset()
+    state = {}
+
+    def prepare():
+        state["actions"] = rng.integers(env.action_space.nvec, size=(num_envs, 3))
+
+    prepare()
+    return _timed(lambda: env.step(state["actions"]), calls, items_per_call=num_envs, between=prepare)
+
+
+def bench_ppo_rollout(calls, rng, num_envs):
+    # end-to-end: policy forward + env stepping + rollout buffer writes; the gradient updates in between are not timed
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.callbacks import BaseCallback
+    from tron_batch_env import TronBatchEnv
+
+    class RolloutTimer(BaseCallback):
+        # learn() calls these around every rollout collection
+        def __init__(self):
+            super().__init__()
+            self.start, self.latencies = 0, []
+
+        def _on_rollout_start(self):
+            self.start = time.perf_counter_ns()
+
+        def _on_rollout_end(self):
+            self.latencies.append(time.perf_counter_ns() - self.start)
+
+        def _on_step(self):
+            return True
+
+    env = TronBatchEnv(num_envs, seed=0)
+    n_steps = max(256 // num_envs, 1)
+    model = PPO("CnnPolicy", env, n_steps=n_steps, batch_size=n_steps * num_envs, n_epochs=1, device="cpu", verbose=0)
+    timer = RolloutTimer()
+    model.learn(calls * n_steps * num_envs, callback=timer)
+    env.close()
+    return _summary(timer.latencies, n_steps * num_envs)
+
+
+def build_suite(quick, env_counts, sizes):
+    scale = 0.1 if quick else 1.0
+    n = lambda calls: max(int(calls * scale), 5)
+    suite = {
+        "env.reset": lambda rng: bench_env_reset(n(500), rng),
+        "env.step": lambda rng: bench_env_step(n(5000), rng),
+        "env.observe": lambda rng: bench_env_observe(n(5000), rng),
+        "env.search": lambda rng: bench_env_search(n(20000), rng),
+        "wrapper.step": lambda rng: bench_wrapper_step(n(5000), rng),
+    }
+    for module in LIGHT_MODULES:
+        suite[f"import.{module}"] = lambda rng, module=module: bench_import(n(20), rng, module)
+    for size in sizes:
+        for num_envs in env_counts:
+            suite[f"batch.step[n={num_envs},size={size}]"] = (
+                lambda rng, num_envs=num_envs, size=size: bench_batch_step(n(max(20000 // num_envs, 20)), rng, num_envs, size))
+    for num_envs in env_counts:
+        suite[f"ppo.rollout[n={num_envs}]"] = lambda rng, num_envs=num_envs: bench_ppo_rollout(n(20), rng, num_envs)
+    return suite
+
+
+def check_imports(results, budget_ms):
+    # a light module fails when its median cold import exceeds the budget or it loads an ML framework
+    failures = []
+    for name, result in results.items():
+        if not name.startswith("import."):
+            continue
+        ms = result["p50_us"] / 1000
+        status = "ok"
+        if result["frameworks"]:
+            status = f"LOADS {', '.join(result['frameworks'])}"
+        elif ms > budget_ms:
+            status = "OVER BUDGET"
+        print(f"  {name:<34} {ms:8.1f} ms  {status}")
+        if status != "ok":
+            failures.append(name)
+    return failures
+
+
+def compare(results, baseline, tolerance):
+    # a benchmark regresses when its throughput drops more than `tolerance` below the baseline
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        ratio = result["steps_per_sec"] / base["steps_per_sec"]
+        status = "REGRESSION" if ratio < 1.0 - tolerance else "ok"
+        print(f"  {name:<34} {ratio:6.2f}x baseline  {status}")
+        if status != "ok":
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Tron engine, wrappers and PPO rollouts.")
+    parser.add_argument("--output", default=None, help="Write results as JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE if os.path.exists(DEFAULT_BASELINE) else None,
+                        help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed throughput drop before failing")
+    parser.add_argument("--only", nargs="*", default=None, help="Run only benchmarks whose name contains one of these")
+    parser.add_argument("--env-counts", type=int, nargs="*", default=[1, 16, 64, 256])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[50, 100, 200], help="Board sizes for the batched engine")
+    parser.add_argument("--quick", action="store_true", help="10x fewer calls, for smoke tests")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS,
+                        help="Median cold-start import time allowed for each framework-free module")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    suite = build_suite(args.quick, args.env_counts, args.sizes)
+    if args.only:
+        suite = {name: fn for name, fn in suite.items() if any(key in name for key in args.only)}
+
+    results = {}
+    for name, fn in suite.items():
+        results[name] = fn(np.random.default_rng(args.seed))
+        r = results[name]
+        print(f"{name:<36} {r['steps_per_sec']:>12.0f} steps/s   p50 {r['p50_us']:>9.1f} us   "
+              f"p90 {r['p90_us']:>9.1f} us   p99 {r['p99_us']:>9.1f} us")
+
+    failed = False
+    if any(name.startswith("import.") for name in results):
+        print(f"Import budget ({args.import_budget_ms:.0f} ms, no ML frameworks):")
+        failures = check_imports(results, args.import_budget_ms)
+        if failures:
+            print(f"{len(failures)} module(s) over the import budget.")
+            failed = True
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Comparing against {args.baseline} (tolerance {args.tolerance:.0%}):")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed.")
+            failed = True
+    if failed:
+        sys.exit(1)
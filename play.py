@@ -1,21 +1,40 @@
+import argparse
+import numpy as np
 import pygame
 import random
 import sys # Added for safe exit
 from tron_env import TronEnv 
+from tron_bots import BOTS, get_bot, env_action
+from tron_dataset import TrajectoryRecorder
 
 # --- CONSTANTS ---
 FPS = 60
 MOVE_DELAY = 0.05
 ACT_UP, ACT_DOWN, ACT_LEFT, ACT_RIGHT = 0, 1, 2, 3
 
+parser = argparse.ArgumentParser(description="Play Tron against a scripted bot.")
+parser.add_argument("--opponent", choices=list(BOTS), default="random", help="Bot controlling player 2")
+parser.add_argument("--policy", default=None,
+                    help="Exported agent (.pt from tron_export.py) controlling player 2 instead of --opponent")
+parser.add_argument("--dataset", default=None,
+                    help="Append your moves (observation, action, reward, done) to this dataset directory")
+args = parser.parse_args()
+bot = get_bot(args.opponent)
+bot_rng = np.random.default_rng()
+runtime = None
+if args.policy:
+    from tron_export import PolicyRuntime
+    runtime = PolicyRuntime(args.policy)
+
 # 1. INIT PYGAME IMMEDIATELY
 # We do this here to ensure the event system is ready before the loop starts
 pygame.init()
 pygame.display.set_caption("Tron RL Environment")
 
 # 2. Setup Environment
-env = TronEnv()
+env = TronEnv(**(runtime.env_kwargs() if runtime is not None else {}))
 obs, infos = env.reset()
+recorder = TrajectoryRecorder(args.dataset, env) if args.dataset else None
 
 # 3. FORCE RENDERER CREATION
 # We call render once to open the window immediately.
@@ -56,14 +75,26 @@ while running:
     if time_since_last_move >= MOVE_DELAY:
         
         p1_action = [next_move, next_trail, next_boost]
-        p2_space = env.action_space("player_2")
-        p2_action = p2_space.sample()  # changed: properly sample from MultiDiscrete
+        if runtime is not None:
+            # the agent sees the board from player 2's side, as it saw player 1's in training
+            p2_action = runtime.act(env.observe("player_2"))
+        elif args.opponent == "random":
+            p2_space = env.action_space("player_2")
+            p2_action = p2_space.sample()  # changed: properly sample from MultiDiscrete
+        else:
+            p2_action = env_action(bot, env, "player_2", bot_rng)
         
         actions = { "player_1": p1_action, "player_2": p2_action }
         next_boost = 0 
         
         if env.agents:
+            recording = recorder is not None and "player_1" in obs
+            if recording:
+                recorder.add_obs(obs["player_1"])
             obs, rewards, terms, truncs, infos = env.step(actions)
+            if recording:
+                recorder.add_step(p1_action, rewards.get("player_1", 0.0),
+                                  terms.get("player_1", True) or truncs.get("player_1", False))
             print(f"P1: move={next_move}, boost={p1_action[2]}, trail={next_trail} | Rewards: {rewards}")
             
             # Check Game Over
@@ -77,6 +108,9 @@ while running:
     env.render()
 
 # Clean Exit
+if recorder is not None:
+    recorder.close()
+    print(f"Saved {recorder.shards_written} shard(s) to {args.dataset}")
 env.close()
 pygame.quit()
 sys.exit()
\ No newline at end of file
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import numpy as np
+
+# the modules live at the repo root, next to train.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tron_core import ACT_UP, HEAD_VALS, NO_HEADING, VAL_EMPTY  # noqa: E402
+
+
+def place(game, i, x, y, heading):
+    """Moves player i + 1's head to (x, y), facing `heading`, through snapshot() / restore()."""
+    state = game.snapshot()
+    old_x, old_y = state.positions[i]
+    state.grid[old_x, old_y] = VAL_EMPTY
+    state.grid[x, y] = HEAD_VALS[i]
+    state.positions[i] = x, y
+    state.dirs[i] = heading
+    game.restore(state)
+
+
+def actions(game, **overrides):
+    """Straight ahead, no trail, no boost for everybody, except the given {agent: [move, trail, boost]}."""
+    headings = {agent: int(game.dirs[game.agent_ids[agent]]) for agent in game.agents}
+    acts = {agent: np.array([ACT_UP if d == NO_HEADING else d, 0, 0]) for agent, d in headings.items()}
+    acts.update({agent: np.array(action) for agent, action in overrides.items()})
+    return acts
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("stable_baselines3")
+
+from tron_batch_env import TronBatchEnv  # noqa: E402
+from tron_core import ACT_LEFT, ACT_UP, HEAD_VALS, VAL_WALL  # noqa: E402
+
+W, H = 30, 24
+P1_AHEAD = (int(W * 0.3) - 1, H // 2)   # the cell player 1 moves into when it keeps going left
+P2_AHEAD = (int(W * 0.7), H // 2 - 1)   # the cell player 2 moves into when it goes up
+
+
+@pytest.mark.parametrize("cell, value, outcome", [
+    (P2_AHEAD, VAL_WALL, 1),       # player 2 crashes: player 1 won
+    (P1_AHEAD, VAL_WALL, 2),       # player 1 crashes: player 2 won
+    (P1_AHEAD, HEAD_VALS[1], 3),   # player 1 hits a player 2 head: nobody died, a draw
+])
+def test_last_outcomes_follow_the_deaths(cell, value, outcome):
+    env = TronBatchEnv(1, width=W, height=H, opponent=lambda env: np.array([[ACT_UP, 1, 0]]), seed=0)
+    env.reset()
+    env.grid[0][cell] = value
+    _, _, dones, infos = env.step(np.array([[ACT_LEFT, 1, 0]]))
+    assert dones[0]
+    assert env.last_outcomes[0] == outcome
+    assert "terminal_observation" in infos[0]
+
+
+def test_terminal_observation_survives_the_reset():
+    env = TronBatchEnv(1, width=W, height=H, opponent=lambda env: np.array([[ACT_UP, 1, 0]]), seed=0)
+    env.reset()
+    env.grid[0][P2_AHEAD] = VAL_WALL  # player 2 crashes, player 1 is still on the board
+    obs, _, dones, infos = env.step(np.array([[ACT_LEFT, 1, 0]]))
+    terminal = infos[0]["terminal_observation"]
+    frozen = terminal.copy()
+    assert dones[0] and terminal.any()
+    env.step(np.array([[ACT_LEFT, 1, 0]]))
+    np.testing.assert_array_equal(terminal, frozen)
+    assert not np.shares_memory(obs, env._observe())
+
+
+def test_patched_observations_match_a_full_rebuild():
+    # random play on a small board: lots of crashes, boosts off the board and resets
+    env = TronBatchEnv(8, width=W, height=H, seed=0)
+    env.reset()
+    opponent_view = env.opponent_obs()
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        obs, _, _, _ = env.step(rng.integers(env.action_space.nvec, size=(env.num_envs, 3)))
+        for agent, view in enumerate((obs, opponent_view)):
+            expected = env._obs_luts[agent][env.grid]
+            expected[..., 4] = (255 * (env.boosts[:, agent] / 10)).astype(np.uint8)[:, None, None]
+            np.testing.assert_array_equal(view, expected)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from conftest import actions, place
+from tron_core import ACTION_NVEC, ACT_DOWN, ACT_LEFT, ACT_RIGHT, ACT_UP, BOOST_YES, TRAIL_OFF, VAL_EMPTY, TronGame
+
+W, H = 30, 24
+
+# (x, y) three cells from an edge, heading off the board: a boost lands one cell past the edge
+EDGES = {
+    "left": (2, 10, ACT_LEFT),
+    "right": (W - 3, 10, ACT_RIGHT),
+    "top": (10, 2, ACT_UP),
+    "bottom": (10, H - 3, ACT_DOWN),
+}
+
+
+def new_game(**kwargs):
+    game = TronGame(width=W, height=H, n_walls=0, n_boosts=0, **kwargs)
+    game.reset(seed=0)
+    return game
+
+
+def expected_obs(game, agent):
+    # observation built from scratch from the grid, what the incremental buffers must match
+    fresh = TronGame(width=W, height=H, n_walls=0, n_boosts=0, obs_mode=game.obs_mode)
+    fresh.reset(seed=0)
+    fresh.restore(game.snapshot())
+    fresh._rebuild({})
+    return fresh.observe(agent)
+
+
+@pytest.mark.parametrize("edge", list(EDGES))
+def test_boost_off_the_board_is_a_wall_death(edge):
+    x, y, heading = EDGES[edge]
+    game = new_game()
+    place(game, 0, x, y, heading)
+    game.step(actions(game))  # bring the observation buffers up to date after the restore
+    x, y = game.positions[0]
+    before = game.grid.copy()
+
+    _, rewards, terminations, _, _ = game.step(actions(game, player_1=[heading, TRAIL_OFF, BOOST_YES]),
+                                               agent_order=["player_1"])
+
+    assert terminations["player_1"]
+    assert rewards["player_1"] == -10
+    assert "player_1" not in game.agents
+    # the cell left behind is the only change: nothing was written on the opposite edge
+    before[x, y] = VAL_EMPTY
+    np.testing.assert_array_equal(game.grid, before)
+    np.testing.assert_array_equal(game.observe("player_2"), expected_obs(game, "player_2"))
+
+
+@pytest.mark.parametrize("edge", list(EDGES))
+def test_boost_off_the_board_without_observations(edge):
+    x, y, heading = EDGES[edge]
+    game = new_game()
+    place(game, 0, x, y, heading)
+    state = game.snapshot()
+    for _ in range(3):
+        game.restore(state)
+        _, rewards, terminations, _, _ = game.step(actions(game, player_1=[heading, TRAIL_OFF, BOOST_YES]),
+                                                   agent_order=["player_1"], observe=False)
+        assert terminations["player_1"] and rewards["player_1"] == -10
+        expected = state.grid.copy()
+        expected[x, y] = VAL_EMPTY
+        np.testing.assert_array_equal(game.grid, expected)
+    game.restore(state)
+    np.testing.assert_array_equal(game.grid, state.grid)
+
+
+def test_search_from_a_snapshot_is_total_and_deterministic():
+    # restore + observation-free step over random actions (boosts included), as a tree search does
+    game = TronGame(width=W, height=H)
+    game.reset(seed=1)
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        state = game.snapshot()
+        for _ in range(10):
+            game.restore(state)
+            acts = {agent: rng.integers(ACTION_NVEC) for agent in game.agents}
+            result = game.step(acts, observe=False)
+            grid = game.grid.copy()
+            game.restore(state)
+            assert game.step(acts, observe=False)[1:3] == result[1:3]
+            np.testing.assert_array_equal(game.grid, grid)
+        game.restore(state)
+        observations, *_ = game.step({agent: rng.integers(ACTION_NVEC) for agent in game.agents})
+        for agent in observations:
+            np.testing.assert_array_equal(observations[agent], expected_obs(game, agent))
+        if len(game.agents) < 2:
+            game.reset()
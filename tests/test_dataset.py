@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from tron_core import TronGame
+from tron_dataset import TrajectoryDataset, TrajectoryRecorder
+
+N_ROWS, SHARD_SIZE, BATCH_SIZE = 61, 7, 8   # 9 shards: several shuffle windows, ragged ends everywhere
+
+
+@pytest.fixture(scope="module")
+def dataset_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("dataset"))
+    game = TronGame(width=30, height=24)
+    game.reset(seed=0)
+    rng = np.random.default_rng(0)
+    with TrajectoryRecorder(path, game, shard_size=SHARD_SIZE) as recorder:
+        for row in range(N_ROWS):
+            if len(game.agents) < 2:
+                game.reset()
+            recorder.add_obs(game.observe("player_1"))
+            actions = {agent: rng.integers([4, 2, 2]) for agent in game.agents}
+            game.step(actions)
+            recorder.add_step(actions["player_1"], float(row), False)  # the reward tells the rows apart
+    return path
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+@pytest.mark.parametrize("drop_last", [False, True])
+def test_batches_cover_every_row_once(dataset_path, shuffle, drop_last):
+    dataset = TrajectoryDataset(dataset_path)
+    batches = list(dataset.iter_batches(BATCH_SIZE, shuffle=shuffle, seed=0, drop_last=drop_last))
+    sizes = [len(batch["rewards"]) for batch in batches]
+    rows = np.concatenate([batch["rewards"] for batch in batches]).astype(int)
+    if drop_last:
+        assert sizes == [BATCH_SIZE] * (N_ROWS // BATCH_SIZE)
+        assert len(set(rows.tolist())) == len(rows)
+    else:
+        assert sizes == [BATCH_SIZE] * (N_ROWS // BATCH_SIZE) + [N_ROWS % BATCH_SIZE]
+        assert sorted(rows.tolist()) == list(range(N_ROWS))
+
+
+@pytest.mark.parametrize("drop_last", [False, True])
+def test_loader_length_counts_batches(dataset_path, drop_last):
+    torch = pytest.importorskip("torch")
+    from tron_dataset import TrajectoryIterable
+    loader = torch.utils.data.DataLoader(TrajectoryIterable(dataset_path, batch_size=BATCH_SIZE, drop_last=drop_last),
+                                         batch_size=None)
+    assert len(loader) == len(list(loader)) == (N_ROWS // BATCH_SIZE if drop_last else -(-N_ROWS // BATCH_SIZE))
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("stable_baselines3")
+
+from stable_baselines3 import PPO  # noqa: E402
+
+from tron_batch_env import TronBatchEnv  # noqa: E402
+from tron_eval import PolicyPlayer, play_match  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def checkpoint(tmp_path_factory):
+    # an untrained grid CnnPolicy, saved the way train.py saves it (SB3 transposes the image space)
+    model = PPO("CnnPolicy", TronBatchEnv(2, seed=0), n_steps=8, batch_size=16, device="cpu", seed=0)
+    path = tmp_path_factory.mktemp("models") / "tron_test.zip"
+    model.save(path)
+    return str(path)
+
+
+def test_policy_player_acts_on_grid_observations(checkpoint):
+    player = PolicyPlayer(checkpoint)
+    assert player.obs_shape == (100, 100, 7)
+    env = TronBatchEnv(3, opponent=lambda env: player(env, 1), seed=1)
+    obs = env.reset()
+    actions = player(env, 0, obs)
+    assert actions.shape == (3, 3)
+    assert (actions >= 0).all() and (actions < env.action_space.nvec).all()
+    env.step(actions)
+
+
+def test_policy_player_rejects_other_board_sizes(checkpoint):
+    player = PolicyPlayer(checkpoint)
+    env = TronBatchEnv(1, width=60, height=60, seed=0)
+    with pytest.raises(ValueError, match="trained on a 100x100 board"):
+        player(env, 0, env.reset())
+
+
+@pytest.mark.parametrize("policy, env_kwargs, reason", [
+    ("CnnPolicy", {"width": 40, "height": 40, "frame_stack": 2}, "14-channel observations"),
+    ("MultiInputPolicy", {"obs_mode": "egocentric", "view_radius": 20}, "egocentric"),
+])
+def test_tournament_rejects_checkpoints_that_cannot_play(tmp_path, policy, env_kwargs, reason):
+    pytest.importorskip("pettingzoo")
+    from tron_eval import run_tournament
+    from tron_wrappers import TronSinglePlayerWrapper
+    model = PPO(policy, TronSinglePlayerWrapper(**env_kwargs), n_steps=8, batch_size=8, device="cpu")
+    path = str(tmp_path / "unfit.zip")
+    model.save(path)
+    with pytest.raises(ValueError, match=reason):
+        run_tournament([path, "random"], games=2, workers=1)
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("stable_baselines3")
+
+from stable_baselines3 import PPO  # noqa: E402
+
+from tron_batch_env import TronBatchEnv  # noqa: E402
+from tron_export import PolicyRuntime, _inputs, _sample_obs, export_policy  # noqa: E402
+
+
+@pytest.mark.parametrize("optimize", [True, False])
+def test_exported_policy_matches_predict(tmp_path, optimize):
+    model = PPO("CnnPolicy", TronBatchEnv(2, width=40, height=40, seed=0), n_steps=8, batch_size=16, device="cpu",
+                seed=0)
+    model_path = str(tmp_path / "tron_test.zip")
+    model.save(model_path)
+    meta = export_policy(model_path, str(tmp_path / "tron_test.pt"))
+    assert meta["obs_mode"] == "grid" and meta["inputs"][0]["shape"] == [40, 40, 7]
+
+    runtime = PolicyRuntime(str(tmp_path / "tron_test.pt"), optimize=optimize)
+    assert runtime.env_kwargs() == {"obs_mode": "grid", "width": 40, "height": 40}
+    policy = PPO.load(model_path, device="cpu").policy
+    policy.set_training_mode(False)
+    rng = np.random.default_rng(0)
+    inputs = _inputs(policy)
+    # random boards and real ones from the env
+    observations = [_sample_obs(inputs, rng) for _ in range(20)] + list(TronBatchEnv(4, 40, 40, seed=1).reset())
+    for obs in observations:
+        np.testing.assert_array_equal(runtime.act(obs), policy.predict(obs, deterministic=True)[0])
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from tron_core import VAL_WALL, TronGame
+from tron_maps import default_counts, generate_layouts
+
+
+@pytest.mark.parametrize("size", [8, 12, 15, 20, 25, 30])
+@pytest.mark.parametrize("n_players", [2, 4])
+def test_default_maps_on_small_boards(size, n_players):
+    game = TronGame(width=size, height=size, n_players=n_players)
+    game.reset(seed=0)
+    if game.n_walls == 0:
+        assert not (game.grid[1:-1, 1:-1] == VAL_WALL).any()
+    for x, y in game.spawns:
+        assert game.grid[x, y] != VAL_WALL
+
+
+def test_no_default_walls_without_room():
+    assert default_counts(20, 20)[0] == 0
+    assert default_counts(100, 100) == (10, 10)
+    with pytest.raises(ValueError, match="No room for walls"):
+        generate_layouts(np.random.default_rng(0), 1, 20, 20, n_walls=1)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from tron_core import ACTION_NVEC, TronGame
+from tron_replay import Replay, ReplayPlayer, ReplayRecorder
+
+
+@pytest.mark.parametrize("store_layout", [False, True])
+@pytest.mark.parametrize("territory", [False, True])
+def test_playback_matches_the_recorded_game(store_layout, territory):
+    game = TronGame(width=30, height=24, n_players=3, territory=territory)
+    recorder = ReplayRecorder(game, store_layout=store_layout)
+    recorder.reset(seed=3)
+    rng = np.random.default_rng(0)
+    grids, observations = [game.grid.copy()], []
+    while len(game.agents) > 1:
+        obs, *_ = recorder.step({agent: rng.integers(ACTION_NVEC) for agent in game.agents})
+        grids.append(game.grid.copy())
+        observations.append({agent: view.copy() for agent, view in obs.items()})
+
+    replay = Replay.from_bytes(recorder.replay().to_bytes())
+    player = ReplayPlayer(replay)
+    if territory:
+        player.env = TronGame(width=30, height=24, n_players=3, territory=True)
+        player.restart()
+    np.testing.assert_array_equal(player.env.grid, grids[0])
+    for t in range(len(replay)):
+        obs, *_ = player.step()
+        np.testing.assert_array_equal(player.env.grid, grids[t + 1])
+        assert obs.keys() == observations[t].keys()
+        for agent in obs:
+            np.testing.assert_array_equal(obs[agent], observations[t][agent])
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pettingzoo")
+pytest.importorskip("stable_baselines3")
+
+from conftest import place  # noqa: E402
+from test_core import EDGES, H, W  # noqa: E402
+from tron_core import ACT_LEFT, ACT_UP, BOOST_YES, HEAD_VALS  # noqa: E402
+from tron_seats import TronSeatVecEnv  # noqa: E402
+
+
+@pytest.mark.parametrize("edge", list(EDGES))
+def test_seat_boosting_off_the_board_ends_the_game(edge):
+    x, y, heading = EDGES[edge]
+    env = TronSeatVecEnv(1, width=W, height=H, seed=0)
+    env.reset()
+    place(env.games[0], 0, x, y, heading)
+
+    env.step_async(np.array([[heading, 0, BOOST_YES], [ACT_UP, 0, 0]]))
+    obs, rewards, dones, infos = env.step_wait()
+
+    assert dones.all()
+    assert rewards[0] <= -10
+    assert infos[0]["episode"]["r"] == rewards[0]
+    assert infos[0]["terminal_observation"].shape == env.observation_space.shape
+    # the game was reset for the next episode: both seats observe a fresh board
+    assert obs.shape == (2, *env.observation_space.shape)
+    assert len(env.games[0].agents) == 2
+
+
+def head_hit(env, n_players):
+    # a player 2 head right in front of player 1, which keeps going left: player 1 is terminated, nobody dies
+    game = env.games[0]
+    x, y = game.positions[0]
+    state = game.snapshot()
+    state.grid[x - 1, y] = HEAD_VALS[1]
+    game.restore(state)
+    env.step_async(np.array([[ACT_LEFT, 0, 0]] + [[ACT_UP, 0, 0]] * (n_players - 1)))
+    return env.step_wait()
+
+
+def test_head_hit_ends_a_two_player_game():
+    env = TronSeatVecEnv(1, width=W, height=H, seed=0)
+    env.reset()
+    _, rewards, dones, infos = head_hit(env, 2)
+    assert dones.all()
+    assert rewards[0] == -5
+    assert not infos[0]["TimeLimit.truncated"]
+    assert infos[1]["TimeLimit.truncated"]  # the other seat's game is over, not its life
+    assert len(env.games[0].agents) == 2 and env.games[0].alive.all() and not env.seat_done.any()
+
+
+def test_head_hit_seat_stops_moving():
+    env = TronSeatVecEnv(1, width=W, height=H, n_players=3, seed=0)
+    env.reset()
+    _, _, dones, _ = head_hit(env, 3)
+    assert dones.tolist() == [True, False, False]
+    frozen = env.games[0].positions[0].copy()
+    assert env.games[0].alive[0]
+    env.step_async(np.array([[ACT_LEFT, 1, BOOST_YES], [ACT_UP, 0, 0], [ACT_UP, 0, 0]]))
+    _, rewards, dones, _ = env.step_wait()
+    assert dones[0] and rewards[0] == 0
+    np.testing.assert_array_equal(env.games[0].positions[0], frozen)
@@ -0,0 +1,42 @@
+import pytest
+
+th = pytest.importorskip("torch")
+pytest.importorskip("stable_baselines3")
+
+from stable_baselines3 import PPO  # noqa: E402
+
+from tron_batch_env import TronBatchEnv  # noqa: E402
+from tron_selfplay import OpponentPool  # noqa: E402
+
+
+def test_snapshots_copy_weights_into_preallocated_policies():
+    model = PPO("CnnPolicy", TronBatchEnv(2, width=40, height=40, seed=0), n_steps=8, batch_size=16, device="cpu")
+    learner = model.policy
+    pool = OpponentPool(max_size=2, seed=0)
+    for _ in range(3):
+        pool.add_policy(learner)
+    first, second = pool.snapshots
+    assert first is not learner and second is not learner and first is not second
+    for snapshot in pool.snapshots:
+        assert not snapshot.training
+        assert not any(param.requires_grad for param in snapshot.parameters())
+        assert not snapshot.optimizer.state
+        for name, value in learner.state_dict().items():
+            assert th.equal(snapshot.state_dict()[name], value)
+
+    # a full pool reuses its oldest network that is not the active opponent; the active one keeps its weights
+    active = pool.active
+    before = {name: value.clone() for name, value in active.state_dict().items()}
+    with th.no_grad():
+        for param in learner.parameters():
+            param.add_(1.0)
+    pool.add_policy(learner)
+    reused = pool.snapshots[-1]
+    assert reused is not active and reused in (first, second)
+    assert pool.active is active
+    assert all(th.equal(before[name], value) for name, value in active.state_dict().items())
+    assert all(th.equal(learner.state_dict()[name], value) for name, value in reused.state_dict().items())
+
+    env = TronBatchEnv(3, width=40, height=40, opponent=pool, seed=1)
+    env.reset()
+    env.step(env.random_actions())
@@ -0,0 +1,57 @@
+import asyncio
+
+from tron_core import HEAD_VALS
+from tron_server import TronServer
+
+
+class RecordingConnection:
+    # stands in for a TCP / WebSocket client: keeps every message, optionally boosts on every state
+    def __init__(self, boost=False, on_start=None):
+        self.messages = []
+        self.boost = boost
+        self.on_start = on_start
+        self.match, self.agent = None, None
+
+    def send(self, message):
+        self.messages.append(message)
+        if self.on_start is not None and message["type"] == "start":
+            self.on_start(self.match)
+        if self.boost and message["type"] == "state":
+            self.match.set_control(self.agent, {"boost": 1})
+
+    def close(self):
+        pass
+
+
+def test_boosting_off_the_board_ends_the_match():
+    # player 2 (spawn x = 70) steps right once, then boosts 3 cells a tick: 71 -> 74 -> ... -> 98 -> 101
+    async def play():
+        server = TronServer(tick_interval=0.001)
+        first, second = RecordingConnection(), RecordingConnection(boost=True)
+        server.join(first, "human")
+        second.match, second.agent = server.join(second, "human")
+        await asyncio.wait_for(second.match.task, timeout=10)
+        return server, first
+
+    server, first = asyncio.run(play())
+    assert first.messages[-1] == {"type": "end", "winner": "player_1", "ticks": 11}
+    assert list(server.results) == ["player_1"]
+    assert not server.matches
+
+
+def test_head_hit_ends_the_match_in_a_draw():
+    # a player 2 head right in front of player 1 (spawn (30, 50), heading left): hitting it kills nobody
+    def head_ahead(match):
+        match.env.grid[29, 50] = HEAD_VALS[1]
+
+    async def play():
+        server = TronServer(tick_interval=0.001)
+        first, second = RecordingConnection(on_start=head_ahead), RecordingConnection()
+        first.match, first.agent = server.join(first, "human")
+        server.join(second, "human")
+        await asyncio.wait_for(first.match.task, timeout=10)
+        return server, first
+
+    server, first = asyncio.run(play())
+    assert first.messages[-1] == {"type": "end", "winner": None, "ticks": 1}
+    assert list(server.results) == [None]
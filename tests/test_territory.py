@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from tron_core import ACTION_NVEC, TronGame
+from tron_territory import TerritoryTracker
+
+
+def full_recompute(game):
+    tracker = TerritoryTracker(game.width, game.height, game.n_players)
+    tracker.reset(game.grid, game.positions, game.alive)
+    return tracker
+
+
+@pytest.mark.parametrize("n_players", [2, 4])
+def test_incremental_features_match_a_full_recompute(n_players):
+    # random play (boosts off the board included) must never let the patched masks drift
+    game = TronGame(width=30, height=24, n_players=n_players, territory=True)
+    rng = np.random.default_rng(n_players)
+    for episode in range(5):
+        game.reset(seed=episode)
+        while len(game.agents) > 1:
+            _, _, _, _, infos = game.step({agent: rng.integers(ACTION_NVEC) for agent in game.agents})
+            fresh = full_recompute(game)
+            assert game.territory.reach == fresh.reach
+            assert game.territory.owned == fresh.owned
+            for i, agent in enumerate(game.possible_agents):
+                assert game.territory.features(i) == fresh.features(i)
+                if agent in infos and infos[agent]:
+                    assert {key: infos[agent][key] for key in fresh.features(i)} == fresh.features(i)
+
+
+def test_enemy_features():
+    tracker = TerritoryTracker(5, 5, 3)
+    tracker.area = [4, 7, 9]
+    tracker.territory = [1, 2, 3]
+    assert tracker.features(0) == {"reachable_area": 4, "territory": 1,
+                                   "enemy_reachable_area": 9, "enemy_territory": 5}
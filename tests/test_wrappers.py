@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("gymnasium")
+pytest.importorskip("pettingzoo")
+
+from tron_wrappers import TronSinglePlayerWrapper  # noqa: E402
+
+
+def play_to_the_end(env, rng):
+    while True:
+        obs, _, terminated, truncated, _ = env.step(rng.integers(env.action_space.nvec))
+        if terminated or truncated:
+            return obs
+
+
+@pytest.mark.parametrize("obs_mode", ["grid", "egocentric"])
+@pytest.mark.parametrize("frame_stack", [1, 3])
+def test_last_observation_survives_the_reset(obs_mode, frame_stack):
+    # what DummyVecEnv does at the end of an episode: keep the observation, then reset at once
+    env = TronSinglePlayerWrapper(width=30, height=24, obs_mode=obs_mode, frame_stack=frame_stack)
+    rng = np.random.default_rng(0)
+    env.reset(seed=0)
+    for _ in range(5):
+        last = play_to_the_end(env, rng)
+        frozen = {key: value.copy() for key, value in last.items()} if obs_mode == "egocentric" else last.copy()
+        env.reset()
+        env.step(rng.integers(env.action_space.nvec))
+        if obs_mode == "egocentric":
+            for key in frozen:
+                np.testing.assert_array_equal(last[key], frozen[key])
+        else:
+            np.testing.assert_array_equal(last, frozen)
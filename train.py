@@ -1,82 +1,94 @@
-import gymnasium as gym
-import numpy as np
+import argparse
 import os
+import torch as th
+from torch import nn
 from stable_baselines3 import PPO
 from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
 from stable_baselines3.common.env_checker import check_env
-from stable_baselines3.common.callbacks import CheckpointCallback
-from gymnasium.utils import seeding  # added
+from stable_baselines3.common.torch_layers import BaseFeaturesExtractor
 
 # Import your environment
-from tron_env import TronEnv
+from tron_wrappers import TronSinglePlayerWrapper, make_env
+from tron_batch_env import TronBatchEnv
+from tron_maps import MapPool
+from tron_shm_vec_env import TronShmVecEnv
+from tron_seats import TronSeatVecEnv
+from tron_selfplay import OpponentPool, SelfPlayCallback
+from tron_stats import TronStatsCallback
+from tron_checkpoint import AsyncCheckpointCallback, latest_checkpoint, load_checkpoint
+from tron_bots import BOTS, BatchBot
 
-class TronSinglePlayerWrapper(gym.Env):
+
+class TronEgoExtractor(BaseFeaturesExtractor):
     """
-    Wraps the Multi-Agent TronEnv to make it look like a Single-Agent Gymnasium Env.
-    We fix Player 2 to be a Random Bot.
+    Small CNN + MLP for the egocentric Dict observation ("view" window + "vector" scalars).
+    NatureCNN needs at least 36x36 inputs, the egocentric window is usually much smaller.
     """
-    def __init__(self):
-        super().__init__()
-        self.env = TronEnv()
-        self.np_random = None  # added
-        
-        # We only expose Player 1's spaces to the RL Agent
-        self.observation_space = self.env.observation_space("player_1")
-        self.action_space = self.env.action_space("player_1")
-        
-    def reset(self, seed=None, options=None):
-        # Initialize wrapper RNG; do NOT pass seed to TronEnv.reset
-        if seed is not None:
-            self.np_random, _ = seeding.np_random(seed)  # added
-        # 1. Reset the underlying multi-agent env
-        obs_dict, info_dict = self.env.reset()  # changed: removed seed=seed
-        
-        # 2. Return only Player 1's observation
-        return obs_dict["player_1"], info_dict.get("player_1", {})
-
-    def step(self, action):
-        # 1. AI controls Player 1, Random controls Player 2
-        p2_space = self.env.action_space("player_2")
-        # Sample from MultiDiscrete properly: returns array [move, trail, boost]
-        p2_action = p2_space.sample()  # changed: now returns proper [4, 2, 2] action
-        actions = { "player_1": action, "player_2": p2_action }
-        
-        # 2. Step the environment with robust error handling
-        try:
-            obs, rewards, terms, truncs, infos = self.env.step(actions)
-        except IndexError:
-            # Treat out-of-bounds index in underlying env as a terminal event for Player 1
-            dead_obs = np.zeros(self.observation_space.shape, dtype=self.observation_space.dtype)
-            return dead_obs, -10.0, True, False, {}
-
-        # 3. Extract Player 1's reward BEFORE checking if player is in obs
-        p1_reward = rewards.get("player_1", -10.0)  # changed
-        p1_terminated = terms.get("player_1", False)  # changed
-        p1_truncated = truncs.get("player_1", False)  # changed
-        p1_info = infos.get("player_1", {})  # changed
-
-        # 4. Handle Player 1 Death when the env omits its keys
-        if "player_1" not in obs:
-            dead_obs = np.zeros(self.observation_space.shape, dtype=self.observation_space.dtype)
-            return dead_obs, p1_reward, True, False, p1_info
-
-        # 5. Standard Return (Player 1 is still alive)
-        return (
-            obs["player_1"], 
-            float(p1_reward), 
-            bool(p1_terminated), 
-            bool(p1_truncated), 
-            p1_info
+    def __init__(self, observation_space, features_dim=128):
+        super().__init__(observation_space, features_dim)
+        # SB3 transposes image spaces to channels-first before they get here
+        n_channels = observation_space["view"].shape[0]
+        self.cnn = nn.Sequential(
+            nn.Conv2d(n_channels, 32, kernel_size=3, padding=1),
+            nn.ReLU(),
+            nn.Conv2d(32, 64, kernel_size=3, stride=2, padding=1),
+            nn.ReLU(),
+            nn.Flatten(),
         )
-    
+        with th.no_grad():
+            n_flatten = self.cnn(th.as_tensor(observation_space["view"].sample()[None]).float()).shape[1]
+        n_vector = observation_space["vector"].shape[0]
+        self.linear = nn.Sequential(nn.Linear(n_flatten + n_vector, features_dim), nn.ReLU())
+
+    def forward(self, observations):
+        return self.linear(th.cat([self.cnn(observations["view"]), observations["vector"]], dim=1))
 
-    def render(self):
-        return self.env.render()
-    
-    def close(self):
-        return self.env.close()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train a PPO agent to play Tron.")
+    parser.add_argument("--batch-envs", type=int, default=0,
+                        help="Run this many games in one TronBatchEnv (0 = single TronSinglePlayerWrapper)")
+    parser.add_argument("--subproc-envs", type=int, default=0,
+                        help="Run this many TronSinglePlayerWrapper games in worker processes (shared-memory VecEnv)")
+    parser.add_argument("--seat-envs", type=int, default=0,
+                        help="Run this many TronEnv games with one shared policy in every seat "
+                             "(--players samples per game and step, no scripted opponent)")
+    parser.add_argument("--self-play", action="store_true",
+                        help="Player 2 is drawn from a pool of frozen past policies (needs --batch-envs)")
+    parser.add_argument("--snapshot-every", type=int, default=50000,
+                        help="Add the learner to the self-play pool every this many timesteps")
+    parser.add_argument("--opponents", nargs="*", default=[],
+                        help="Saved models (.zip) to seed the self-play pool with")
+    parser.add_argument("--opponent", choices=list(BOTS), default="random",
+                        help="Scripted player 2 (ignored with --self-play)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Time env phases and count game events, logged to TensorBoard under tron/")
+    parser.add_argument("--timesteps", type=int, default=100000,
+                        help="Total environment steps to train for")
+    parser.add_argument("--obs-mode", choices=["grid", "egocentric"], default="grid",
+                        help="Full-board image or head-centred window + scalars (single env only)")
+    parser.add_argument("--view-radius", type=int, default=10,
+                        help="Radius of the egocentric window")
+    parser.add_argument("--map-pool", default=None,
+                        help="Pre-generated map pool (.npy from tron_maps.py) to draw layouts from")
+    parser.add_argument("--width", type=int, default=100, help="Board width (taken from --map-pool if given)")
+    parser.add_argument("--height", type=int, default=100, help="Board height (taken from --map-pool if given)")
+    parser.add_argument("--players", type=int, default=2,
+                        help="Players per game; every player but the learner is a --opponent bot (single env only)")
+    parser.add_argument("--action-repeat", type=int, default=1,
+                        help="Repeat each action for up to this many ticks unless a crash is close (single env only)")
+    parser.add_argument("--frame-stack", type=int, default=1,
+                        help="Stack the last this many observations along the channel axis (single env only)")
+    parser.add_argument("--checkpoint-every", type=int, default=50000,
+                        help="Write a checkpoint (in the background) every this many timesteps")
+    parser.add_argument("--keep-checkpoints", type=int, default=3,
+                        help="Number of newest checkpoints to keep")
+    parser.add_argument("--keep-every", type=int, default=None,
+                        help="Also keep one checkpoint per this many timesteps as a milestone")
+    parser.add_argument("--fresh", action="store_true",
+                        help="Start from scratch instead of resuming from the latest checkpoint")
+    args = parser.parse_args()
+
     # 1. Create Directories for logging
     models_dir = "models/PPO"
     log_dir = "logs"
@@ -85,34 +97,99 @@ if __name__ == "__main__":
 
     # 2. Instantiate and Check the Environment
     # We use the wrapper we just wrote
-    env = TronSinglePlayerWrapper()
+    map_pool = MapPool.load(args.map_pool) if args.map_pool else None
+    if map_pool is not None:
+        args.width, args.height = map_pool.width, map_pool.height
+    env = TronSinglePlayerWrapper(width=args.width, height=args.height, n_players=args.players,
+                                  obs_mode=args.obs_mode, view_radius=args.view_radius, map_pool=map_pool,
+                                  opponent=args.opponent, action_repeat=args.action_repeat,
+                                  frame_stack=args.frame_stack, profile=args.profile)
     
     # Simple check to ensure our wrapper follows gymnasium standards
     check_env(env) 
     print("Environment check passed!")
 
     # 3. Vectorize the Environment (Optional but recommended for speed)
-    # This runs 4 games in parallel on your CPU
-    # If using render(), use DummyVecEnv. If strictly training, SubprocVecEnv is faster.
-    # vec_env = DummyVecEnv([lambda: TronSinglePlayerWrapper() for _ in range(4)])
+    # TronBatchEnv steps all games in one process with NumPy, so hundreds of games are cheap.
+    # Keep the rollout buffer around 2048 samples: n_steps shrinks as the number of games grows.
+    n_steps = 2048
+    callbacks = []
+    if args.self_play and args.batch_envs <= 0:
+        parser.error("--self-play needs --batch-envs")
+    if args.batch_envs > 0:
+        if args.obs_mode != "grid":
+            parser.error("--batch-envs only supports --obs-mode grid")
+        if args.players != 2:
+            parser.error("--batch-envs only supports --players 2")
+        if args.action_repeat != 1 or args.frame_stack != 1:
+            parser.error("--batch-envs does not support --action-repeat / --frame-stack")
+        env.close()
+        # the random bot is TronBatchEnv's built-in player 2
+        opponent = BatchBot(args.opponent) if args.opponent != "random" else None
+        if args.self_play:
+            # one frozen snapshot answers for all games per step, swapped every few rollouts
+            opponent = OpponentPool()
+            for path in args.opponents:
+                opponent.add_checkpoint(path)
+            callbacks.append(SelfPlayCallback(opponent, snapshot_every=args.snapshot_every,
+                                              save_dir=f"{models_dir}/selfplay", verbose=1))
+        env = TronBatchEnv(args.batch_envs, width=args.width, height=args.height, map_pool=map_pool,
+                           opponent=opponent, profile=args.profile)
+        n_steps = max(2048 // args.batch_envs, 8)
+        print(f"Training on {args.batch_envs} batched games.")
+    elif args.seat_envs > 0:
+        if args.action_repeat != 1 or args.frame_stack != 1:
+            parser.error("--seat-envs does not support --action-repeat / --frame-stack")
+        env.close()
+        env = TronSeatVecEnv(args.seat_envs, width=args.width, height=args.height, n_players=args.players,
+                             obs_mode=args.obs_mode, view_radius=args.view_radius, map_pool=map_pool,
+                             profile=args.profile)
+        n_steps = max(2048 // env.num_envs, 8)
+        print(f"Training on every seat of {args.seat_envs} games ({env.num_envs} players, one shared policy).")
+    elif args.subproc_envs > 0:
+        # worker processes write observations straight into shared memory, no pickling per step
+        env.close()
+        env = TronShmVecEnv([make_env(args.obs_mode, args.view_radius, args.map_pool, args.opponent, args.profile,
+                                      args.width, args.height, args.players, args.action_repeat, args.frame_stack)
+                             for _ in range(args.subproc_envs)])
+        n_steps = max(2048 // args.subproc_envs, 8)
+        print(f"Training on {args.subproc_envs} games in {len(env.processes)} worker processes.")
 
     # 4. Initialize the Agent (PPO)
     # Policy: "CnnPolicy" because our observation is a Grid/Image (100x100x7)
+    # The egocentric observation is a Dict, so it needs "MultiInputPolicy" with our small extractor
     # Learning Rate: 0.0003 is standard, lower it if training is unstable
+    policy, policy_kwargs = "CnnPolicy", None
+    if args.obs_mode == "egocentric":
+        policy, policy_kwargs = "MultiInputPolicy", dict(features_extractor_class=TronEgoExtractor)
     model = PPO(
-        "CnnPolicy", 
+        policy, 
         env, 
+        policy_kwargs=policy_kwargs,
         verbose=1, 
         tensorboard_log=log_dir,
         learning_rate=0.0003,
-        n_steps=2048,
+        n_steps=n_steps,
     )
 
+    if args.profile:
+        callbacks.append(TronStatsCallback())
+
+    # resume from the newest checkpoint of an interrupted run (same flags, so the policy shapes match)
+    checkpoint_dir = f"{models_dir}/checkpoints"
+    resume_path = None if args.fresh else latest_checkpoint(checkpoint_dir)
+    if resume_path is not None:
+        print(f"Resuming from {resume_path} at {load_checkpoint(model, resume_path)} timesteps.")
+    callbacks.append(AsyncCheckpointCallback(checkpoint_dir, save_every=args.checkpoint_every,
+                                             keep_last=args.keep_checkpoints, keep_every=args.keep_every, verbose=1))
+
     # 5. Train
     print("Starting training...")
-    TIMESTEPS = 100000 # Increase this to 1M or 5M for a smart bot
-    model.learn(total_timesteps=TIMESTEPS)
+    TIMESTEPS = args.timesteps # Increase this to 1M or 5M for a smart bot
+    model.learn(total_timesteps=max(TIMESTEPS - model.num_timesteps, 0), callback=callbacks,
+                reset_num_timesteps=resume_path is None)
     
     # 6. Save
     model.save(f"{models_dir}/tron_v1")
+    env.close()
     print("Training Complete. Model Saved.")
\ No newline at end of file
@@ -0,0 +1,327 @@
+import time
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+
+from tron_core import (
+    VAL_EMPTY, VAL_WALL, VAL_BOOST, VAL_TRAIL_P1, VAL_TRAIL_P2, HEAD_VALS, TRAIL_VALS, NO_HEADING,
+    ACT_LEFT, TRAIL_ON, BOOST_YES, MOVE_DX, MOVE_DY, OPPOSITE, build_obs_lut,
+)
+from tron_maps import default_counts, default_spawns, generate_layouts
+
+"""
+The Batched Engine (No Graphics)
+
+Role: Runs N Tron matches side by side and advances all of them with a handful of NumPy calls.
+
+Key Code: class TronBatchEnv(VecEnv):
+
+Goal: Same rules and rewards as TronEnv, but the whole batch lives in arrays:
+      grid (N, W, H), positions (N, 2, 2), directions (N, 2), boosts (N, 2), trails (N, 2).
+      Player 1 is the learner (SB3 actions). Player 2 is a random bot, exactly like TronSinglePlayerWrapper,
+      unless an `opponent` is given: a callable taking the env and returning (N, 3) actions for all games at once.
+      Always two players; free-for-all games with more players run on TronEnv(n_players=...).
+"""
+
+
+class TronBatchEnv(VecEnv):
+    """
+    Vectorized Tron: N independent player-1-vs-player-2 games stepped together.
+    Exposes the SB3 VecEnv interface so it can be handed straight to PPO.
+    Finished games are reset automatically and their last observation is stored
+    in info["terminal_observation"], like DummyVecEnv does.
+    Player 2 is driven by `opponent(env)` (random if None); it can read every player 2
+    observation at once through env.opponent_obs().
+    profile=True keeps per-phase timers and event counters in self.stats (a tron_stats.TronStats).
+    max_episode_steps ends (truncates) games that run longer, counting them as draws in last_outcomes.
+    last_outcomes only looks at who died: a head hit kills nobody, so a game it ends counts as a draw.
+    render_mode="rgb_array" lets render() / get_images() return the boards as RGB arrays, headless;
+    render_mode="human" draws every game in one window, tiled, with its step count and last result.
+    """
+    def __init__(self, num_envs, width=100, height=100, n_walls=None, wall_length=5, n_boosts=None, map_pool=None,
+                 opponent=None, max_episode_steps=None, profile=False, render_mode=None, seed=None):
+        if map_pool is not None:
+            width, height = map_pool.width, map_pool.height
+        self.width = width
+        self.height = height
+        self.map_pool = map_pool
+        default_walls, default_boosts = default_counts(width, height, wall_length)
+        self.n_walls = default_walls if n_walls is None else n_walls
+        self.wall_length = wall_length
+        self.n_boosts = default_boosts if n_boosts is None else n_boosts
+        self.opponent = opponent
+        self.max_episode_steps = max_episode_steps
+        self.stats = None
+        if profile:
+            from tron_stats import TronStats
+            self.stats = TronStats()
+        self.render_mode = render_mode
+        self._rng = np.random.default_rng(seed)
+
+        # same spawn layout as TronEnv (30, 50) / (70, 50), scaled to the board
+        self.spawns = np.array(default_spawns(width, height), dtype=np.int64)
+        self.spawn_dirs = np.array([ACT_LEFT, NO_HEADING], dtype=np.int64)  # player 2 starts with no valid heading, as in TronEnv
+
+        observation_space = spaces.Box(low=0, high=255, shape=(width, height, 7), dtype=np.uint8)
+        action_space = spaces.MultiDiscrete([4, 2, 2])
+        super().__init__(num_envs, observation_space, action_space)
+
+        # --- BATCH STATE (struct of arrays, agent index 0 = player 1, 1 = player 2) ---
+        self.grid = np.zeros((num_envs, width, height), dtype=np.uint8)
+        self.positions = np.zeros((num_envs, 2, 2), dtype=np.int64)
+        self.dirs = np.zeros((num_envs, 2), dtype=np.int64)
+        self.boosts = np.zeros((num_envs, 2), dtype=np.float32)
+        self.trails_active = np.zeros((num_envs, 2), dtype=bool)
+        self.alive = np.zeros((num_envs, 2), dtype=bool)
+        # per-game episode length and result of the previous game (0 none, 1 player 1 won, 2 player 2 won, 3 draw)
+        self.episode_steps = np.zeros(num_envs, dtype=np.int64)
+        self.last_outcomes = np.zeros(num_envs, dtype=np.uint8)
+        self.renderer = None
+
+        # observation buffer per agent; player 2's only exists once opponent_obs() has been asked for
+        self._obs_luts = [build_obs_lut(0), build_obs_lut(1)]
+        self._obs = np.zeros((num_envs, width, height, 7), dtype=np.uint8)
+        self._obs_buffers = [self._obs, None]
+        self._actions = None
+
+    # --- GAME LOGIC ---
+
+    def _reset_games(self, games):
+        # new layouts for all reset games at once: rows of the map pool or a bulk generate_layouts call
+        if self.map_pool is not None:
+            self.grid[games] = self.map_pool.layouts[np.sort(self.map_pool.sample(self._rng, len(games)))]
+        else:
+            self.grid[games] = generate_layouts(self._rng, len(games), self.width, self.height, n_walls=self.n_walls,
+                                                wall_length=self.wall_length, n_boosts=self.n_boosts,
+                                                spawns=self.spawns)
+        self.grid[games, self.spawns[0, 0], self.spawns[0, 1]] = HEAD_VALS[0]
+        self.grid[games, self.spawns[1, 0], self.spawns[1, 1]] = HEAD_VALS[1]
+        self.positions[games] = self.spawns
+        self.dirs[games] = self.spawn_dirs
+        self.boosts[games] = 0
+        self.trails_active[games] = True
+        self.alive[games] = True
+        self.episode_steps[games] = 0
+        # full observation rebuild only for the games that were reset
+        for agent, buffer in enumerate(self._obs_buffers):
+            if buffer is not None:
+                self._rebuild_obs(buffer, games, agent)
+
+    def _step_games(self, actions):
+        """
+        Advances every game by one tick. actions has shape (N, 2, 3): [move, trail, boost] per agent.
+        Agents still act one after the other inside a game (random order per game, like TronEnv.step),
+        but each of the two turns is applied to all games at once.
+        Returns per-agent rewards, terminations and deaths, all shaped (N, 2).
+        """
+        n = self.num_envs
+        stats = self.stats
+        games = np.arange(n)
+        rewards = np.zeros((n, 2), dtype=np.float32)
+        terminations = np.zeros((n, 2), dtype=bool)
+        died = np.zeros((n, 2), dtype=bool)
+
+        first = self._rng.integers(0, 2, size=n)
+        for agent in (first, 1 - first):
+            active = self.alive[games, agent]
+            g, a = games[active], agent[active]
+
+            move_cmd = actions[g, a, 0]
+            trail_cmd = actions[g, a, 1]
+            boost_cmd = actions[g, a, 2]
+            self.trails_active[g, a] = trail_cmd == TRAIL_ON
+
+            # spend a boost if one is available (moving 3 cells does not depend on it, as in TronEnv)
+            spend = (boost_cmd == BOOST_YES) & (self.boosts[g, a] >= 1)
+            self.boosts[g[spend], a[spend]] -= 1
+            self._update_energy(g[spend], a[spend])
+            teleport = boost_cmd == BOOST_YES
+            move_distance = np.where(teleport, 3, 1)
+
+            # reversing into yourself is ignored and costs a small penalty
+            prev_move_cmd = self.dirs[g, a]
+            reverse = OPPOSITE[move_cmd] == prev_move_cmd
+            final_move_cmd = np.where(reverse, prev_move_cmd, move_cmd)
+            rewards[g, a] -= 0.1 * reverse
+
+            current_x, current_y = self.positions[g, a, 0], self.positions[g, a, 1]
+            final_x = current_x + MOVE_DX[final_move_cmd] * move_distance
+            final_y = current_y + MOVE_DY[final_move_cmd] * move_distance
+            inside = (final_x >= 0) & (final_x < self.width) & (final_y >= 0) & (final_y < self.height)
+            cx = np.clip(final_x, 0, self.width - 1)
+            cy = np.clip(final_y, 0, self.height - 1)
+            cell = self.grid[g, cx, cy]
+
+            # hitting a wall / the edge or any trail ends the game for both players
+            wall_hit = ~inside | (cell == VAL_WALL)
+            crash = wall_hit | (cell == VAL_TRAIL_P1) | (cell == VAL_TRAIL_P2)
+            terminations[g[crash]] = True
+            died[g[crash], a[crash]] = True
+            rewards[g, a] -= 10 * crash
+
+            # hitting an enemy head on or from the side
+            head_hit = ~crash & (cell == HEAD_VALS[1 - a])
+            terminations[g[head_hit], a[head_hit]] = True
+            rewards[g, a] -= 5 * head_hit
+
+            rewards[g, a] += 0.05 * (inside & (cell == VAL_EMPTY))
+
+            # update grid: head lands on the cell when teleporting, trail (or nothing) is left behind
+            landed = teleport & inside
+            self._set_cells(g[landed], final_x[landed], final_y[landed], HEAD_VALS[a[landed]])
+            self._set_cells(g, current_x, current_y, np.where(trail_cmd == TRAIL_ON, TRAIL_VALS[a], VAL_EMPTY))
+
+            # picking up a boost
+            picked = inside & (self.grid[g, cx, cy] == VAL_BOOST)
+            self.boosts[g[picked], a[picked]] = np.minimum(self.boosts[g[picked], a[picked]] + 1.0, 10)
+            self._update_energy(g[picked], a[picked])
+            rewards[g, a] += 1.0 * picked
+
+            self.positions[g, a, 0] = final_x
+            self.positions[g, a, 1] = final_y
+            self.dirs[g, a] = final_move_cmd
+
+            if stats is not None:
+                stats.count("boosts_used", spend.sum())
+                stats.count("reversals", reverse.sum())
+                stats.count("deaths_wall", wall_hit.sum())
+                stats.count("deaths_trail", (crash & ~wall_hit).sum())
+                stats.count("head_hits", head_hit.sum())
+                stats.count("boosts_picked", picked.sum())
+
+        # only 1 agent died so only 1 will get the positive reward of winning the game
+        single = died.sum(axis=1) == 1
+        winner = np.argmin(died, axis=1)
+        rewards[games[single], winner[single]] += 10
+        self.alive &= ~died
+
+        return rewards, terminations, died
+
+    def _set_cells(self, games, xs, ys, vals):
+        # grid writes go through here so the observation buffers only change where the grid did
+        self.grid[games, xs, ys] = vals
+        for agent, buffer in enumerate(self._obs_buffers):
+            if buffer is None:
+                continue
+            energy = buffer[games, 0, 0, 4]
+            buffer[games, xs, ys] = self._obs_luts[agent][vals]
+            buffer[games, xs, ys, 4] = energy
+
+    def _update_energy(self, games, agents):
+        for agent, buffer in enumerate(self._obs_buffers):
+            if buffer is None:
+                continue
+            sel = games[agents == agent]
+            buffer[sel, :, :, 4] = (255 * (self.boosts[sel, agent] / 10)).astype(np.uint8)[:, None, None]
+
+    def _rebuild_obs(self, buffer, games, agent):
+        buffer[games] = self._obs_luts[agent][self.grid[games]]
+        self._update_energy(games, np.full(len(games), agent))
+
+    def _observe(self):
+        # player 1 view of every game, kept up to date by _set_cells / _update_energy
+        return self._obs
+
+    def opponent_obs(self):
+        """
+        Player 2 view of every game, shape (N, W, H, 7). The buffer is built on the first call and
+        then patched incrementally like player 1's, so it costs nothing when the opponent never looks.
+        """
+        if self._obs_buffers[1] is None:
+            self._obs_buffers[1] = np.zeros_like(self._obs)
+            self._rebuild_obs(self._obs_buffers[1], np.arange(self.num_envs), 1)
+        return self._obs_buffers[1]
+
+    def random_actions(self):
+        return self._rng.integers(0, self.action_space.nvec, size=(self.num_envs, 3))
+
+    # --- VECENV INTERFACE ---
+
+    def reset(self):
+        if self._seeds[0] is not None:
+            self._rng = np.random.default_rng(self._seeds[0])
+        self._reset_seeds()
+        self._reset_options()
+        self._reset_games(np.arange(self.num_envs))
+        return self._observe().copy()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions).reshape(self.num_envs, 3)
+
+    def step_wait(self):
+        stats = self.stats
+        if stats is not None:
+            phase_start = time.perf_counter()
+        opponent_actions = self.opponent(self) if self.opponent is not None else self.random_actions()
+        actions = np.stack([self._actions, np.asarray(opponent_actions).reshape(self.num_envs, 3)], axis=1)
+        if stats is not None:
+            stats.add_time("opponent", phase_start)
+            phase_start = time.perf_counter()
+        rewards, terminations, died = self._step_games(actions)
+        self.episode_steps += 1
+        if stats is not None:
+            stats.count("steps", self.num_envs)
+            stats.add_time("move", phase_start)
+            phase_start = time.perf_counter()
+
+        dones = terminations[:, 0].copy()
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        if self.max_episode_steps is not None:
+            truncated = ~dones & (self.episode_steps >= self.max_episode_steps)
+            dones |= truncated
+        infos = [{} for _ in range(self.num_envs)]
+        done_games = np.flatnonzero(dones)
+        if len(done_games):
+            p1_died, p2_died = died[done_games, 0], died[done_games, 1]
+            # decided by deaths alone: a game player 1 ends by hitting player 2's head (nobody died) is a draw
+            outcomes = np.where(p1_died == p2_died, 3, np.where(p2_died, 1, 2))
+            self.last_outcomes[done_games] = np.where(truncated[done_games], 3, outcomes)
+            obs = self._observe()
+            for g in done_games:
+                # the single-player wrapper hands back a blank frame once player 1 is gone
+                terminal_obs = np.zeros_like(obs[g]) if died[g, 0] else obs[g].copy()
+                infos[g]["terminal_observation"] = terminal_obs
+                infos[g]["TimeLimit.truncated"] = bool(truncated[g])
+            self._reset_games(done_games)
+        if stats is not None:
+            stats.count("resets", len(done_games))
+            stats.add_time("reset", phase_start)
+            phase_start = time.perf_counter()
+
+        obs = self._observe().copy()
+        if stats is not None:
+            stats.add_time("observe", phase_start)
+        return obs, rewards[:, 0].copy(), dones, infos
+
+    def pop_stats(self):
+        # TronStats gathered since the last call (None when profiling is off)
+        return self.stats.pop() if self.stats is not None else None
+
+    def get_images(self):
+        from tron_video import grid_to_rgb
+        return [grid_to_rgb(grid) for grid in self.grid]
+
+    def render(self, mode=None):
+        if self.render_mode != "human":
+            return super().render(mode)
+        if self.renderer is None:
+            from tron_renderer import TronRenderer
+            self.renderer = TronRenderer(self.width, self.height, n_tiles=self.num_envs)
+        return self.renderer.render_batch(self.grid, steps=self.episode_steps, outcomes=self.last_outcomes)
+
+    def close(self):
+        if self.renderer is not None:
+            self.renderer.close()
+            self.renderer = None
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return [getattr(self, method_name)(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
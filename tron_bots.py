@@ -0,0 +1,143 @@
+import numpy as np
+
+from tron_core import VAL_EMPTY, VAL_BOOST, MOVE_DX, MOVE_DY, OPPOSITE, TRAIL_ON, BOOST_NO
+
+"""
+Scripted Opponents (No Graphics, No Network)
+
+Role: Rule-based bots that pick actions for a whole batch of games with a few NumPy calls.
+
+Key Code: BOTS, wall_avoider(...), space_maximizer(...), head_chaser(...), class BatchBot:, env_action(...)
+
+Goal: Player 2 that survives long enough to be worth beating, at engine speed. Every bot takes the batch
+      state as arrays (grid (N, W, H), own head (N, 2), own heading (N,), enemy head (N, 2), enemy heading (N,))
+      and returns (N, 3) actions [move, trail, boost]. A single TronGame / TronEnv game is just a batch of one.
+      The scripted bots never reverse, never step onto a blocked cell when a free one is next to them,
+      keep their trail on and do not boost.
+"""
+
+SPACE_RADIUS = 6  # how far (in steps) space_maximizer looks ahead from each candidate cell
+
+
+def _moves(grid, heads, headings, enemy_heads):
+    # the cell each of the 4 moves lands on, whether it is free, and whether the move is a reversal
+    n, width, height = grid.shape
+    nx = heads[:, 0, None] + MOVE_DX[None, :]
+    ny = heads[:, 1, None] + MOVE_DY[None, :]
+    inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+    cell = grid[np.arange(n)[:, None], np.clip(nx, 0, width - 1), np.clip(ny, 0, height - 1)]
+    safe = inside & ((cell == VAL_EMPTY) | (cell == VAL_BOOST))
+    safe &= (nx != enemy_heads[:, 0, None]) | (ny != enemy_heads[:, 1, None])
+    # a fresh player 2 has no heading yet (4): nothing counts as reversing
+    safe &= OPPOSITE[None, :] != headings[:, None]
+    return nx, ny, safe
+
+
+def _actions(scores, safe, rng):
+    # best-scoring free move; small noise breaks ties so two bots do not mirror each other forever
+    n = len(scores)
+    total = np.where(safe, scores, -np.inf) + 1e-3 * rng.random((n, 4))
+    actions = np.zeros((n, 3), dtype=np.int64)
+    actions[:, 0] = np.argmax(total, axis=1)
+    actions[:, 1] = TRAIL_ON
+    actions[:, 2] = BOOST_NO
+    return actions
+
+
+def random_bot(grid, heads, headings, enemy_heads, enemy_headings, rng):
+    # uniform over the whole action space, like the original player 2
+    return rng.integers(0, [4, 2, 2], size=(len(grid), 3))
+
+
+def wall_avoider(grid, heads, headings, enemy_heads, enemy_headings, rng):
+    # goes straight while it can, otherwise turns to a random free cell
+    _, _, safe = _moves(grid, heads, headings, enemy_heads)
+    straight = np.arange(4)[None, :] == headings[:, None]
+    return _actions(straight + 0.5 * rng.random(safe.shape), safe, rng)
+
+
+def space_maximizer(grid, heads, headings, enemy_heads, enemy_headings, rng, radius=SPACE_RADIUS):
+    """
+    Moves towards the most open space: for each free move, counts the free cells it can reach within
+    `radius` steps (a flood fill in a (2r+1)^2 window around the landing cell, all 4N windows at once).
+    """
+    n, width, height = grid.shape
+    nx, ny, safe = _moves(grid, heads, headings, enemy_heads)
+    size = 2 * radius + 1
+    offsets = np.arange(size) - radius
+    wx = nx[:, :, None, None] + offsets[None, None, :, None]
+    wy = ny[:, :, None, None] + offsets[None, None, None, :]
+    inside = (wx >= 0) & (wx < width) & (wy >= 0) & (wy < height)
+    cells = grid[np.arange(n)[:, None, None, None], np.clip(wx, 0, width - 1), np.clip(wy, 0, height - 1)]
+    free = inside & ((cells == VAL_EMPTY) | (cells == VAL_BOOST))
+    # the current head becomes trail once it moves away
+    free &= (wx != heads[:, 0, None, None, None]) | (wy != heads[:, 1, None, None, None])
+
+    reach = np.zeros_like(free)
+    reach[:, :, radius, radius] = safe
+    for _ in range(radius):
+        grown = reach.copy()
+        grown[..., 1:, :] |= reach[..., :-1, :]
+        grown[..., :-1, :] |= reach[..., 1:, :]
+        grown[..., :, 1:] |= reach[..., :, :-1]
+        grown[..., :, :-1] |= reach[..., :, 1:]
+        reach = grown & free
+    space = reach.sum(axis=(2, 3)) / (size * size)
+    # only turn for clearly more room: turning on small differences packs the bot into its own trail
+    straight = np.arange(4)[None, :] == headings[:, None]
+    return _actions(space + 0.2 * straight, safe, rng)
+
+
+def head_chaser(grid, heads, headings, enemy_heads, enemy_headings, rng):
+    # heads for the cell a few steps ahead of the enemy, to cut it off
+    _, _, safe = _moves(grid, heads, headings, enemy_heads)
+    ahead = np.where(enemy_headings < 4, 3, 0)
+    enemy_dir = np.minimum(enemy_headings, 3)
+    target_x = enemy_heads[:, 0] + MOVE_DX[enemy_dir] * ahead
+    target_y = enemy_heads[:, 1] + MOVE_DY[enemy_dir] * ahead
+    nx = heads[:, 0, None] + MOVE_DX[None, :]
+    ny = heads[:, 1, None] + MOVE_DY[None, :]
+    distance = np.abs(nx - target_x[:, None]) + np.abs(ny - target_y[:, None])
+    return _actions(-distance.astype(np.float64), safe, rng)
+
+
+BOTS = {
+    "random": random_bot,
+    "wall_avoider": wall_avoider,
+    "space_maximizer": space_maximizer,
+    "head_chaser": head_chaser,
+}
+
+
+def get_bot(name):
+    if name not in BOTS:
+        raise ValueError(f"Unknown bot {name!r}, expected one of {', '.join(BOTS)}")
+    return BOTS[name]
+
+
+def env_action(bot, env, agent, rng):
+    """One action for `agent` of a TronEnv (a batch of one game); with more players the enemy is the nearest one."""
+    i = env.agent_ids[agent]
+    enemy = env.nearest_enemy(i)
+    if enemy is None:
+        enemy = i
+    return bot(env.grid[None], env.positions[None, i], env.dirs[None, i],
+               env.positions[None, enemy], env.dirs[None, enemy], rng)[0]
+
+
+class BatchBot:
+    """
+    `opponent` for a TronBatchEnv: a scripted bot playing player 2 of every game in one call.
+    act(env, agent) plays any seat.
+    """
+    def __init__(self, name, seed=None):
+        self.name = name
+        self.bot = get_bot(name)
+        self.rng = np.random.default_rng(seed)
+
+    def act(self, env, agent):
+        return self.bot(env.grid, env.positions[:, agent], env.dirs[:, agent],
+                        env.positions[:, 1 - agent], env.dirs[:, 1 - agent], self.rng)
+
+    def __call__(self, env):
+        return self.act(env, 1)
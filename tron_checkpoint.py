@@ -0,0 +1,153 @@
+import glob
+import io
+import os
+import pickle
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import torch as th
+from stable_baselines3.common.callbacks import BaseCallback
+
+"""
+Background Checkpointing
+
+Role: Periodic, crash-safe snapshots of a PPO run (policy, optimizer, timestep counter, VecNormalize statistics)
+      and resuming from the newest one.
+
+Key Code: class AsyncCheckpointCallback(BaseCallback):, latest_checkpoint(...), load_checkpoint(...)
+
+Goal: Rollout collection never waits on the disk. The training thread only copies the state tensors to CPU;
+      serializing and writing happen on a background thread, through a temporary file renamed into place,
+      so a crash mid-write never leaves a broken newest checkpoint.
+"""
+
+CHECKPOINT_PATTERN = re.compile(r"_(\d+)_steps\.pt$")
+
+
+def snapshot(model):
+    """Copy of everything needed to resume `model`, safe to hand to another thread."""
+    state = {
+        "num_timesteps": model.num_timesteps,
+        "policy": {key: value.detach().cpu().clone() for key, value in model.policy.state_dict().items()},
+        "optimizer": _cpu_copy(model.policy.optimizer.state_dict()),
+        "vec_normalize": None,
+    }
+    vec_normalize = model.get_vec_normalize_env()
+    if vec_normalize is not None:
+        # the running mean / variance objects keep changing during training, so pickle them now
+        state["vec_normalize"] = pickle.dumps({"obs_rms": vec_normalize.obs_rms, "ret_rms": vec_normalize.ret_rms})
+    return state
+
+
+def _cpu_copy(value):
+    if isinstance(value, th.Tensor):
+        return value.detach().cpu().clone()
+    if isinstance(value, dict):
+        return {key: _cpu_copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_cpu_copy(item) for item in value)
+    return value
+
+
+def write_checkpoint(state, path):
+    # serialize in memory, then write + rename: readers only ever see complete files
+    buffer = io.BytesIO()
+    th.save(state, buffer)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(buffer.getbuffer())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def list_checkpoints(save_dir, prefix="checkpoint"):
+    """(timesteps, path) of every checkpoint in save_dir, oldest first."""
+    found = []
+    for path in glob.glob(os.path.join(save_dir, f"{prefix}_*_steps.pt")):
+        match = CHECKPOINT_PATTERN.search(path)
+        if match:
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def latest_checkpoint(save_dir, prefix="checkpoint"):
+    checkpoints = list_checkpoints(save_dir, prefix)
+    return checkpoints[-1][1] if checkpoints else None
+
+
+def load_checkpoint(model, path):
+    """Restores a snapshot into an already built model with the same architecture. Returns its timestep count."""
+    state = th.load(path, map_location="cpu", weights_only=False)
+    model.policy.load_state_dict(state["policy"])
+    model.policy.optimizer.load_state_dict(state["optimizer"])
+    model.num_timesteps = state["num_timesteps"]
+    vec_normalize = model.get_vec_normalize_env()
+    if vec_normalize is not None and state["vec_normalize"] is not None:
+        stats = pickle.loads(state["vec_normalize"])
+        vec_normalize.obs_rms = stats["obs_rms"]
+        vec_normalize.ret_rms = stats["ret_rms"]
+    return model.num_timesteps
+
+
+class AsyncCheckpointCallback(BaseCallback):
+    """
+    Writes save_dir/{prefix}_{timesteps}_steps.pt every `save_every` timesteps and once when training ends.
+    Retention: the `keep_last` newest checkpoints are kept, plus one every `keep_every` timesteps if given;
+    older ones are deleted by the writer thread after each save.
+    """
+    def __init__(self, save_dir, save_every=50000, keep_last=3, keep_every=None, prefix="checkpoint", verbose=0):
+        super().__init__(verbose)
+        self.save_dir = save_dir
+        self.save_every = save_every
+        self.keep_last = keep_last
+        self.keep_every = keep_every
+        self.prefix = prefix
+        self.last_save = 0
+        self.executor = None
+        self.pending = []
+
+    def _on_training_start(self):
+        os.makedirs(self.save_dir, exist_ok=True)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="checkpoint")
+        self.last_save = self.num_timesteps
+
+    def _save(self):
+        start = time.perf_counter()
+        state = snapshot(self.model)
+        path = os.path.join(self.save_dir, f"{self.prefix}_{self.num_timesteps}_steps.pt")
+        self.pending = [future for future in self.pending if not future.done()]
+        self.pending.append(self.executor.submit(self._write, state, path))
+        self.last_save = self.num_timesteps
+        self.logger.record("checkpoint/snapshot_ms", 1000 * (time.perf_counter() - start))
+
+    def _write(self, state, path):
+        write_checkpoint(state, path)
+        self._prune()
+        if self.verbose >= 1:
+            print(f"Checkpoint: wrote {path}")
+
+    def _prune(self):
+        # the oldest checkpoint of each keep_every window survives as a milestone
+        checkpoints = list_checkpoints(self.save_dir, self.prefix)
+        milestones = set()
+        for steps, path in checkpoints[:max(len(checkpoints) - self.keep_last, 0)]:
+            if self.keep_every and steps // self.keep_every not in milestones:
+                milestones.add(steps // self.keep_every)
+                continue
+            os.remove(path)
+
+    def _on_step(self):
+        if self.num_timesteps - self.last_save >= self.save_every:
+            self._save()
+        return True
+
+    def _on_training_end(self):
+        if self.num_timesteps != self.last_save:
+            self._save()
+        # the last write has to land before the process exits
+        self.executor.shutdown(wait=True)
+        for future in self.pending:
+            future.result()
+        self.pending = []
@@ -0,0 +1,573 @@
+import time
+import numpy as np
+
+"""
+The Engine Core (No Graphics, No Frameworks)
+
+Role: The Physics Engine: the game rules, board constants and observation buffers, with NumPy as the only dependency.
+
+Key Code: class TronGame:, class GameState:
+
+Goal: Inputs: Actions (0-4). Outputs: New Grid + Who Died.
+      Workers, replays and the game server import this in a fraction of the time PettingZoo / Gymnasium take;
+      tron_env.TronEnv is the same game behind the PettingZoo ParallelEnv interface.
+"""
+
+# --- MAP VALUE CONSTANTS ---
+VAL_EMPTY  = 0
+VAL_WALL   = 1
+VAL_BOOST  = 2
+VAL_MY_HEAD = 3  
+VAL_ENEMY_HEAD = 4
+VAL_TRAIL_P1 = 5
+VAL_TRAIL_P2 = 6
+
+# --- ACTION MAPPING CONSTANTS ---
+ACT_UP    = 0
+ACT_DOWN  = 1
+ACT_LEFT  = 2
+ACT_RIGHT = 3
+
+# movement lookup tables (indexed by ACT_*): x grows to the right, y grows downwards
+MOVE_DX = np.array([0, 0, -1, 1], dtype=np.int64)
+MOVE_DY = np.array([-1, 1, 0, 0], dtype=np.int64)
+OPPOSITE = np.array([ACT_DOWN, ACT_UP, ACT_RIGHT, ACT_LEFT], dtype=np.int64)
+# the same tables as Python lists, for the per-agent loop in TronGame.step
+_MOVE_DX, _MOVE_DY, _OPPOSITE = MOVE_DX.tolist(), MOVE_DY.tolist(), OPPOSITE.tolist()
+
+TRAIL_OFF = 0
+TRAIL_ON  = 1
+
+BOOST_NO  = 0
+BOOST_YES = 1
+
+# sizes of the action components: move, trail, boost (a MultiDiscrete space in the adapters)
+ACTION_NVEC = np.array([4, 2, 2], dtype=np.int64)
+
+# --- PLAYERS ---
+# head / trail value of player i (index 0 = player_1); players 1 and 2 keep the original values
+MAX_PLAYERS = 8
+HEAD_VALS = np.array([VAL_MY_HEAD, VAL_ENEMY_HEAD, 7, 9, 11, 13, 15, 17], dtype=np.uint8)
+TRAIL_VALS = np.array([VAL_TRAIL_P1, VAL_TRAIL_P2, 8, 10, 12, 14, 16, 18], dtype=np.uint8)
+N_CELL_VALUES = 19
+NO_HEADING = 4  # heading of an agent that has not moved yet (only player 1 spawns facing left)
+
+
+def build_obs_lut(agent, n_players=2):
+    # maps every grid value to its 7-channel observation row (0 or 255), from the point of view of player `agent`
+    # (an index, 0 = player_1); every other player counts as the enemy
+    # channel 4 (energy) does not depend on the grid and is filled separately
+    lut = np.zeros((N_CELL_VALUES, 7), dtype=np.uint8)
+    lut[VAL_WALL, 0] = 255
+    lut[VAL_BOOST, 3] = 255
+    for i in range(n_players):
+        lut[HEAD_VALS[i], 1 if i == agent else 2] = 255
+        lut[TRAIL_VALS[i], 5 if i == agent else 6] = 255
+    return lut
+
+
+# --- EGOCENTRIC OBSERVATION ---
+# view channels: wall (the outside of the board counts as wall), enemy head, boost, my trail, enemy trail
+EGO_CHANNELS = [0, 2, 3, 5, 6]
+# vector: boosts / 10, trail on, heading one-hot (4), enemy forward / right offset (board-normalised), enemy alive
+EGO_VECTOR_SIZE = 9
+EGO_DTYPES = {"view": np.uint8, "vector": np.float32}
+
+# --- TERRITORY FEATURES (territory=True) ---
+# extra grid channels: my Voronoi territory, enemy territory
+TERRITORY_CHANNELS = 2
+# extra egocentric scalars: my / enemy reachable area, my / enemy territory, as fractions of the board
+TERRITORY_VECTOR_SIZE = 4
+TERRITORY_KEYS = ["reachable_area", "enemy_reachable_area", "territory", "enemy_territory"]
+
+
+def build_ego_offsets(radius):
+    # world (dx, dy) offset of every view cell for each heading, shape (4, 2r+1, 2r+1)
+    # row 0 is straight ahead of the head, column 0 is on its left, the head sits in the centre
+    forward = radius - np.arange(2 * radius + 1)[:, None]
+    right = np.arange(2 * radius + 1)[None, :] - radius
+    fx, fy = MOVE_DX[:, None, None], MOVE_DY[:, None, None]
+    return forward * fx - right * fy, forward * fy + right * fx
+
+
+def _read_only(array):
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class GameState:
+    """
+    A copy of everything TronGame.step reads and writes: the board, the per-agent arrays, who is still playing
+    and the state of the RNG that orders the moves. Taken with TronGame.snapshot(), applied with restore().
+    """
+    __slots__ = ("grid", "positions", "dirs", "boosts", "trails_active", "alive", "agents", "rng_state")
+
+    def __init__(self, grid, positions, dirs, boosts, trails_active, alive, agents, rng_state):
+        self.grid = grid
+        self.positions = positions
+        self.dirs = dirs
+        self.boosts = boosts
+        self.trails_active = trails_active
+        self.alive = alive
+        self.agents = agents
+        self.rng_state = rng_state
+
+
+class TronGame:
+    metadata = {"render_modes": ["human", "rgb_array"], "name": "tron_v0", "render_fps": 20}
+
+    def __init__(self, width=100, height=100, n_players=2, obs_mode="grid", view_radius=10, map_pool=None,
+                 n_walls=None, wall_length=5, n_boosts=None, territory=False, territory_every=1, profile=False,
+                 render_mode=None):
+        """
+        A width x height board for n_players (2 to 8) players: "player_1" ... "player_n", all free for all.
+        The game ends once at most one player is left; that player gets the winning reward.
+
+        obs_mode="grid" observes the whole board as a (width, height, 7) image.
+        obs_mode="egocentric" observes a (2r+1, 2r+1, 5) window around the own head, rotated so the
+        heading points up (r = view_radius), plus a small vector of scalars, as a dict {"view", "vector"}
+        (a Dict space in TronEnv).
+
+        map_pool (a tron_maps.MapPool) makes reset() copy a pre-generated layout instead of building one;
+        otherwise a layout with n_walls walls of wall_length cells and n_boosts boosts is generated per reset.
+        n_walls / n_boosts default to 10 per 100x100 cells, so the map density stays the same on any board
+        (no walls on boards too small to keep them away from the spawns).
+
+        territory=True tracks every agent's reachable area and Voronoi territory (a tron_territory.TerritoryTracker):
+        the cell counts go into infos[agent] every step, grid observations gain 2 planes (my / enemy territory)
+        and the egocentric vector 4 scalars. Territory is recomputed every territory_every steps.
+
+        profile=True keeps per-phase timers and event counters in self.stats (a tron_stats.TronStats).
+
+        render_mode="rgb_array" makes render() return the board as an RGB array without opening a window;
+        "human" (or None) draws it with the OpenGL TronRenderer.
+        """
+        if obs_mode not in ("grid", "egocentric"):
+            raise ValueError(f"Unknown obs_mode {obs_mode!r}, expected 'grid' or 'egocentric'")
+        if not 2 <= n_players <= MAX_PLAYERS:
+            raise ValueError(f"n_players must be between 2 and {MAX_PLAYERS}, got {n_players}")
+        from tron_maps import default_counts, default_spawns
+        self.n_players = n_players
+        self.possible_agents = [f"player_{i + 1}" for i in range(n_players)]
+        self.agent_ids = {agent: i for i, agent in enumerate(self.possible_agents)}
+        self.agents = []
+        self.width = width
+        self.height = height
+        self.obs_mode = obs_mode
+        self.view_radius = view_radius
+        self.map_pool = map_pool
+        self.render_mode = render_mode
+        self.spawns = np.array(default_spawns(width, height, n_players), dtype=np.int64)
+        default_walls, default_boosts = default_counts(width, height, wall_length, self.spawns.tolist())
+        self.n_walls = default_walls if n_walls is None else n_walls
+        self.wall_length = wall_length
+        self.n_boosts = default_boosts if n_boosts is None else n_boosts
+        self.spawn_dirs = np.full(n_players, NO_HEADING, dtype=np.int64)
+        self.spawn_dirs[0] = ACT_LEFT
+
+        # --- AGENT STATE (struct of arrays, indexed by agent id = position in possible_agents) ---
+        self.positions = np.zeros((n_players, 2), dtype=np.int64)
+        self.dirs = np.zeros(n_players, dtype=np.int64)            # current facing, NO_HEADING before the first move
+        self.boosts = np.zeros(n_players, dtype=np.float64)         # energy counter
+        self.trails_active = np.zeros(n_players, dtype=bool)        # toggle state
+        self.alive = np.zeros(n_players, dtype=bool)
+        # per grid value: owning player of a head / whether it is a trail (Python lists, read once per move)
+        self._head_owner = [-1] * N_CELL_VALUES
+        self._is_trail = [False] * N_CELL_VALUES
+        for i in range(n_players):
+            self._head_owner[HEAD_VALS[i]] = i
+            self._is_trail[TRAIL_VALS[i]] = True
+        if map_pool is not None and (map_pool.width, map_pool.height) != (self.width, self.height):
+            raise ValueError(f"Map pool holds {map_pool.width}x{map_pool.height} maps, the board is {self.width}x{self.height}")
+        self.np_random = np.random.default_rng()
+        self.stats = None
+        if profile:
+            from tron_stats import TronStats
+            self.stats = TronStats()
+        self.territory = None
+        if territory:
+            from tron_territory import TerritoryTracker
+            self.territory = TerritoryTracker(self.width, self.height, n_players, territory_every)
+        self.grid = np.zeros((self.width, self.height), dtype=np.uint8)
+        # True after restore() or an observation-free step: observation buffers / territory no longer match the grid
+        self._stale = False
+        
+        # 6 grid elements (channels): empty, wall, boost, my character, enemy character
+        # each value will take value of 0 or 1, 0 or 255 for AI to process in CNN
+        # 7 observation space items are no wall, wall, trail 1, trail 2, player 1, player 2, boost
+        # observation shape: one array for "grid", a dict of arrays (dtypes in EGO_DTYPES) for "egocentric"
+        n_channels = 7 + (TERRITORY_CHANNELS if territory else 0)
+        vector_size = EGO_VECTOR_SIZE + (TERRITORY_VECTOR_SIZE if territory else 0)
+        if obs_mode == "grid":
+            self.obs_shape = (self.width, self.height, n_channels)
+        else:
+            view_size = 2 * view_radius + 1
+            self.obs_shape = {"view": (view_size, view_size, len(EGO_CHANNELS)), "vector": (vector_size,)}
+        
+        self.renderer = None
+        
+        # persistent observation buffers, one per agent, patched cell by cell in step()
+        # (territory planes are not a function of the cell value: the LUT leaves them 0, step() rewrites them)
+        self.obs_luts = {agent: np.pad(build_obs_lut(i, n_players), ((0, 0), (0, n_channels - 7)))
+                         for i, agent in enumerate(self.possible_agents)}
+        if obs_mode == "grid":
+            self.obs_buffers = {agent: np.zeros((self.width, self.height, n_channels), dtype=np.uint8) for agent in self.possible_agents}
+            self.obs_views = {agent: _read_only(buffer) for agent, buffer in self.obs_buffers.items()}
+        else:
+            # egocentric windows are cut fresh from the grid, so nothing needs patching during step()
+            self.obs_buffers = {}
+            self.ego_luts = {agent: np.ascontiguousarray(lut[:, EGO_CHANNELS]) for agent, lut in self.obs_luts.items()}
+            self.ego_dx, self.ego_dy = build_ego_offsets(view_radius)
+            self.ego_buffers = {agent: {key: np.zeros(shape, dtype=EGO_DTYPES[key]) for key, shape in self.obs_shape.items()}
+                                for agent in self.possible_agents}
+            self.obs_views = {agent: {key: _read_only(buffer) for key, buffer in buffers.items()}
+                              for agent, buffers in self.ego_buffers.items()}
+    
+    def reset(self, seed=None, options=None):
+        stats = self.stats
+        if stats is not None:
+            reset_start = time.perf_counter()
+        # the seed drives the map, the in-step agent order and nothing else, so a seed fixes the whole game
+        if seed is not None:
+            self.np_random = np.random.default_rng(seed)
+        self.agents = self.possible_agents[:]
+        self.last_agent_order = []
+        
+        # walls + boosts come from the pool (one copy) or are generated on the spot
+        if self.map_pool is not None:
+            self.map_pool.copy_into(self.map_pool.sample(self.np_random), self.grid)
+        else:
+            from tron_maps import generate_layouts
+            self.grid[:] = generate_layouts(self.np_random, 1, self.width, self.height, n_walls=self.n_walls,
+                                            wall_length=self.wall_length, n_boosts=self.n_boosts,
+                                            spawns=self.spawns)[0]
+        
+        # spawn points (the map keeps them free and has no walls within 5 units)
+        self.grid[self.spawns[:, 0], self.spawns[:, 1]] = HEAD_VALS[:self.n_players]
+        self.positions[:] = self.spawns
+        self.dirs[:] = self.spawn_dirs
+        self.trails_active[:] = True
+        self.boosts[:] = 0
+        self.alive[:] = True
+            
+        infos = {a: {} for a in self.agents}
+        self._rebuild(infos)
+        
+        if stats is not None:
+            stats.count("resets")
+            stats.add_time("reset", reset_start)
+                
+        return ({a: self.observe(a) for a in self.agents}, infos)
+        
+        
+        
+    def step(self, actions, agent_order=None, observe=True):
+        """
+        Advances the game by one tick. Agents act one after the other in a random order
+        (drawn from self.np_random); agent_order forces that order instead, e.g. when replaying a game.
+        The order used is kept in self.last_agent_order.
+
+        observe=False only plays the rules (for search: snapshot(), a few steps, restore()): no observations
+        (an empty dict is returned), no territory, no stats. Observation buffers and territory are rebuilt
+        from the grid on the next observing step or observe() call.
+        """
+        rewards = {}
+        terminations = {}
+        # (We assume everyone survives and gets 0 points initially)
+        rewards = {a: 0 for a in self.possible_agents}
+        terminations = {a: False for a in self.possible_agents}
+        truncations = {a: False for a in self.possible_agents}
+        infos = {a: {} for a in self.possible_agents}
+        
+        died_this_step = []
+        
+        if not observe:
+            self._stale = True
+        elif self._stale:
+            self._rebuild({})
+        stats = self.stats if observe else None
+        if stats is not None:
+            move_start = time.perf_counter()
+            stats.count("steps")
+        
+        if agent_order is None:
+            agents_order = self.agents[:]
+            # Correct
+            self.np_random.shuffle(agents_order)
+        else:
+            agents_order = list(agent_order)
+        self.last_agent_order = agents_order
+        
+        grid = self.grid
+        head_owner, is_trail = self._head_owner, self._is_trail
+        for agent in agents_order:
+            i = self.agent_ids[agent]
+            
+            action = actions[agent]
+            current_move_cmd = int(action[0])
+            
+            trail_cmd = int(action[1])
+            self.trails_active[i] = trail_cmd
+            
+            boost_cmd = int(action[2])
+            if boost_cmd == BOOST_YES and self.boosts[i] >= 1:
+                # using one of the boosts
+                self.boosts[i] -= 1
+                self._update_energy(agent)
+                if stats is not None:
+                    stats.count("boosts_used")
+            
+            prev_move_cmd = int(self.dirs[i])
+            final_move_cmd = current_move_cmd
+            
+            current_x, current_y = int(self.positions[i, 0]), int(self.positions[i, 1])
+            
+            # update grid based on movement (take into account the boost)
+            teleport = boost_cmd == BOOST_YES
+            move_distance = 3 if teleport else 1
+
+            # reversing into your own trail is ignored and costs a small penalty
+            if prev_move_cmd != NO_HEADING and _OPPOSITE[current_move_cmd] == prev_move_cmd:
+                final_move_cmd = prev_move_cmd
+                rewards[agent] -= 0.1
+            
+            final_x = current_x + _MOVE_DX[final_move_cmd] * move_distance
+            final_y = current_y + _MOVE_DY[final_move_cmd] * move_distance
+            if stats is not None and final_move_cmd != current_move_cmd:
+                stats.count("reversals")
+            
+            # hitting a wall
+            inside = 0 <= final_x < self.width and 0 <= final_y < self.height
+            cell = int(grid[final_x, final_y]) if inside else VAL_WALL
+            if cell == VAL_WALL:
+                terminations[agent] = True
+                died_this_step.append(agent)
+                rewards[agent] -= 10
+                if stats is not None:
+                    stats.count("deaths_wall")
+            
+            # hitting a trail
+            elif is_trail[cell]:
+                terminations[agent] = True
+                died_this_step.append(agent)
+                rewards[agent] -= 10
+                if stats is not None:
+                    stats.count("deaths_trail")
+                
+            # hitting an enemy head on or from the side
+            elif head_owner[cell] not in (-1, i):
+                terminations[agent] = True
+                rewards[agent] -= 5
+                if stats is not None:
+                    stats.count("head_hits")
+           
+            elif cell == VAL_EMPTY:
+                rewards[agent] += 0.05
+                
+            # update grid based on trail created behind the agent (a boost off the board lands nowhere)
+            if teleport and inside:
+                self._set_cell(final_x, final_y, HEAD_VALS[i])
+                
+            if trail_cmd == TRAIL_ON:
+                self._set_cell(current_x, current_y, TRAIL_VALS[i])
+            else:
+                self._set_cell(current_x, current_y, VAL_EMPTY)
+                
+            # check if the player went over a boost, if so increase total boosts by 1
+            if inside and grid[final_x, final_y] == VAL_BOOST:
+                self.boosts[i] = min(self.boosts[i] + 1.0, 10)
+                self._update_energy(agent)
+                rewards[agent] += 1.0
+                if stats is not None:
+                    stats.count("boosts_picked")
+            
+            self.positions[i] = final_x, final_y
+            self.dirs[i] = final_move_cmd
+                    
+        for agent_dead in died_this_step:
+            self.agents.remove(agent_dead)
+            self.alive[self.agent_ids[agent_dead]] = False
+        if died_this_step and len(self.agents) <= 1:
+            # game over for everybody; a last player standing gets the positive reward of winning the game
+            terminations = {a: True for a in self.possible_agents}
+            if len(self.agents) == 1:
+                rewards[self.agents[0]] += 10
+                
+        if stats is not None:
+            stats.add_time("move", move_start)
+        if not observe:
+            return {}, rewards, terminations, truncations, infos
+        if self.territory is not None:
+            if stats is not None:
+                territory_start = time.perf_counter()
+            recomputes = self.territory.update(self.grid, self.positions, self.alive)
+            self._update_territory(infos)
+            if stats is not None:
+                stats.count("territory_recomputes", recomputes)
+                stats.add_time("territory", territory_start)
+        if stats is not None:
+            observe_start = time.perf_counter()
+                
+        # We only generate vision for agents who are still alive
+        observations = {a: self.observe(a) for a in self.agents}
+        if stats is not None:
+            stats.add_time("observe", observe_start)
+        return observations, rewards, terminations, truncations, infos
+    
+    
+    def observe(self, agent, out=None):
+        """
+        Returns the (width, height, 7) observation of `agent`:
+        wall, my head, enemy head, boost, energy (boosts collected), my trail, enemy trail; each 0 or 255.
+        With territory=True two more planes follow: my Voronoi territory, enemy territory.
+
+        Without `out` this is a read-only view of the agent's persistent buffer, so it changes on the next step;
+        copy it (or pass `out`) to keep it. With `out` the observation is copied into that array instead.
+        """
+        if self._stale:
+            self._rebuild({})
+        if self.obs_mode == "egocentric":
+            self._observe_egocentric(agent)
+            if out is not None:
+                for key, buffer in self.ego_buffers[agent].items():
+                    np.copyto(out[key], buffer)
+                return out
+            return self.obs_views[agent]
+
+        if out is not None:
+            np.copyto(out, self.obs_buffers[agent])
+            return out
+        return self.obs_views[agent]
+
+    def _observe_egocentric(self, agent):
+        buffers = self.ego_buffers[agent]
+        i = self.agent_ids[agent]
+        x, y = self.positions[i]
+        heading = self.dirs[i]
+        # players spawn without a valid heading: show the window unrotated until they move
+        view_dir = heading if heading != NO_HEADING else ACT_UP
+
+        # cut the rotated window out of the grid, anything beyond the board reads as wall
+        xs = x + self.ego_dx[view_dir]
+        ys = y + self.ego_dy[view_dir]
+        inside = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        cells = np.where(inside, self.grid[np.clip(xs, 0, self.width - 1), np.clip(ys, 0, self.height - 1)], VAL_WALL)
+        np.take(self.ego_luts[agent], cells, axis=0, out=buffers["view"])
+
+        vector = buffers["vector"]
+        vector[:] = 0.0
+        vector[0] = self.boosts[i] / 10
+        vector[1] = float(self.trails_active[i])
+        if heading != NO_HEADING:
+            vector[2 + heading] = 1.0
+
+        enemy = self.nearest_enemy(i)
+        if enemy is not None:
+            ex, ey = self.positions[enemy]
+            dx, dy = ex - x, ey - y
+            fx, fy = MOVE_DX[view_dir], MOVE_DY[view_dir]
+            scale = max(self.width, self.height)
+            vector[6] = np.clip((dx * fx + dy * fy) / scale, -1.0, 1.0)   # ahead (+) / behind (-)
+            vector[7] = np.clip((dy * fx - dx * fy) / scale, -1.0, 1.0)   # right (+) / left (-)
+            vector[8] = 1.0
+
+        if self.territory is not None:
+            features = self.territory.features(i)
+            cells = self.width * self.height
+            vector[EGO_VECTOR_SIZE:] = [features[key] / cells for key in TERRITORY_KEYS]
+
+    def snapshot(self):
+        """The current game state as a GameState (a few small array copies, no observations)."""
+        return GameState(self.grid.copy(), self.positions.copy(), self.dirs.copy(), self.boosts.copy(),
+                         self.trails_active.copy(), self.alive.copy(), tuple(self.agents),
+                         self.np_random.bit_generator.state)
+
+    def restore(self, state):
+        """Puts the game back into a snapshot()ed state. Observations catch up lazily (see step(observe=False))."""
+        np.copyto(self.grid, state.grid)
+        np.copyto(self.positions, state.positions)
+        np.copyto(self.dirs, state.dirs)
+        np.copyto(self.boosts, state.boosts)
+        np.copyto(self.trails_active, state.trails_active)
+        np.copyto(self.alive, state.alive)
+        self.agents = list(state.agents)
+        self.np_random.bit_generator.state = state.rng_state
+        self._stale = True
+
+    def _rebuild(self, infos):
+        # observation buffers and territory from scratch; step() then only touches the cells that change
+        self._stale = False
+        for agent in self.obs_buffers:
+            np.take(self.obs_luts[agent], self.grid, axis=0, out=self.obs_buffers[agent])
+            self._update_energy(agent)
+        if self.territory is not None:
+            self.territory.reset(self.grid, self.positions, self.alive)
+            self._update_territory(infos)
+
+    def nearest_enemy(self, i):
+        # id of the closest other player still in the game (Manhattan distance), None if there is none
+        others = np.flatnonzero(self.alive)
+        others = others[others != i]
+        if len(others) == 0:
+            return None
+        return int(others[np.argmin(np.abs(self.positions[others] - self.positions[i]).sum(axis=1))])
+
+    def _set_cell(self, x, y, val):
+        # every grid write during a step goes through here so the observation buffers stay in sync
+        self.grid[x, y] = val
+        if self._stale:
+            return
+        if self.territory is not None:
+            self.territory.touch(x, y)
+        for agent in self.obs_buffers:
+            buffer = self.obs_buffers[agent]
+            energy = buffer[0, 0, 4]
+            buffer[x, y] = self.obs_luts[agent][val]
+            buffer[x, y, 4] = energy
+
+    def _update_territory(self, infos):
+        # cell counts for every agent's info, territory planes for the grid observation
+        for i, agent in enumerate(self.possible_agents):
+            if agent in infos:
+                infos[agent].update(self.territory.features(i))
+        if not self.obs_buffers:
+            return
+        owned = [self.territory.to_plane(bits) for bits in self.territory.owned]
+        anyone = np.zeros_like(owned[0])
+        for plane in owned:
+            anyone |= plane
+        for i, agent in enumerate(self.possible_agents):
+            buffer = self.obs_buffers[agent]
+            np.multiply(owned[i], 255, out=buffer[:, :, 7])
+            np.multiply(anyone & ~owned[i], 255, out=buffer[:, :, 8])
+
+    def _update_energy(self, agent):
+        if agent not in self.obs_buffers or self._stale:
+            return
+        # represents the number of energy boosts an agent has collected
+        self.obs_buffers[agent][:, :, 4] = np.uint8(255 * (self.boosts[self.agent_ids[agent]] / 10))
+        
+        
+    def render(self):
+        if self.render_mode == "rgb_array":
+            # headless: palette lookup on the grid, no pygame / GL involved
+            from tron_video import grid_to_rgb
+            return grid_to_rgb(self.grid)
+
+        if self.renderer is None:
+            from tron_renderer import TronRenderer
+            self.renderer = TronRenderer(self.width, self.height)
+
+        # FIX: Don't check for "is_open". Just render.
+        # The play.py script handles closing now.
+        self.renderer.render_frame(self.grid)
+            
+    def close(self):
+        if self.renderer:
+            self.renderer.close()
+            self.renderer = None
+    
+    def pop_stats(self):
+        # TronStats gathered since the last call (None when profiling is off)
+        return self.stats.pop() if self.stats is not None else None
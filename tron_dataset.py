@@ -0,0 +1,349 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+from tron_core import EGO_DTYPES
+
+"""
+Trajectory Dataset (Offline Experience)
+
+Role: Records (observation, action, reward, done) transitions of human games (play.py) and agent games
+      (watch_agent.py) into chunked on-disk shards, and streams them back as minibatches.
+
+Key Code: class ObsCodec:, class TrajectoryRecorder:, class TrajectoryDataset:, class TrajectoryIterable:
+
+Goal: Behavior cloning and offline RL on recorded games without holding the dataset in RAM. Image observations
+      are bit-packed (a 100x100 grid observation takes 8.75 KB instead of 70 KB), each shard is a directory of
+      .npy files read memory-mapped, and a batch only touches the pages of the rows it decodes.
+      TrajectoryIterable (a torch IterableDataset) is built on first access, so recording never loads torch.
+
+Usage: python tron_dataset.py datasets/human     # shards, transitions, episodes and size on disk
+"""
+
+FORMAT_VERSION = 1
+ENERGY_CHANNEL = 4  # the one grid plane that is not 0 / 255: boosts collected, the same value in every cell
+SHARD_SIZE = 4096   # transitions per shard
+WINDOW_SHARDS = 4   # shards shuffled together by iter_batches
+
+
+class ObsCodec:
+    """
+    Turns one observation of a TronGame into a few compact fields and batches of those fields back into
+    observations. Images (0 / 255 planes) become one bit per cell and channel, packed in the array's own
+    layout so that np.unpackbits lands every bit in place; a plane that holds one value everywhere (the grid's
+    energy) keeps its slot in the bits but is restored from a single stored byte. Everything else (the
+    egocentric vector) is stored as it is. Decoding gives back exactly the observation that was encoded.
+    """
+    def __init__(self, obs_mode, obs_shape):
+        self.obs_mode = obs_mode
+        self.obs_shape = obs_shape
+        if obs_mode == "grid":
+            self.images = {"obs": (tuple(obs_shape), [ENERGY_CHANNEL])}
+            self.raw = {}
+        else:
+            view = tuple(obs_shape["view"])
+            self.images = {"view": (view, [])}
+            self.raw = {"vector": (tuple(obs_shape["vector"]), EGO_DTYPES["vector"])}
+
+    @classmethod
+    def for_game(cls, game):
+        return cls(game.obs_mode, game.obs_shape)
+
+    def spec(self):
+        # what meta.json stores: enough to rebuild the codec
+        if self.obs_mode == "grid":
+            return {"obs_mode": self.obs_mode, "obs_shape": list(self.obs_shape)}
+        return {"obs_mode": self.obs_mode, "obs_shape": {key: list(shape) for key, shape in self.obs_shape.items()}}
+
+    @classmethod
+    def from_spec(cls, spec):
+        shape = spec["obs_shape"]
+        return cls(spec["obs_mode"], tuple(shape) if spec["obs_mode"] == "grid" else shape)
+
+    def fields(self):
+        """name -> (per-row shape, dtype) of every stored observation field."""
+        fields = {}
+        for key, (shape, constant) in self.images.items():
+            fields[f"{key}_bits"] = ((int(np.prod(shape)) + 7) // 8,), np.uint8
+            if constant:
+                fields[f"{key}_const"] = (len(constant),), np.uint8
+        for key, (shape, dtype) in self.raw.items():
+            fields[key] = shape, dtype
+        return fields
+
+    def encode(self, obs, out):
+        # writes one observation into the row views in `out` (name -> array of the field's per-row shape)
+        for key, (shape, constant) in self.images.items():
+            image = obs if self.obs_mode == "grid" else obs[key]
+            out[f"{key}_bits"][:] = np.packbits(image != 0, axis=None)
+            if constant:
+                out[f"{key}_const"][:] = image[0, 0, constant]
+        for key in self.raw:
+            out[key][:] = obs[key]
+
+    def decode(self, fields):
+        """Observations of a batch of rows (name -> (B, ...) arrays): one (B, ...) array, or a dict for egocentric."""
+        obs = {}
+        for key, (shape, constant) in self.images.items():
+            bits = fields[f"{key}_bits"]
+            image = np.unpackbits(bits, axis=1, count=int(np.prod(shape))).reshape(len(bits), *shape)
+            image *= np.uint8(255)
+            if constant:
+                image[..., constant] = fields[f"{key}_const"][:, None, None, :]
+            obs[key] = image
+        for key in self.raw:
+            obs[key] = np.asarray(fields[key])
+        return obs["obs"] if self.obs_mode == "grid" else obs
+
+
+def _shard_dirs(path):
+    # complete shards only: a shard directory is renamed into place once all of its files are written
+    if not os.path.isdir(path):
+        return []
+    return sorted(os.path.join(path, name) for name in os.listdir(path) if name.startswith("shard_"))
+
+
+def _read_meta(path):
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta["version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dataset version {meta['version']}")
+    return meta
+
+
+class TrajectoryRecorder:
+    """
+    Appends transitions of one player to the dataset directory `path`, SHARD_SIZE rows per shard:
+        recorder = TrajectoryRecorder("datasets/human", env)   # a TronGame / TronEnv (the wrapper's .env)
+        recorder.add_obs(obs)                                  # before the step: the observation acted on
+        recorder.add_step(action, reward, done)                # after it: what happened
+        recorder.close()                                       # writes the last, partial shard
+    add_obs encodes right away, so the read-only observation views of TronGame can be passed as they are.
+    Recorders started later (or in other processes) add new shards next to the existing ones.
+    """
+    def __init__(self, path, game, shard_size=SHARD_SIZE):
+        self.path = path
+        self.codec = ObsCodec.for_game(game)
+        self.shard_size = shard_size
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        meta = {"version": FORMAT_VERSION, **self.codec.spec()}
+        if os.path.exists(meta_path):
+            existing = _read_meta(path)
+            if existing != meta:
+                raise ValueError(f"{path} holds {existing['obs_mode']} observations of shape {existing['obs_shape']}, "
+                                 f"this game has {meta['obs_mode']} {meta['obs_shape']}")
+        else:
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+
+        layout = dict(self.codec.fields())
+        layout["actions"] = (3,), np.uint8
+        layout["rewards"] = (), np.float32
+        layout["dones"] = (), np.bool_
+        self.buffers = {name: np.zeros((shard_size, *shape), dtype=dtype) for name, (shape, dtype) in layout.items()}
+        self.n = 0
+        self.pending_obs = False
+        self.shards_written = 0
+
+    def add_obs(self, obs):
+        self.codec.encode(obs, {name: self.buffers[name][self.n] for name in self.codec.fields()})
+        self.pending_obs = True
+
+    def add_step(self, action, reward, done):
+        if not self.pending_obs:
+            raise RuntimeError("add_obs() has to come before every add_step()")
+        self.buffers["actions"][self.n] = action
+        self.buffers["rewards"][self.n] = reward
+        self.buffers["dones"][self.n] = done
+        self.pending_obs = False
+        self.n += 1
+        if self.n == self.shard_size:
+            self.flush()
+
+    def flush(self):
+        # write the buffered rows as a new shard: files go to a temporary directory renamed into place
+        if self.n == 0:
+            return
+        tmp = os.path.join(self.path, f".tmp_{os.getpid()}_{id(self)}")
+        os.makedirs(tmp, exist_ok=True)
+        for name, buffer in self.buffers.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), buffer[:self.n])
+        index = len(_shard_dirs(self.path))
+        while True:
+            try:
+                os.rename(tmp, os.path.join(self.path, f"shard_{index:06d}"))
+                break
+            except OSError:
+                # another recorder took that number first
+                index += 1
+        self.n = 0
+        self.shards_written += 1
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryDataset:
+    """
+    Read side of a dataset directory: every shard memory-mapped, nothing decoded until a batch is asked for.
+    len(dataset) is the number of transitions; batch(indices) decodes any rows; iter_batches streams them.
+    """
+    def __init__(self, path):
+        self.path = path
+        meta = _read_meta(path)
+        self.codec = ObsCodec.from_spec(meta)
+        self.shards = [{name[:-len(".npy")]: np.load(os.path.join(shard, name), mmap_mode="r")
+                        for name in os.listdir(shard) if name.endswith(".npy")}
+                       for shard in _shard_dirs(path)]
+        self.sizes = np.array([len(shard["actions"]) for shard in self.shards], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(self.sizes)])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def _rows(self, shard, rows):
+        fields = {name: shard[name][rows] for name in self.codec.fields()}
+        return {
+            "obs": self.codec.decode(fields),
+            "actions": shard["actions"][rows].astype(np.int64),
+            "rewards": np.asarray(shard["rewards"][rows]),
+            "dones": np.asarray(shard["dones"][rows]),
+        }
+
+    def batch(self, indices):
+        """Decodes the transitions at the given global indices, in that order."""
+        indices = np.asarray(indices, dtype=np.int64)
+        shard_ids = np.searchsorted(self.offsets, indices, side="right") - 1
+        parts, order = [], []
+        for s in np.unique(shard_ids):
+            picked = np.flatnonzero(shard_ids == s)
+            parts.append(self._rows(self.shards[s], indices[picked] - self.offsets[s]))
+            order.append(picked)
+        return _concat(parts, np.argsort(np.concatenate(order)))
+
+    def iter_batches(self, batch_size=256, shuffle=True, seed=None, shards=None, drop_last=False):
+        """
+        Yields decoded minibatches (dicts of NumPy arrays: obs, actions, rewards, dones).
+        Shuffling is two-level: shards in random order, rows in random order within a shard, and
+        batches are cut from a window of WINDOW_SHARDS shards, so reads stay local to a few files.
+        Rows left over at the end of a window start the next one, so a pass over n rows yields
+        ceil(n / batch_size) batches (n // batch_size with drop_last), all full but the last.
+        `shards` restricts the pass to those shard indices (used to split the work between loader workers).
+        """
+        rng = np.random.default_rng(seed)
+        shard_ids = np.arange(len(self.shards)) if shards is None else np.asarray(shards)
+        if shuffle:
+            shard_ids = rng.permutation(shard_ids)
+        carry = np.zeros(0, dtype=np.int64)
+        for start in range(0, len(shard_ids), WINDOW_SHARDS):
+            window = shard_ids[start:start + WINDOW_SHARDS]
+            indices = np.concatenate([self.offsets[s] + np.arange(self.sizes[s]) for s in window])
+            if shuffle:
+                indices = rng.permutation(indices)
+            indices = np.concatenate([carry, indices])
+            stop = len(indices) - len(indices) % batch_size
+            for first in range(0, stop, batch_size):
+                yield self.batch(indices[first:first + batch_size])
+            carry = indices[stop:]
+        if len(carry) and not drop_last:
+            yield self.batch(carry)
+
+
+def _concat(parts, order):
+    # joins per-shard batches and puts the rows back into the requested order
+    if len(parts) == 1:
+        joined = parts[0]
+    else:
+        joined = {}
+        for key in parts[0]:
+            if isinstance(parts[0][key], dict):
+                joined[key] = {k: np.concatenate([p[key][k] for p in parts]) for k in parts[0][key]}
+            else:
+                joined[key] = np.concatenate([p[key] for p in parts])
+    if np.array_equal(order, np.arange(len(order))):
+        return joined
+    return {key: ({k: v[order] for k, v in value.items()} if isinstance(value, dict) else value[order])
+            for key, value in joined.items()}
+
+
+def _build_iterable():
+    import torch
+    from torch.utils.data import IterableDataset, get_worker_info
+
+    class TrajectoryIterable(IterableDataset):
+        """
+        A TrajectoryDataset as a torch IterableDataset of ready-made minibatches (dicts of tensors), for
+        DataLoader(..., batch_size=None). With num_workers > 0 every worker streams its own share of the shards.
+        Each pass reshuffles (seed + epoch).
+        """
+        def __init__(self, path, batch_size=256, shuffle=True, seed=0, drop_last=False):
+            super().__init__()
+            self.path = path
+            self.batch_size = batch_size
+            self.shuffle = shuffle
+            self.seed = seed
+            self.drop_last = drop_last
+            self.epoch = 0
+            self.dataset = None
+
+        def __len__(self):
+            # minibatches per pass, what len(DataLoader(..., batch_size=None)) reports
+            # (with num_workers > 0 each worker may end on a partial batch of its own)
+            n = len(self._dataset())
+            return n // self.batch_size if self.drop_last else -(-n // self.batch_size)
+
+        def _dataset(self):
+            # opened lazily so every worker process maps the shards itself
+            if self.dataset is None:
+                self.dataset = TrajectoryDataset(self.path)
+            return self.dataset
+
+        def __iter__(self):
+            dataset = self._dataset()
+            shards = np.arange(len(dataset.shards))
+            if self.shuffle:
+                shards = np.random.default_rng((self.seed, self.epoch)).permutation(shards)
+            worker = get_worker_info()
+            if worker is not None:
+                shards = shards[worker.id::worker.num_workers]
+            seed = (self.seed, self.epoch, 0 if worker is None else worker.id)
+            self.epoch += 1
+            for batch in dataset.iter_batches(self.batch_size, self.shuffle, seed, shards, self.drop_last):
+                yield _to_torch(batch, torch)
+
+    return TrajectoryIterable
+
+
+def _to_torch(batch, torch):
+    return {key: ({k: torch.from_numpy(v) for k, v in value.items()} if isinstance(value, dict)
+                  else torch.from_numpy(value))
+            for key, value in batch.items()}
+
+
+def __getattr__(name):
+    # the torch dataset is only built on first use, so play.py / watch_agent.py can record without torch
+    if name == "TrajectoryIterable":
+        globals()[name] = _build_iterable()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a recorded trajectory dataset.")
+    parser.add_argument("path", help="Dataset directory (written by TrajectoryRecorder)")
+    args = parser.parse_args()
+
+    dataset = TrajectoryDataset(args.path)
+    size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(args.path) for name in names)
+    episodes = sum(int(np.count_nonzero(shard["dones"])) for shard in dataset.shards)
+    print(f"{args.path}: {dataset.codec.obs_mode} observations, {len(dataset.shards)} shards, "
+          f"{len(dataset)} transitions, {episodes} finished episodes, {size / 1e6:.1f} MB")
@@ -0,0 +1,311 @@
+import argparse
+import glob
+import itertools
+import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from tron_bots import BOTS, BatchBot
+
+"""
+The Tournament Evaluator (No Graphics)
+
+Role: Plays thousands of headless games between saved checkpoints and built-in bots and reports
+      win / draw / loss rates with confidence intervals and an Elo table.
+
+Key Code: class PolicyPlayer:, play_match(task), fit_elo(...)
+
+Goal: Every match runs on a TronBatchEnv, so one policy forward pass answers for all concurrent games
+      of a seat, and matches are spread over a process pool. Each pairing plays half of its games
+      from each seat, since player 1 and player 2 do not start in the same situation.
+
+Usage:
+    python tron_eval.py --models models/PPO --bots random wall_avoider --games 1000
+    python tron_eval.py --models a.zip b.zip --games 4000 --workers 8 --output eval.json
+"""
+
+Z_95 = 1.96
+
+
+# --- PLAYERS (each returns (N, 3) actions for its seat `agent` of every game) ---
+
+class BotPlayer:
+    """A scripted bot from tron_bots, playing its seat in every game of the batch."""
+    def __init__(self, name, seed=None):
+        self.bot = BatchBot(name, seed=seed)
+
+    def __call__(self, env, agent, obs=None):
+        return self.bot.act(env, agent)
+
+
+class PolicyPlayer:
+    """
+    A saved PPO checkpoint. One predict() call covers the seat in every game of the batch.
+    Only grid-observation models can play, since TronBatchEnv has no egocentric mode.
+    """
+    def __init__(self, path, deterministic=True, device="cpu"):
+        from gymnasium import spaces
+        from stable_baselines3 import PPO
+        from stable_baselines3.common.preprocessing import is_image_space, is_image_space_channels_first
+        self.path = path
+        self.policy = PPO.load(path, device=device).policy
+        self.policy.set_training_mode(False)
+        self.deterministic = deterministic
+        space = self.policy.observation_space
+        if isinstance(space, spaces.Dict):
+            raise ValueError(f"{path} was trained on egocentric (Dict) observations; "
+                             f"tournaments play on TronBatchEnv, which only has grid observations")
+        # SB3 trained on channels-first copies of the (W, H, 7) grid; predict() transposes env-layout input itself
+        transposed = is_image_space(space, check_channels=False) and is_image_space_channels_first(space)
+        self.obs_shape = tuple(int(n) for n in ((*space.shape[1:], space.shape[0]) if transposed else space.shape))
+
+    def check_board(self, width, height):
+        """Raises ValueError unless the checkpoint plays on a width x height TronBatchEnv."""
+        if self.obs_shape[2] != 7:
+            raise ValueError(f"{self.path} takes {self.obs_shape[2]}-channel observations (frame-stacked?), "
+                             f"TronBatchEnv gives the 7-channel grid")
+        if self.obs_shape[:2] != (width, height):
+            raise ValueError(f"{self.path} was trained on a {self.obs_shape[0]}x{self.obs_shape[1]} board, "
+                             f"the tournament plays on {width}x{height}")
+
+    def __call__(self, env, agent, obs=None):
+        if obs is None:
+            obs = env.opponent_obs()
+        if obs.shape[1:] != self.obs_shape:
+            self.check_board(env.width, env.height)
+        actions, _ = self.policy.predict(obs, deterministic=self.deterministic)
+        return actions
+
+
+def player_name(spec):
+    return spec if spec in BOTS else os.path.splitext(os.path.basename(spec))[0]
+
+
+_PLAYERS = {}
+
+
+def load_player(spec, deterministic=True, seed=None):
+    # bots are built per match (seeded), checkpoints are cached per process so a worker loads each one once
+    if spec in BOTS:
+        return BotPlayer(spec, seed=seed)
+    key = (spec, deterministic)
+    if key not in _PLAYERS:
+        _PLAYERS[key] = PolicyPlayer(spec, deterministic=deterministic)
+    return _PLAYERS[key]
+
+
+# --- MATCHES ---
+
+def play_match(task):
+    """
+    Plays task["games"] games of task["players"][0] (player 1) against task["players"][1] (player 2)
+    on one TronBatchEnv of up to task["num_envs"] concurrent games.
+    Every game slot plays a fixed share of the games, so short games are not over-represented.
+    Returns (wins, draws, losses) of player 1.
+    """
+    from tron_batch_env import TronBatchEnv
+    from tron_maps import MapPool
+
+    p1 = load_player(task["players"][0], task["deterministic"], seed=[task["seed"], 1])
+    p2 = load_player(task["players"][1], task["deterministic"], seed=[task["seed"], 2])
+    n_games = task["games"]
+    num_envs = min(task["num_envs"], n_games)
+    map_pool = MapPool.load(task["map_pool"]) if task["map_pool"] else None
+    env = TronBatchEnv(num_envs, map_pool=map_pool, opponent=lambda env: p2(env, 1),
+                       max_episode_steps=task["max_steps"], seed=task["seed"])
+
+    quota = np.full(num_envs, n_games // num_envs)
+    quota[:n_games % num_envs] += 1
+    played = np.zeros(num_envs, dtype=np.int64)
+    counts = np.zeros(4, dtype=np.int64)  # indexed by TronBatchEnv.last_outcomes: -, p1 won, p2 won, draw
+    obs = env.reset()
+    while (played < quota).any():
+        obs, _, dones, _ = env.step(p1(env, 0, obs))
+        finished = np.flatnonzero(dones)
+        finished = finished[played[finished] < quota[finished]]
+        np.add.at(counts, env.last_outcomes[finished], 1)
+        played[finished] += 1
+    env.close()
+    return int(counts[1]), int(counts[3]), int(counts[2])
+
+
+def _init_worker():
+    # one torch thread per worker: the pool already uses every core
+    import torch
+    torch.set_num_threads(1)
+
+
+def build_tasks(specs, games, chunk, num_envs, max_steps, map_pool, deterministic, seed):
+    # every pairing, both seats, split into chunks so the pool stays busy
+    tasks = []
+    for a, b in itertools.combinations(specs, 2):
+        for seat, players in enumerate(((a, b), (b, a))):
+            remaining = games // 2 + (games % 2 if seat == 0 else 0)
+            while remaining > 0:
+                n = min(chunk, remaining)
+                tasks.append({"pair": (a, b), "swapped": seat == 1, "players": players, "games": n,
+                              "num_envs": num_envs, "max_steps": max_steps, "map_pool": map_pool,
+                              "deterministic": deterministic})
+                remaining -= n
+    for task, task_seed in zip(tasks, np.random.SeedSequence(seed).generate_state(len(tasks))):
+        task["seed"] = int(task_seed)
+    return tasks
+
+
+def run_tournament(specs, games=1000, workers=None, num_envs=256, chunk=None, max_steps=2000, map_pool=None,
+                   deterministic=True, seed=0):
+    """
+    Round robin between `specs` (checkpoint paths or bot names), `games` games per pairing.
+    Returns {(a, b): [wins, draws, losses] of a against b}.
+    Raises ValueError up front for checkpoints that cannot play on the board (egocentric, frame-stacked
+    or trained on another board size).
+    """
+    from tron_maps import MapPool
+    # checkpoints that cannot play on the board fail here, with the reason, instead of inside a worker
+    pool = MapPool.load(map_pool) if map_pool else None
+    width, height = (pool.width, pool.height) if pool is not None else (100, 100)
+    for spec in specs:
+        if spec not in BOTS:
+            load_player(spec, deterministic).check_board(width, height)
+
+    workers = workers or os.cpu_count() or 1
+    chunk = chunk or num_envs
+    tasks = build_tasks(specs, games, chunk, num_envs, max_steps, map_pool, deterministic, seed)
+    results = {pair: np.zeros(3, dtype=np.int64) for pair in itertools.combinations(specs, 2)}
+
+    def record(task, wdl):
+        wdl = np.array(wdl)
+        results[task["pair"]] += wdl[::-1] if task["swapped"] else wdl
+
+    if workers <= 1:
+        for task in tasks:
+            record(task, play_match(task))
+    else:
+        ctx = mp.get_context("forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn")
+        with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker) as pool:
+            for task, wdl in zip(tasks, pool.map(play_match, tasks)):
+                record(task, wdl)
+    return {pair: wdl.tolist() for pair, wdl in results.items()}
+
+
+# --- STATISTICS ---
+
+def wilson_interval(successes, n, z=Z_95):
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return float(centre - half), float(centre + half)
+
+
+def score_interval(wins, draws, losses, z=Z_95):
+    # mean game score (win 1, draw 0.5, loss 0) with a normal-approximation interval
+    n = wins + draws + losses
+    if n == 0:
+        return 0.5, 0.0, 1.0
+    mean = (wins + 0.5 * draws) / n
+    var = (wins + 0.25 * draws) / n - mean * mean
+    half = z * np.sqrt(max(var, 0.0) / n)
+    return float(mean), float(max(mean - half, 0.0)), float(min(mean + half, 1.0))
+
+
+def fit_elo(names, results, iterations=1000, prior_draws=1.0, mean_rating=1500.0):
+    """
+    Maximum-likelihood Elo ratings (Bradley-Terry, a draw counts as half a win for each side).
+    prior_draws virtual draws per pairing keep unbeaten players at a finite rating.
+    """
+    index = {name: i for i, name in enumerate(names)}
+    k = len(names)
+    score = np.zeros((k, k))
+    for (a, b), (w, d, l) in results.items():
+        i, j = index[a], index[b]
+        score[i, j] += w + 0.5 * (d + prior_draws)
+        score[j, i] += l + 0.5 * (d + prior_draws)
+    games = score + score.T
+    # Zermelo / minorisation-maximisation updates on the strengths 10^(rating / 400)
+    strength = np.ones(k)
+    for _ in range(iterations):
+        denom = (games / (strength[:, None] + strength[None, :])).sum(axis=1)
+        updated = score.sum(axis=1) / np.maximum(denom, 1e-12)
+        updated /= np.exp(np.log(updated).mean())
+        if np.allclose(updated, strength, rtol=1e-10):
+            break
+        strength = updated
+    ratings = 400.0 * np.log10(strength)
+    return {name: float(mean_rating + ratings[i] - ratings.mean()) for name, i in index.items()}
+
+
+def report(specs, results, elapsed=None):
+    names = [player_name(spec) for spec in specs]
+    named = {(player_name(a), player_name(b)): wdl for (a, b), wdl in results.items()}
+    rows = []
+    print(f"{'pairing':<44} {'games':>6} {'win':>6} {'draw':>6} {'loss':>6}   {'score [95% CI]':<22}")
+    for (a, b), (w, d, l) in named.items():
+        n = w + d + l
+        mean, low, high = score_interval(w, d, l)
+        win_low, win_high = wilson_interval(w, n)
+        rows.append({"player": a, "opponent": b, "games": n, "wins": w, "draws": d, "losses": l,
+                     "win_rate": w / max(n, 1), "draw_rate": d / max(n, 1), "loss_rate": l / max(n, 1),
+                     "win_rate_ci": [win_low, win_high], "score": mean, "score_ci": [low, high]})
+        print(f"{a + ' vs ' + b:<44} {n:>6} {w / max(n, 1):>6.1%} {d / max(n, 1):>6.1%} {l / max(n, 1):>6.1%}"
+              f"   {mean:.3f} [{low:.3f}, {high:.3f}]")
+
+    elo = fit_elo(names, named)
+    print(f"\n{'rank':<5} {'player':<32} {'elo':>7}")
+    for rank, (name, rating) in enumerate(sorted(elo.items(), key=lambda item: -item[1]), start=1):
+        print(f"{rank:<5} {name:<32} {rating:>7.0f}")
+    if elapsed is not None:
+        total = sum(row["games"] for row in rows)
+        print(f"\n{total} games in {elapsed:.1f} s ({total / max(elapsed, 1e-9):.0f} games/s)")
+    return {"pairings": rows, "elo": elo, "seconds": elapsed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless round-robin evaluation of Tron checkpoints and bots.")
+    parser.add_argument("--models", nargs="*", default=["models/PPO"],
+                        help="Checkpoints (.zip) or directories of checkpoints to evaluate")
+    parser.add_argument("--bots", nargs="*", default=list(BOTS), choices=list(BOTS),
+                        help="Scripted bots (tron_bots.py) to include")
+    parser.add_argument("--games", type=int, default=1000, help="Games per pairing (split evenly over both seats)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--num-envs", type=int, default=256, help="Concurrent games per match (one policy batch)")
+    parser.add_argument("--max-steps", type=int, default=2000, help="Games still running after this many steps are draws")
+    parser.add_argument("--map-pool", default=None, help="Pre-generated map pool (.npy from tron_maps.py)")
+    parser.add_argument("--stochastic", action="store_true", help="Sample policy actions instead of taking the argmax")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write the results as JSON here")
+    args = parser.parse_args()
+
+    specs = []
+    for path in args.models:
+        if os.path.isdir(path):
+            specs += sorted(glob.glob(os.path.join(path, "*.zip")))
+        elif os.path.exists(path):
+            specs.append(path)
+        else:
+            print(f"Skipping {path}: no such checkpoint or directory")
+    specs += args.bots
+    if len({player_name(spec) for spec in specs}) != len(specs):
+        parser.error("Players need distinct names (checkpoint file names collide)")
+    if len(specs) < 2:
+        parser.error("Need at least two players")
+
+    print(f"Round robin between {len(specs)} players, {args.games} games per pairing.")
+    start = time.perf_counter()
+    try:
+        results = run_tournament(specs, games=args.games, workers=args.workers, num_envs=args.num_envs,
+                                 max_steps=args.max_steps, map_pool=args.map_pool,
+                                 deterministic=not args.stochastic, seed=args.seed)
+    except ValueError as error:
+        parser.error(str(error))
+    summary = report(specs, results, elapsed=time.perf_counter() - start)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+        print(f"Results written to {args.output}")
@@ -0,0 +1,207 @@
+import argparse
+import json
+import time
+
+import numpy as np
+import torch as th
+from torch import nn
+
+"""
+Exported Policies (Standalone Inference)
+
+Role: Turns a trained PPO policy (.zip) into a TorchScript file that maps one raw observation straight to
+      the deterministic [move, trail, boost] action, and runs it with as little per-call work as possible.
+
+Key Code: export_policy(...), class PolicyRuntime:
+
+Goal: Single-digit-millisecond decisions on CPU for play.py / watch_agent.py. The exported graph already holds
+      SB3's preprocessing (HWC -> CHW, / 255) and the argmax over each action component, so a decision is one
+      copy into a preallocated input tensor and one frozen-graph call. Loading an export needs torch only,
+      not stable-baselines3.
+
+Usage:
+    python tron_export.py models/PPO/tron_v1.zip models/PPO/tron_v1.pt     # export, check and time it
+    python watch_agent.py --model models/PPO/tron_v1.pt
+    python play.py --policy models/PPO/tron_v1.pt
+"""
+
+META_FILE = "tron.json"  # extra file inside the TorchScript archive: observation layout of the inputs
+WARMUP_CALLS = 3         # the profiling executor specializes the graph during the first calls
+
+
+class _Actor(nn.Module):
+    # the deterministic half of an SB3 ActorCriticPolicy, taking env-layout observations as positional tensors
+    def __init__(self, policy, keys, transpose):
+        from stable_baselines3.common.preprocessing import preprocess_obs
+        super().__init__()
+        self.preprocess = preprocess_obs
+        self.features_extractor = policy.pi_features_extractor
+        self.mlp_extractor = policy.mlp_extractor
+        self.action_net = policy.action_net
+        self.observation_space = policy.observation_space
+        self.normalize_images = policy.normalize_images
+        self.keys = keys
+        self.transpose = transpose
+        self.nvec = [int(n) for n in policy.action_space.nvec]
+
+    def forward(self, *inputs):
+        tensors = [x.permute(0, 3, 1, 2) if t else x for x, t in zip(inputs, self.transpose)]
+        obs = tensors[0] if self.keys is None else dict(zip(self.keys, tensors))
+        features = self.features_extractor(self.preprocess(obs, self.observation_space, self.normalize_images))
+        logits = self.action_net(self.mlp_extractor.forward_actor(features))
+        return th.stack([split.argmax(dim=1) for split in th.split(logits, self.nvec, dim=1)], dim=1)
+
+
+def _inputs(policy):
+    # (key, env-layout shape, dtype, transpose) per input: SB3 trained on channels-first copies of image spaces
+    from gymnasium import spaces
+    from stable_baselines3.common.preprocessing import is_image_space, is_image_space_channels_first
+    space = policy.observation_space
+    items = space.spaces.items() if isinstance(space, spaces.Dict) else [(None, space)]
+    inputs = []
+    for key, sub in items:
+        transpose = is_image_space(sub, check_channels=False) and is_image_space_channels_first(sub)
+        shape = (*sub.shape[1:], sub.shape[0]) if transpose else sub.shape
+        inputs.append((key, tuple(int(n) for n in shape), np.dtype(sub.dtype).name, transpose))
+    return inputs
+
+
+def export_policy(model_path, out_path):
+    """
+    Traces the policy of a saved PPO model and writes it as TorchScript (frozen, CPU) to out_path.
+    Returns the metadata stored next to the graph: the observation inputs in the order forward() takes them.
+    The file holds the portable frozen graph only: optimize_for_inference output is tuned to the machine
+    it runs on and does not load back reliably, so PolicyRuntime applies it after loading.
+    """
+    from stable_baselines3 import PPO
+    policy = PPO.load(model_path, device="cpu").policy
+    policy.set_training_mode(False)
+    inputs = _inputs(policy)
+    keys = None if inputs[0][0] is None else [key for key, *_ in inputs]
+    actor = _Actor(policy, keys, [transpose for *_, transpose in inputs]).eval()
+    examples = tuple(th.zeros((1, *shape), dtype=getattr(th, dtype)) for _, shape, dtype, _ in inputs)
+    with th.no_grad():
+        module = th.jit.freeze(th.jit.trace(actor, examples))
+    meta = {
+        "obs_mode": "grid" if keys is None else "egocentric",
+        "inputs": [{"key": key, "shape": list(shape), "dtype": dtype} for key, shape, dtype, _ in inputs],
+        "nvec": actor.nvec,
+        "source": model_path,
+    }
+    th.jit.save(module, out_path, _extra_files={META_FILE: json.dumps(meta)})
+    return meta
+
+
+def configure_threads(threads):
+    # one sample per call: extra intra-op threads cost more in hand-offs than they save
+    th.set_num_threads(threads)
+    try:
+        th.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # only settable once per process, before any parallel work
+
+
+class PolicyRuntime:
+    """
+    An exported policy, ready to act on single observations:
+        runtime = PolicyRuntime("models/PPO/tron_v1.pt")
+        action = runtime.act(obs)   # obs exactly as TronEnv / the wrapper returns it
+    act() copies the observation into tensors allocated once at load time and returns the action
+    as a new int64 array [move, trail, boost].
+    optimize=True runs torch.jit.optimize_for_inference on the loaded graph (for this machine).
+    """
+    def __init__(self, path, threads=1, optimize=True):
+        configure_threads(threads)
+        extra = {META_FILE: ""}
+        self.module = th.jit.load(path, map_location="cpu", _extra_files=extra)
+        self.module.eval()
+        if optimize:
+            self.module = th.jit.optimize_for_inference(self.module)
+        meta = json.loads(extra[META_FILE])
+        self.obs_mode = meta["obs_mode"]
+        self.nvec = meta["nvec"]
+        self.keys = [item["key"] for item in meta["inputs"]]
+        self.inputs = [th.zeros((1, *item["shape"]), dtype=getattr(th, item["dtype"])) for item in meta["inputs"]]
+        # NumPy views of the input tensors (shared memory): filling them is all act() does before the call
+        self.arrays = [tensor.numpy()[0] for tensor in self.inputs]
+        if self.obs_mode == "grid":
+            self.obs_shape = tuple(meta["inputs"][0]["shape"])
+        else:
+            self.obs_shape = {item["key"]: tuple(item["shape"]) for item in meta["inputs"]}
+        for _ in range(WARMUP_CALLS):
+            self._run()
+
+    def env_kwargs(self):
+        # TronEnv / wrapper arguments that give observations of the exported shape
+        if self.obs_mode == "grid":
+            width, height, _ = self.obs_shape
+            return {"obs_mode": "grid", "width": width, "height": height}
+        return {"obs_mode": "egocentric", "view_radius": (self.obs_shape["view"][0] - 1) // 2}
+
+    def _run(self):
+        with th.inference_mode():
+            return self.module(*self.inputs)[0].numpy()
+
+    def act(self, obs):
+        if self.obs_mode == "grid":
+            np.copyto(self.arrays[0], obs)
+        else:
+            for key, array in zip(self.keys, self.arrays):
+                np.copyto(array, obs[key])
+        return self._run()
+
+    __call__ = act
+
+
+def _sample_obs(inputs, rng):
+    # random observations in env layout: 0 / 255 planes, vector in [-1, 1]
+    obs = {}
+    for key, shape, dtype, _ in inputs:
+        if dtype == "uint8":
+            obs[key] = (rng.random(shape) < 0.1).astype(np.uint8) * np.uint8(255)
+        else:
+            obs[key] = rng.uniform(-1, 1, shape).astype(dtype)
+    return obs if inputs[0][0] is not None else obs[None]
+
+
+def _latency_ms(fn, obs_list):
+    times = []
+    for obs in obs_list:
+        start = time.perf_counter()
+        fn(obs)
+        times.append(time.perf_counter() - start)
+    return 1000 * np.percentile(times, 50), 1000 * np.percentile(times, 99)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a trained PPO policy for fast CPU inference.")
+    parser.add_argument("model", help="Saved PPO model (.zip)")
+    parser.add_argument("output", help="TorchScript file to write (.pt)")
+    parser.add_argument("--threads", type=int, default=1, help="Torch CPU threads for the runtime")
+    parser.add_argument("--no-optimize", action="store_true",
+                        help="Skip torch.jit.optimize_for_inference in the runtime check (frozen graph only)")
+    parser.add_argument("--check", type=int, default=200,
+                        help="Compare this many random observations against SB3's predict() and time both (0 = skip)")
+    args = parser.parse_args()
+
+    meta = export_policy(args.model, args.output)
+    shapes = ", ".join(f"{item['key'] or 'obs'} {tuple(item['shape'])} {item['dtype']}" for item in meta["inputs"])
+    print(f"Exported {args.model} -> {args.output} ({meta['obs_mode']}: {shapes})")
+
+    if args.check > 0:
+        from stable_baselines3 import PPO
+        runtime = PolicyRuntime(args.output, threads=args.threads, optimize=not args.no_optimize)
+        policy = PPO.load(args.model, device="cpu").policy
+        policy.set_training_mode(False)
+        rng = np.random.default_rng(0)
+        inputs = _inputs(policy)
+        obs_list = [_sample_obs(inputs, rng) for _ in range(args.check)]
+        mismatches = sum(not np.array_equal(runtime.act(obs), policy.predict(obs, deterministic=True)[0])
+                         for obs in obs_list)
+        sb3_p50, sb3_p99 = _latency_ms(lambda obs: policy.predict(obs, deterministic=True), obs_list)
+        run_p50, run_p99 = _latency_ms(runtime.act, obs_list)
+        print(f"Actions differ from SB3 on {mismatches}/{args.check} observations")
+        print(f"SB3 predict: p50 {sb3_p50:.2f} ms, p99 {sb3_p99:.2f} ms | "
+              f"export ({args.threads} thread(s)): p50 {run_p50:.2f} ms, p99 {run_p99:.2f} ms")
+        if mismatches:
+            raise SystemExit(1)
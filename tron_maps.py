@@ -0,0 +1,188 @@
+import argparse
+import os
+import numpy as np
+
+from tron_core import VAL_EMPTY, VAL_WALL, VAL_BOOST
+
+"""
+The Map Generator (No Graphics)
+
+Role: Builds wall / boost layouts in bulk with a numpy Generator and keeps them in a memory-mapped pool.
+
+Key Code: generate_layouts(...), class MapPool:
+
+Goal: reset() becomes a copy out of the pool instead of a Python rejection loop,
+      and the same seed always gives the same map.
+
+Usage: python tron_maps.py maps/pool_100x100.npy --count 100000 --seed 0
+"""
+
+CHUNK_SIZE = 1024  # layouts generated per batch when writing a pool
+SPAWN_CLEARANCE = 5  # walls stay more than this many cells away from the spawns
+
+
+def default_spawns(width, height, n_players=2):
+    # the (30, 50) / (70, 50) spawn points of the 100x100 board, scaled to other sizes;
+    # more players spawn evenly on a ring around the centre, player 1 on the left
+    if n_players == 2:
+        return [(int(width * 0.3), height // 2), (int(width * 0.7), height // 2)]
+    angles = np.pi + 2 * np.pi * np.arange(n_players) / n_players
+    xs = np.round(width / 2 + 0.35 * width * np.cos(angles)).astype(int)
+    ys = np.round(height / 2 + 0.35 * height * np.sin(angles)).astype(int)
+    return list(zip(xs.tolist(), ys.tolist()))
+
+
+def default_counts(width, height, wall_length=5, spawns=None):
+    # 10 walls and 10 boosts on the 100x100 board, the same density on other sizes;
+    # no walls on boards too small to keep a wall away from the spawns (20x20 and below)
+    per_cell = 10 / (100 * 100)
+    n_walls = max(1, round(width * height * per_cell)) if has_wall_room(width, height, wall_length, spawns) else 0
+    return n_walls, max(1, round(width * height * per_cell))
+
+
+def _axis_starts(width, height, wall_length, spawns):
+    # allowed start columns / rows when every wall keeps out of the spawn lines
+    xs_allowed = np.arange(6, width - wall_length)
+    ys_allowed = np.arange(6, height - wall_length)
+    for sx, sy in spawns:
+        xs_allowed = xs_allowed[np.abs(xs_allowed - sx) > SPAWN_CLEARANCE]
+        ys_allowed = ys_allowed[np.abs(ys_allowed - sy) > SPAWN_CLEARANCE]
+    return xs_allowed, ys_allowed
+
+
+def has_wall_room(width, height, wall_length=5, spawns=None):
+    """Whether generate_layouts can place walls of wall_length cells on this board (see there)."""
+    if spawns is None:
+        spawns = default_spawns(width, height)
+    xs_allowed, ys_allowed = _axis_starts(width, height, wall_length, spawns)
+    if len(xs_allowed) > 0 and len(ys_allowed) > 0:
+        return True
+    return (len(_wall_starts(width, height, wall_length, spawns, horizontal=True)) > 0
+            and len(_wall_starts(width, height, wall_length, spawns, horizontal=False)) > 0)
+
+
+def _wall_starts(width, height, wall_length, spawns, horizontal):
+    # flat indices of the start cells whose whole wall stays outside the box around every spawn
+    xs = np.arange(width)[:, None]
+    ys = np.arange(height)[None, :]
+    allowed = (xs >= 6) & (xs < width - wall_length) & (ys >= 6) & (ys < height - wall_length)
+    long_x, long_y = (wall_length - 1, 0) if horizontal else (0, wall_length - 1)
+    for sx, sy in spawns:
+        near_x = (xs <= sx + SPAWN_CLEARANCE) & (xs + long_x >= sx - SPAWN_CLEARANCE)
+        near_y = (ys <= sy + SPAWN_CLEARANCE) & (ys + long_y >= sy - SPAWN_CLEARANCE)
+        allowed &= ~(near_x & near_y)
+    return np.flatnonzero(allowed)
+
+
+def generate_layouts(rng, count, width=100, height=100, n_walls=10, wall_length=5, n_boosts=10, spawns=None):
+    """
+    Returns `count` layouts as a (count, width, height) uint8 array holding only VAL_EMPTY, VAL_WALL and VAL_BOOST.
+    Same recipe as the original TronEnv.reset: a border wall, n_walls straight walls of wall_length cells
+    (alternating horizontal / vertical, kept more than 5 cells away from the spawn lines) and n_boosts boosts
+    on distinct free cells. Spawn cells are never covered. When the spawn lines leave no room (many players
+    on a small board), walls only keep out of the box around each spawn instead.
+    """
+    if spawns is None:
+        spawns = default_spawns(width, height)
+    layouts = np.zeros((count, width, height), dtype=np.uint8)
+    layouts[:, 0, :] = VAL_WALL
+    layouts[:, -1, :] = VAL_WALL
+    layouts[:, :, 0] = VAL_WALL
+    layouts[:, :, -1] = VAL_WALL
+
+    # --- WALLS ---
+    # the start cell constraints are independent in x and y, so sample each axis from its allowed values
+    xs_allowed, ys_allowed = _axis_starts(width, height, wall_length, spawns)
+    if n_walls > 0:
+        horizontal = (np.arange(n_walls) % 2 == 0)[None, :, None]
+        if len(xs_allowed) > 0 and len(ys_allowed) > 0:
+            rx = xs_allowed[rng.integers(len(xs_allowed), size=(count, n_walls))]
+            ry = ys_allowed[rng.integers(len(ys_allowed), size=(count, n_walls))]
+        else:
+            h_starts = _wall_starts(width, height, wall_length, spawns, horizontal=True)
+            v_starts = _wall_starts(width, height, wall_length, spawns, horizontal=False)
+            if len(h_starts) == 0 or len(v_starts) == 0:
+                raise ValueError(f"No room for walls on a {width}x{height} board")
+            starts = np.where(horizontal[..., 0], h_starts[rng.integers(len(h_starts), size=(count, n_walls))],
+                              v_starts[rng.integers(len(v_starts), size=(count, n_walls))])
+            rx, ry = np.divmod(starts, height)
+        step = np.arange(wall_length)[None, None, :]
+        wall_x = rx[:, :, None] + np.where(horizontal, step, 0)
+        wall_y = ry[:, :, None] + np.where(horizontal, 0, step)
+        maps = np.broadcast_to(np.arange(count)[:, None, None], wall_x.shape)
+        layouts[maps, wall_x, wall_y] = VAL_WALL
+
+    # --- BOOSTS ---
+    # random keys on every free cell, the n_boosts smallest keys pick distinct cells uniformly
+    if n_boosts > 0:
+        free = layouts == VAL_EMPTY
+        for sx, sy in spawns:
+            free[:, sx, sy] = False
+        keys = rng.random((count, width * height))
+        keys[~free.reshape(count, -1)] = np.inf
+        cells = np.argpartition(keys, n_boosts - 1, axis=1)[:, :n_boosts]
+        if np.isinf(np.take_along_axis(keys, cells, axis=1)).any():
+            raise ValueError(f"Not enough free cells for {n_boosts} boosts")
+        layouts.reshape(count, -1)[np.arange(count)[:, None], cells] = VAL_BOOST
+
+    return layouts
+
+
+class MapPool:
+    """
+    A (count, width, height) stack of pre-generated layouts, usually memory-mapped from a .npy file so
+    every worker process shares the same pages. Picking a map is an index, loading it is one copy.
+    """
+    def __init__(self, layouts):
+        self.layouts = layouts
+        self.width = layouts.shape[1]
+        self.height = layouts.shape[2]
+
+    def __len__(self):
+        return len(self.layouts)
+
+    @classmethod
+    def create(cls, path, count, seed=0, width=100, height=100, **layout_kwargs):
+        # write the pool chunk by chunk so huge pools never have to fit in RAM
+        rng = np.random.default_rng(seed)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        layouts = np.lib.format.open_memmap(path, mode="w+", dtype=np.uint8, shape=(count, width, height))
+        for start in range(0, count, CHUNK_SIZE):
+            stop = min(start + CHUNK_SIZE, count)
+            layouts[start:stop] = generate_layouts(rng, stop - start, width, height, **layout_kwargs)
+        layouts.flush()
+        return cls.load(path)
+
+    @classmethod
+    def load(cls, path):
+        return cls(np.load(path, mmap_mode="r"))
+
+    def sample(self, rng, size=None):
+        return rng.integers(len(self.layouts), size=size)
+
+    def copy_into(self, index, out):
+        np.copyto(out, self.layouts[index])
+        return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate a memory-mapped pool of Tron maps.")
+    parser.add_argument("path", help="Output .npy file")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--width", type=int, default=100)
+    parser.add_argument("--height", type=int, default=100)
+    parser.add_argument("--players", type=int, default=2, help="Number of players the spawns are kept free for")
+    parser.add_argument("--walls", type=int, default=None, help="Default: 10 per 100x100 cells")
+    parser.add_argument("--wall-length", type=int, default=5)
+    parser.add_argument("--boosts", type=int, default=None, help="Default: 10 per 100x100 cells")
+    args = parser.parse_args()
+
+    spawns = default_spawns(args.width, args.height, args.players)
+    default_walls, default_boosts = default_counts(args.width, args.height, args.wall_length, spawns)
+    pool = MapPool.create(args.path, args.count, seed=args.seed, width=args.width, height=args.height,
+                          n_walls=default_walls if args.walls is None else args.walls, wall_length=args.wall_length,
+                          n_boosts=default_boosts if args.boosts is None else args.boosts,
+                          spawns=spawns)
+    size_mb = os.path.getsize(args.path) / 1e6
+    print(f"Wrote {len(pool)} {pool.width}x{pool.height} maps to {args.path} ({size_mb:.1f} MB)")
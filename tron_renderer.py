@@ -1,24 +1,40 @@
+import time
 import pygame
 import moderngl as mgl
 import numpy as np
 
+from tron_core import VAL_BOOST, HEAD_VALS
+from tron_video import PALETTE
+
+# per-tile border colours (RGB 0-255) for the result of the previous game in that tile
+OUTCOME_COLORS = {0: (40, 40, 50), 1: (0, 255, 255), 2: (255, 0, 51), 3: (200, 200, 200)}
+
 class TronRenderer:
-    def __init__(self, grid_w, grid_h):
+    """
+    Draws one grid, or a whole batch of grids tiled into a single atlas texture.
+    A frame is always one texture upload (or one per changed tile) and one draw call.
+    """
+    def __init__(self, grid_w, grid_h, n_tiles=1, window_size=800, overlay_interval=0.25):
         self.grid_w = grid_w
         self.grid_h = grid_h
-        
+        self.window_size = window_size
+        # text overlays are re-rasterised at most this often (seconds)
+        self.overlay_interval = overlay_interval
+
         # 1. Init Pygame
         # We check if pygame is already initialized to avoid errors
         if not pygame.get_init():
             pygame.init()
-            
-        pygame.display.set_mode((800, 800), flags=pygame.OPENGL | pygame.DOUBLEBUF)
-        
+
+        pygame.display.set_mode((window_size, window_size), flags=pygame.OPENGL | pygame.DOUBLEBUF)
+
         # 2. Init ModernGL
         self.ctx = mgl.create_context()
         self.ctx.enable(mgl.BLEND)
-        
-        # 3. Compile Shaders (Same as before)
+
+        # 3. Compile Shaders
+        # The atlas holds `tiles` (columns, rows) grids; each tile is `cells` texels of it.
+        # Status has one texel per tile: r = outcome of the last game, g = 255 for a tile in use.
         self.prog = self.ctx.program(
             vertex_shader="""
                 #version 330
@@ -33,60 +49,187 @@ class TronRenderer:
             fragment_shader="""
                 #version 330
                 uniform sampler2D GameGrid;
+                uniform sampler2D Status;
+                uniform sampler2D Overlay;
+                uniform vec2 tiles;
+                uniform vec2 cells;
+                uniform vec3 outcome_colors[4];
+                uniform vec3 palette[%d];
+                uniform float glow[%d];
+                uniform float window;
                 uniform float time;
                 in vec2 uv;
                 out vec4 color;
-                
+
                 void main() {
-                    float val = texture(GameGrid, uv).r * 255.0;
-                    
-                    // Base Color (Dark Floor)
-                    vec3 pixel = vec3(0.05, 0.05, 0.08); 
-                    
-                    // Colors
-                    if (val > 0.9 && val < 1.1)      pixel = vec3(0.5); // Wall
-                    else if (val > 1.9 && val < 2.1) pixel = vec3(1.0, 1.0, 0.0); // Boost
-                    else if (val > 2.9 && val < 3.1) pixel = vec3(0.0, 1.0, 1.0); // P1 Head
-                    else if (val > 3.9 && val < 4.1) pixel = vec3(1.0, 0.0, 0.2); // P2 Head
-                    else if (val > 4.9 && val < 5.1) pixel = vec3(0.0, 0.5, 0.5); // P1 Trail
-                    else if (val > 5.9 && val < 6.1) pixel = vec3(0.5, 0.0, 0.1); // P2 Trail
-                    
-                    // Grid Lines
-                    vec2 gridPos = uv * vec2(100.0, 100.0);
+                    // which tile this pixel belongs to (tile 0 is top-left) and where inside it
+                    vec2 tile = floor(uv * tiles);
+                    vec2 local = fract(uv * tiles);
+                    vec2 block = vec2(tile.x, tiles.y - 1.0 - tile.y);
+                    vec4 status = texelFetch(Status, ivec2(block), 0);
+                    if (status.g < 0.5) {
+                        color = vec4(0.0, 0.0, 0.0, 1.0);
+                        return;
+                    }
+                    float val = texture(GameGrid, (block + local) / tiles).r * 255.0;
+
+                    // Colors (one palette entry per grid value, floor / wall / boost / heads / trails)
+                    int v = clamp(int(val + 0.5), 0, %d);
+                    vec3 pixel = palette[v];
+
+                    // Grid Lines (only while cells are big enough to see them)
+                    vec2 gridPos = local * cells;
                     vec2 gridSt = fract(gridPos);
                     float edge = step(0.95, gridSt.x) + step(0.95, gridSt.y);
-                    pixel = mix(pixel, vec3(0.2), clamp(edge, 0.0, 1.0));
+                    float cell_px = window / (tiles.x * cells.x);
+                    if (cell_px > 3.0) pixel = mix(pixel, vec3(0.2), clamp(edge, 0.0, 1.0));
 
-                    // Glow
-                    if (val > 1.9 && val < 4.1) {
+                    // Glow (boosts and heads)
+                    if (glow[v] > 0.5) {
                         pixel *= (1.2 + 0.3 * sin(time * 8.0));
                     }
 
+                    // Tile border, coloured by the last result of the game in this tile
+                    if (tiles.x * tiles.y > 1.0) {
+                        vec2 border = 2.0 * tiles / window;
+                        if (any(lessThan(local, border)) || any(greaterThan(local, 1.0 - border))) {
+                            pixel = outcome_colors[int(status.r * 255.0 + 0.5)];
+                        }
+                    }
+
+                    // Text overlay (step counters, labels), alpha blended on top
+                    vec4 text = texture(Overlay, uv);
+                    pixel = mix(pixel, text.rgb, text.a);
+
                     color = vec4(pixel, 1.0);
                 }
-            """
+            """ % (len(PALETTE), len(PALETTE), len(PALETTE) - 1)
         )
-        
+        self.prog['window'].value = float(window_size)
+        self.prog['outcome_colors'].value = [tuple(c / 255.0 for c in OUTCOME_COLORS[k]) for k in range(4)]
+        self.prog['palette'].value = [tuple(c / 255.0 for c in color) for color in PALETTE.tolist()]
+        glow = np.zeros(len(PALETTE), dtype=np.float32)
+        glow[[VAL_BOOST, *HEAD_VALS.tolist()]] = 1.0
+        self.prog['glow'].value = glow.tolist()
+
         # 4. Geometry
         vertices = np.array([-1,-1,0,0, 1,-1,1,0, -1,1,0,1, -1,1,0,1, 1,-1,1,0, 1,1,1,1], dtype='f4')
         self.vbo = self.ctx.buffer(vertices.tobytes())
         self.vao = self.ctx.vertex_array(self.prog, [(self.vbo, '2f 2f', 'in_vert', 'in_uv')])
-        self.texture = self.ctx.texture((grid_w, grid_h), 1, dtype='f1')
+
+        # 5. Text overlay: one window-sized RGBA texture, only rewritten when the text changes
+        self.font = None
+        try:
+            pygame.font.init()
+            self.font = pygame.font.SysFont(None, 16)
+        except (pygame.error, ImportError):
+            pass
+        self.overlay = self.ctx.texture((window_size, window_size), 4, dtype='f1')
+        self.overlay.write(bytes(window_size * window_size * 4))
+        self.overlay_text = None
+        self.overlay_time = 0.0
+
+        self.n_tiles = 0
+        self._layout(n_tiles)
+
+    def _layout(self, n_tiles):
+        # (re)build the atlas for n_tiles grids, as square as possible
+        self.n_tiles = n_tiles
+        self.cols = int(np.ceil(np.sqrt(n_tiles)))
+        self.rows = int(np.ceil(n_tiles / self.cols))
+        # the grid is indexed [x, y] and uploaded as-is, so a tile is grid_h texels wide and grid_w tall
+        self.atlas = np.zeros((self.rows * self.grid_w, self.cols * self.grid_h), dtype=np.uint8)
+        self.atlas_blocks = self.atlas.reshape(self.rows, self.grid_w, self.cols, self.grid_h)
+        # what is currently on the GPU, one grid per tile (also the reference for dirty checks)
+        self.uploaded = np.zeros((self.rows * self.cols, self.grid_w, self.grid_h), dtype=np.uint8)
+        self.status = np.zeros((self.rows, self.cols, 4), dtype=np.uint8)
+        self.status.reshape(-1, 4)[:n_tiles, 1] = 255
+
+        if getattr(self, "texture", None) is not None:
+            self.texture.release()
+            self.status_texture.release()
+        self.texture = self.ctx.texture((self.cols * self.grid_h, self.rows * self.grid_w), 1, dtype='f1')
         self.texture.filter = (mgl.NEAREST, mgl.NEAREST)
+        self.texture.write(self.atlas.tobytes())
+        self.status_texture = self.ctx.texture((self.cols, self.rows), 4, dtype='f1')
+        self.status_texture.filter = (mgl.NEAREST, mgl.NEAREST)
+        self.status_texture.write(self.status.tobytes())
+        self.prog['tiles'].value = (float(self.cols), float(self.rows))
+        self.prog['cells'].value = (float(self.grid_h), float(self.grid_w))
+        self.prog['GameGrid'].value = 0
+        self.prog['Status'].value = 1
+        self.prog['Overlay'].value = 2
+        self.overlay_text = None
+
+    def _upload(self, grids):
+        # only tiles whose grid changed since the last frame are sent; past half the batch, one full upload is cheaper
+        n = len(grids)
+        changed = np.flatnonzero((grids != self.uploaded[:n]).reshape(n, -1).any(axis=1))
+        if len(changed) == 0:
+            return
+        self.uploaded[:n] = grids
+        if len(changed) > n // 2:
+            self.atlas_blocks[...] = self.uploaded.reshape(self.rows, self.cols, self.grid_w, self.grid_h).transpose(0, 2, 1, 3)
+            self.texture.write(self.atlas.tobytes())
+            return
+        for k in changed:
+            row, col = divmod(int(k), self.cols)
+            self.texture.write(np.ascontiguousarray(grids[k]).tobytes(),
+                               viewport=(col * self.grid_h, row * self.grid_w, self.grid_h, self.grid_w))
+
+    def _update_overlay(self, text):
+        # rasterise the per-tile text with pygame.font into the overlay texture (throttled, skipped if unchanged)
+        if self.font is None or text == self.overlay_text:
+            return
+        now = time.perf_counter()
+        if self.overlay_text is not None and now - self.overlay_time < self.overlay_interval:
+            return
+        self.overlay_text, self.overlay_time = text, now
+        surface = pygame.Surface((self.window_size, self.window_size), pygame.SRCALPHA)
+        tile_w, tile_h = self.window_size / self.cols, self.window_size / self.rows
+        for k, line in enumerate(text):
+            if line:
+                row, col = divmod(k, self.cols)
+                surface.blit(self.font.render(line, True, (230, 230, 230)), (col * tile_w + 4, row * tile_h + 4))
+        self.overlay.write(pygame.image.tostring(surface, "RGBA", True))
 
     def render_frame(self, grid_data):
+        return self.render_batch(grid_data[None])
+
+    def render_batch(self, grids, steps=None, outcomes=None, labels=None):
+        """
+        grids: (N, W, H) boards, drawn as a tiled view (tile 0 top-left, row by row).
+        steps: optional (N,) episode step per game, shown in the corner of each tile.
+        outcomes: optional (N,) result of the previous game per tile (0 none, 1 player 1 won,
+                  2 player 2 won, 3 draw), shown as the tile border colour.
+        labels: optional list of N strings shown before the step counter.
+        """
+        grids = np.asarray(grids, dtype=np.uint8)
+        if len(grids) != self.n_tiles:
+            self._layout(len(grids))
+
         # Write Data
-        self.texture.write(grid_data.astype('u1').tobytes())
+        self._upload(grids)
+        if outcomes is not None:
+            self.status.reshape(-1, 4)[:len(grids), 0] = outcomes
+            self.status_texture.write(self.status.tobytes())
+        if steps is not None or labels is not None:
+            self._update_overlay(tuple(
+                " ".join(part for part in (labels[k] if labels is not None else "",
+                                           f"t={steps[k]}" if steps is not None else "") if part)
+                for k in range(len(grids))))
         self.texture.use(0)
+        self.status_texture.use(1)
+        self.overlay.use(2)
         self.prog['time'].value = pygame.time.get_ticks() / 1000.0
-        
+
         # Draw
         self.ctx.clear()
         self.vao.render()
         pygame.display.flip()
-        
+
         # CRITICAL FIX: Return True so TronEnv knows the window is still open
         return True
-        
+
     def close(self):
-        pygame.quit()
\ No newline at end of file
+        pygame.quit()
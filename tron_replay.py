@@ -0,0 +1,269 @@
+import argparse
+import struct
+import zlib
+import numpy as np
+
+from tron_core import TronGame
+
+"""
+Replays (Compact Game Logs)
+
+Role: Records a TronEnv game as its starting layout (or just the seed that generated it), the actions of
+      every step and the order the agents moved in, and plays it back exactly.
+
+Key Code: class ReplayRecorder:, class Replay:, class ReplayPlayer:, class ReplayWriter:, read_replays(path)
+
+Goal: A whole game fits in a few hundred bytes (one byte per agent per step, zlib compressed), so millions of
+      evaluation games can be archived. Playback re-runs the engine without rendering anything, so seeking
+      to any step of a game takes milliseconds.
+
+Usage:
+    python tron_replay.py games.trpl --info               # one line per game in the archive
+    python tron_replay.py games.trpl --game 3 --export game.gif
+"""
+
+MAGIC = b"TRPL"
+VERSION = 2  # 2: per-player head values and any board size / player count
+# magic, version, width, height, n_agents, mode, seed, n_walls, wall_length, n_boosts, n_steps
+HEADER = struct.Struct("<4sBHHBBqHHHI")
+MODE_SEED = 0     # the layout is rebuilt with TronEnv.reset(seed)
+MODE_LAYOUT = 1   # the starting grid is stored in the file
+NO_ACTION = 0xFF  # the agent was out of the game at that step
+
+
+def encode_action(action, position):
+    # move (2 bits) | trail (1 bit) | boost (1 bit) | position in the step's agent order (4 bits)
+    return int(action[0]) | int(action[1]) << 2 | int(action[2]) << 3 | position << 4
+
+
+def decode_action(code):
+    return np.array([code & 3, (code >> 2) & 1, (code >> 3) & 1], dtype=np.int64), code >> 4
+
+
+class Replay:
+    """
+    One recorded game: the starting grid (or the seed + map parameters that reproduce it) and
+    a (steps, n_agents) uint8 array of encoded actions.
+    """
+    def __init__(self, width, height, agents, actions, seed=None, layout=None, n_walls=10, wall_length=5, n_boosts=10):
+        if seed is None and layout is None:
+            raise ValueError("A replay needs either the reset seed or the starting layout")
+        self.width = width
+        self.height = height
+        self.agents = list(agents)
+        self.actions = np.asarray(actions, dtype=np.uint8).reshape(-1, len(self.agents))
+        self.seed = seed
+        self.layout = layout
+        self.n_walls = n_walls
+        self.wall_length = wall_length
+        self.n_boosts = n_boosts
+
+    def __len__(self):
+        return len(self.actions)
+
+    def to_bytes(self):
+        mode = MODE_LAYOUT if self.layout is not None else MODE_SEED
+        header = HEADER.pack(MAGIC, VERSION, self.width, self.height, len(self.agents), mode,
+                             -1 if self.seed is None else self.seed,
+                             self.n_walls, self.wall_length, self.n_boosts, len(self.actions))
+        body = self.actions.tobytes()
+        if mode == MODE_LAYOUT:
+            body = np.ascontiguousarray(self.layout, dtype=np.uint8).tobytes() + body
+        return header + zlib.compress(body, 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, width, height, n_agents, mode, seed, n_walls, wall_length, n_boosts, n_steps = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a Tron replay")
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        body = np.frombuffer(zlib.decompress(data[HEADER.size:]), dtype=np.uint8)
+        layout = None
+        if mode == MODE_LAYOUT:
+            layout = body[:width * height].reshape(width, height)
+            body = body[width * height:]
+        agents = [f"player_{i + 1}" for i in range(n_agents)]
+        return cls(width, height, agents, body.reshape(n_steps, n_agents), seed=None if seed < 0 else seed,
+                   layout=layout, n_walls=n_walls, wall_length=wall_length, n_boosts=n_boosts)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """
+    Drop-in front of a TronGame / TronEnv that logs the game while it is played:
+        recorder = ReplayRecorder(env)
+        recorder.reset(seed=7); recorder.step(actions); ...
+        recorder.replay().save("game.trpl")
+    Games reset with a seed (and no map pool) only store the seed; otherwise the starting grid is kept.
+    """
+    def __init__(self, env, store_layout=False):
+        self.env = env
+        self.store_layout = store_layout
+        self.seed = None
+        self.layout = None
+        self.actions = []
+
+    def reset(self, seed=None, options=None):
+        result = self.env.reset(seed=seed, options=options)
+        self.seed = seed if self.env.map_pool is None else None
+        # the starting grid (heads included), exactly as reset() left it
+        self.layout = None if (self.seed is not None and not self.store_layout) else self.env.grid.copy()
+        self.actions = []
+        return result
+
+    def step(self, actions):
+        result = self.env.step(actions)
+        row = np.full(len(self.env.possible_agents), NO_ACTION, dtype=np.uint8)
+        for position, agent in enumerate(self.env.last_agent_order):
+            row[self.env.possible_agents.index(agent)] = encode_action(actions[agent], position)
+        self.actions.append(row)
+        return result
+
+    def replay(self):
+        env = self.env
+        actions = np.array(self.actions, dtype=np.uint8).reshape(-1, len(env.possible_agents))
+        return Replay(env.width, env.height, env.possible_agents, actions, seed=self.seed, layout=self.layout,
+                      n_walls=env.n_walls, wall_length=env.wall_length, n_boosts=env.n_boosts)
+
+
+class ReplayPlayer:
+    """
+    Plays a Replay back on a fresh TronGame, one step at a time or by seeking to any step
+    (backwards seeks start over from the beginning; nothing is rendered on the way).
+    player.env holds the game state after player.t steps.
+    """
+    def __init__(self, replay):
+        self.replay = replay
+        self.env = TronGame(width=replay.width, height=replay.height, n_players=len(replay.agents),
+                            n_walls=replay.n_walls, wall_length=replay.wall_length, n_boosts=replay.n_boosts)
+        self.t = 0
+        self.restart()
+
+    def restart(self):
+        replay, env = self.replay, self.env
+        if replay.layout is not None:
+            env.reset()
+            self._load_layout(replay.layout)
+        else:
+            env.reset(seed=replay.seed)
+        self.t = 0
+
+    def _load_layout(self, layout):
+        # the recorded board with the freshly reset players; the engine rebuilds observations from it
+        state = self.env.snapshot()
+        state.grid = layout
+        self.env.restore(state)
+
+    def step(self):
+        """Applies the next recorded step and returns env.step's (observations, rewards, terminations, ...)."""
+        if self.t >= len(self.replay):
+            raise IndexError("End of replay")
+        row = self.replay.actions[self.t]
+        actions, order = {}, []
+        for agent, code in zip(self.replay.agents, row):
+            if code != NO_ACTION:
+                actions[agent], position = decode_action(int(code))
+                order.append((position, agent))
+        self.t += 1
+        return self.env.step(actions, agent_order=[agent for _, agent in sorted(order)])
+
+    def seek(self, t):
+        if not 0 <= t <= len(self.replay):
+            raise IndexError(f"Step {t} is outside the replay (0..{len(self.replay)})")
+        if t < self.t:
+            self.restart()
+        while self.t < t:
+            self.step()
+        return self.env
+
+    def grids(self):
+        """Yields the grid before the first step and after every step (e.g. for tron_video.EpisodeRecorder)."""
+        self.seek(0)
+        yield self.env.grid
+        while self.t < len(self.replay):
+            self.step()
+            yield self.env.grid
+
+
+class ReplayWriter:
+    """Appends replays to one archive file as length-prefixed records."""
+    def __init__(self, path, mode="ab"):
+        self.file = open(path, mode)
+
+    def write(self, replay):
+        data = replay.to_bytes()
+        self.file.write(struct.pack("<I", len(data)) + data)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_replays(path):
+    """Yields every Replay of an archive written by ReplayWriter."""
+    with open(path, "rb") as f:
+        while True:
+            size = f.read(4)
+            if len(size) < 4:
+                return
+            yield Replay.from_bytes(f.read(struct.unpack("<I", size)[0]))
+
+
+def _result(player):
+    # plays the game to the end and names who is left standing
+    player.seek(len(player.replay))
+    alive = player.env.agents
+    return "draw" if not alive else " + ".join(alive) + (" won" if len(alive) == 1 else " alive")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or export recorded Tron games.")
+    parser.add_argument("path", help="A replay archive (ReplayWriter) or a single saved Replay")
+    parser.add_argument("--info", action="store_true", help="Print one line per game")
+    parser.add_argument("--game", type=int, default=0, help="Game index inside the archive")
+    parser.add_argument("--step", type=int, default=None, help="Print the game state at this step")
+    parser.add_argument("--export", default=None, help="Write the game as a GIF / video (see tron_video.py)")
+    parser.add_argument("--fps", type=float, default=20)
+    args = parser.parse_args()
+
+    with open(args.path, "rb") as f:
+        single = f.read(len(MAGIC)) == MAGIC
+    replays = [Replay.load(args.path)] if single else read_replays(args.path)
+
+    if args.info:
+        for i, replay in enumerate(replays):
+            source = f"seed {replay.seed}" if replay.layout is None else "stored layout"
+            print(f"game {i}: {len(replay)} steps, {source}, {_result(ReplayPlayer(replay))}")
+    else:
+        for i, replay in enumerate(replays):
+            if i == args.game:
+                break
+        else:
+            raise SystemExit(f"No game {args.game} in {args.path}")
+        player = ReplayPlayer(replay)
+        if args.step is not None:
+            env = player.seek(args.step)
+            print(f"step {player.t}/{len(replay)}: agents {env.agents}, "
+                  f"positions {dict(zip(env.possible_agents, env.positions.tolist()))}, "
+                  f"boosts {dict(zip(env.possible_agents, env.boosts.tolist()))}")
+        if args.export:
+            from tron_video import EpisodeRecorder
+            with EpisodeRecorder(args.export, fps=args.fps) as recorder:
+                for grid in player.grids():
+                    recorder.add_grid(grid)
+            print(f"Saved {args.export}")
@@ -0,0 +1,167 @@
+import time
+import numpy as np
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+
+from tron_env import TronEnv
+
+"""
+Shared-Policy Seat Play
+
+Role: Turns TronEnv games into one VecEnv whose rows are seats: row g * n_players + i is player i + 1 of game g.
+      A single PPO policy controls every seat, so each engine tick yields n_players training samples.
+
+Key Code: class TronSeatVecEnv(VecEnv):
+
+Goal: Keep player 2's experience instead of handing its seat to a bot. Observations come straight from
+      TronEnv.observe, which is already relative to the observing player (my head / trail vs. enemy head / trail),
+      so the same network can sit in any seat. Works for grid and egocentric observations and 2-8 players.
+"""
+
+
+class TronSeatVecEnv(VecEnv):
+    """
+    num_games TronEnv games, every seat an env of the VecEnv (num_envs = num_games * n_players).
+    The other arguments are passed through to TronEnv.
+
+    A seat's episode ends the step the engine terminates (or truncates) it: that row reports done with the
+    seat's last observation in info["terminal_observation"] (a blank one once it is off the board) and its
+    return / length in info["episode"]. Until the whole game is over the row keeps stepping with blank
+    observations, reward 0 and done=True, so the finished seat never bootstraps off the rest of the game.
+    A seat the engine terminates without killing it (a head hit) is done all the same: it stays on the board
+    as an obstacle and no longer moves. Once at most one seat is still playing, the game is over for it too
+    (truncated, info["TimeLimit.truncated"]), so in 2-player games the first termination ends the game for both.
+    Games reset once every seat is done. max_episode_steps truncates games that run longer.
+    """
+    def __init__(self, num_games, width=100, height=100, n_players=2, obs_mode="grid", view_radius=10, map_pool=None,
+                 max_episode_steps=None, profile=False, seed=None):
+        self.games = [TronEnv(width=width, height=height, n_players=n_players, obs_mode=obs_mode,
+                              view_radius=view_radius, map_pool=map_pool, profile=profile, render_mode="rgb_array")
+                      for _ in range(num_games)]
+        self.n_players = n_players
+        self.max_episode_steps = max_episode_steps
+        self.agents = self.games[0].possible_agents
+        observation_space = self.games[0].observation_space(self.agents[0])
+        super().__init__(num_games * n_players, observation_space, self.games[0].action_space(self.agents[0]))
+
+        # first reset of every game is seeded from `seed`, later ones continue each game's own RNG
+        self._game_seeds = np.random.SeedSequence(seed).generate_state(num_games).tolist()
+        self.keys = list(observation_space.keys()) if isinstance(observation_space, spaces.Dict) else [None]
+        self.buf_obs = {key: np.zeros((self.num_envs, *self._space(key).shape), dtype=self._space(key).dtype)
+                        for key in self.keys}
+        self.seat_done = np.zeros((num_games, n_players), dtype=bool)
+        self.episode_returns = np.zeros((num_games, n_players), dtype=np.float64)
+        self.episode_steps = np.zeros(num_games, dtype=np.int64)
+        self.start_time = time.time()
+        self._actions = None
+
+    def _space(self, key):
+        return self.observation_space if key is None else self.observation_space[key]
+
+    def _write_obs(self, row, obs):
+        # obs None = blank (the seat is off the board or its episode is over)
+        for key, buffer in self.buf_obs.items():
+            if obs is None:
+                buffer[row] = 0
+            else:
+                buffer[row] = obs if key is None else obs[key]
+
+    def _row_obs(self, row):
+        if self.keys == [None]:
+            return self.buf_obs[None][row].copy()
+        return {key: buffer[row].copy() for key, buffer in self.buf_obs.items()}
+
+    def _obs(self):
+        if self.keys == [None]:
+            return self.buf_obs[None].copy()
+        return {key: buffer.copy() for key, buffer in self.buf_obs.items()}
+
+    def _reset_game(self, g):
+        game = self.games[g]
+        seed = self._game_seeds[g]
+        self._game_seeds[g] = None
+        obs, _ = game.reset(seed=seed)
+        for i, agent in enumerate(self.agents):
+            self._write_obs(g * self.n_players + i, obs[agent])
+        self.seat_done[g] = False
+        self.episode_returns[g] = 0.0
+        self.episode_steps[g] = 0
+
+    def reset(self):
+        for g in range(len(self.games)):
+            self._reset_game(g)
+        return self._obs()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions).reshape(self.num_envs, 3)
+
+    def step_wait(self):
+        n = self.n_players
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.ones(self.num_envs, dtype=bool)
+        infos = [{} for _ in range(self.num_envs)]
+        for g, game in enumerate(self.games):
+            playing = ~self.seat_done[g]
+            # only seats whose episode is still running move: a seat ended by a head hit stays on the board
+            # as an obstacle instead of acting on blank observations (the engine would otherwise shuffle it in)
+            order = [agent for i, agent in enumerate(self.agents) if playing[i] and agent in game.agents]
+            game.np_random.shuffle(order)
+            actions = {agent: self._actions[g * n + self.agents.index(agent)] for agent in order}
+            obs, step_rewards, terminations, truncations, _ = game.step(actions, agent_order=order)
+            self.episode_steps[g] += 1
+            truncated = self.max_episode_steps is not None and self.episode_steps[g] >= self.max_episode_steps
+            ending = np.array([terminations[agent] or truncations[agent] for agent in self.agents]) & playing
+            # a seat left to play on its own has no game any more: its episode is cut (truncated) too
+            game_over = truncated or (playing & ~ending).sum() <= 1
+
+            for i, agent in enumerate(self.agents):
+                row = g * n + i
+                if not playing[i]:
+                    # finished seat waiting for the game to end: a blank one-step episode
+                    infos[row]["terminal_observation"] = self._row_obs(row)
+                    continue
+                rewards[row] = step_rewards[agent]
+                self.episode_returns[g, i] += step_rewards[agent]
+                self._write_obs(row, obs.get(agent))
+                if ending[i] or game_over:
+                    self.seat_done[g, i] = True
+                    infos[row]["terminal_observation"] = self._row_obs(row)
+                    infos[row]["TimeLimit.truncated"] = bool(not terminations[agent])
+                    infos[row]["episode"] = {"r": float(self.episode_returns[g, i]), "l": int(self.episode_steps[g]),
+                                             "t": round(time.time() - self.start_time, 6)}
+                    self._write_obs(row, None)
+                else:
+                    dones[row] = False
+
+            if self.seat_done[g].all():
+                self._reset_game(g)
+        return self._obs(), rewards, dones, infos
+
+    def pop_stats(self):
+        # TronStats of all games since the last call (None when profiling is off)
+        popped = [game.pop_stats() for game in self.games]
+        if popped[0] is None:
+            return None
+        for stats in popped[1:]:
+            popped[0].merge(stats)
+        return popped[0]
+
+    def get_images(self):
+        # one board per game (every seat of a game shares it)
+        return [game.render() for game in self.games]
+
+    def close(self):
+        for game in self.games:
+            game.close()
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return [getattr(self, method_name)(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
@@ -0,0 +1,113 @@
+import os
+from collections import deque
+
+import numpy as np
+from stable_baselines3 import PPO
+from stable_baselines3.common.callbacks import BaseCallback
+
+"""
+Self-Play (Opponent Pool)
+
+Role: Lets player 2 of a TronBatchEnv be a frozen copy of an earlier PPO policy.
+
+Key Code: class OpponentPool:, class SelfPlayCallback(BaseCallback):
+
+Goal: One active snapshot plays every game of the batch, so each env step costs a single batched
+      forward pass for the opponent. The active snapshot is re-drawn from the pool on a schedule,
+      and the callback keeps adding fresh snapshots of the learner while it trains.
+"""
+
+
+class OpponentPool:
+    """
+    Pool of frozen policies used as `opponent` of a TronBatchEnv.
+    Every `swap_every` env steps a new active snapshot is drawn: the newest one with probability
+    `latest_prob`, otherwise a uniformly random older one. With an empty pool player 2 plays randomly.
+    """
+    def __init__(self, max_size=10, swap_every=2048, latest_prob=0.5, deterministic=False, seed=None):
+        self.snapshots = deque(maxlen=max_size)
+        self.swap_every = swap_every
+        self.latest_prob = latest_prob
+        self.deterministic = deterministic
+        self.rng = np.random.default_rng(seed)
+        self.active = None
+        self.steps = 0
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def add_policy(self, policy):
+        # only the weights are copied (no optimizer state), into a network of its own; once the pool is full the
+        # oldest snapshot's network is overwritten instead of building a new one, never the active opponent's
+        # (that would turn it into the latest policy in the middle of its swap window)
+        if len(self.snapshots) == self.snapshots.maxlen:
+            snapshot = next((s for s in self.snapshots if s is not self.active), self.snapshots[0])
+            self.snapshots.remove(snapshot)
+        else:
+            snapshot = self._new_policy(policy)
+        snapshot.load_state_dict(policy.state_dict())
+        self.snapshots.append(snapshot)
+        if self.active is None:
+            self.active = snapshot
+
+    @staticmethod
+    def _new_policy(policy):
+        # same architecture as `policy` (rebuilt the way SB3's policy save / load does), frozen: eval mode,
+        # no gradients, so training the learner never touches it
+        snapshot = type(policy)(**policy._get_constructor_parameters()).to(policy.device)
+        snapshot.set_training_mode(False)
+        snapshot.requires_grad_(False)
+        return snapshot
+
+    def add_checkpoint(self, path, device="auto"):
+        self.add_policy(PPO.load(path, device=device).policy)
+
+    def swap(self):
+        if not self.snapshots:
+            return
+        if len(self.snapshots) == 1 or self.rng.random() < self.latest_prob:
+            self.active = self.snapshots[-1]
+        else:
+            self.active = self.snapshots[self.rng.integers(len(self.snapshots) - 1)]
+
+    def __call__(self, env):
+        self.steps += 1
+        if self.steps % self.swap_every == 0:
+            self.swap()
+        if self.active is None:
+            return env.random_actions()
+        # all player 2 observations of the batch in one forward pass
+        actions, _ = self.active.predict(env.opponent_obs(), deterministic=self.deterministic)
+        return actions
+
+
+class SelfPlayCallback(BaseCallback):
+    """
+    Adds a snapshot of the learner to the OpponentPool every `snapshot_every` timesteps
+    (and once at the start of training), optionally saving each snapshot under `save_dir`.
+    """
+    def __init__(self, pool, snapshot_every=50000, save_dir=None, verbose=0):
+        super().__init__(verbose)
+        self.pool = pool
+        self.snapshot_every = snapshot_every
+        self.save_dir = save_dir
+        self.last_snapshot = 0
+
+    def _snapshot(self):
+        self.pool.add_policy(self.model.policy)
+        self.last_snapshot = self.num_timesteps
+        if self.save_dir is not None:
+            os.makedirs(self.save_dir, exist_ok=True)
+            self.model.save(os.path.join(self.save_dir, f"selfplay_{self.num_timesteps}_steps"))
+        if self.verbose >= 1:
+            print(f"Self-play: added snapshot at {self.num_timesteps} steps (pool size {len(self.pool)})")
+
+    def _on_training_start(self):
+        if len(self.pool) == 0:
+            self._snapshot()
+
+    def _on_step(self):
+        if self.num_timesteps - self.last_snapshot >= self.snapshot_every:
+            self._snapshot()
+        self.logger.record("selfplay/pool_size", len(self.pool))
+        return True
@@ -0,0 +1,410 @@
+import argparse
+import asyncio
+import base64
+import itertools
+import json
+import math
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from tron_core import TronGame, ACTION_NVEC, ACT_LEFT, ACT_RIGHT, TRAIL_ON
+
+"""
+The Match Server (No Graphics)
+
+Role: Hosts many TronGame matches at once on fixed tick schedules, takes player inputs over local
+      TCP (and WebSocket, if the `websockets` package is installed) and plays trained-policy opponents.
+
+Key Code: class InferenceQueue:, class Match:, class TronServer:
+
+Goal: The physics of every match advances on a global tick grid, independent of the clients: a tick uses
+      whatever input arrived last. Matches with the same tick length wake up together, so their policy
+      opponents land in the same InferenceQueue batch: one forward pass per tick, run off the event loop.
+
+Protocol: one JSON object per line (TCP) or per message (WebSocket).
+    client -> {"type": "join", "opponent": "policy" | "random" | "human"}
+    client -> {"type": "action", "move": 0-3, "trail": 0/1, "boost": 0/1}   (any subset; boost lasts one tick)
+    server -> {"type": "joined", "match": id, "agent": "player_1" | "player_2"}
+    server -> {"type": "start", "width": W, "height": H, "grid": base64(zlib(uint8 grid, x-major))}
+    server -> {"type": "state", "tick": t, "changes": [[x, y, value], ...], "positions": {...}, "boosts": {...}}
+    server -> {"type": "end", "winner": "player_1" | "player_2" | null, "ticks": t}
+
+Usage:
+    python tron_server.py --model models/PPO/tron_v1.zip --port 8765
+    python tron_server.py --port 8765 --ws-port 8766 --tick 0.05
+"""
+
+DEFAULT_CONTROLS = {"player_1": ACT_LEFT, "player_2": ACT_RIGHT}
+MAX_WRITE_BUFFER = 1 << 20  # clients lagging this many bytes behind are dropped instead of slowing the tick
+
+
+def _percentiles(samples_s):
+    if not samples_s:
+        return "n/a"
+    ms = 1000.0 * np.asarray(samples_s)
+    return f"p50 {np.percentile(ms, 50):.2f} ms, p99 {np.percentile(ms, 99):.2f} ms"
+
+
+# --- CONNECTIONS (same interface for both transports: send(message), messages(), close()) ---
+
+class TcpConnection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def send(self, message):
+        # never awaits: a slow client must not hold up the tick, it gets dropped instead
+        if self.writer.is_closing():
+            return
+        if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.close()
+            return
+        self.writer.write((json.dumps(message) + "\n").encode())
+
+    async def messages(self):
+        async for line in self.reader:
+            if line.strip():
+                yield json.loads(line)
+
+    def close(self):
+        self.writer.close()
+
+
+class WebSocketConnection:
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.pending = set()  # sends in flight (the loop only keeps weak references to tasks)
+
+    def _spawn(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+
+    def send(self, message):
+        self._spawn(self.websocket.send(json.dumps(message)))
+
+    async def messages(self):
+        async for data in self.websocket:
+            yield json.loads(data)
+
+    def close(self):
+        self._spawn(self.websocket.close())
+
+
+# --- BATCHED POLICY INFERENCE ---
+
+class InferenceQueue:
+    """
+    Shared queue in front of one policy. Requests that arrive within `max_wait` seconds of the first one
+    (up to `max_batch`) are answered by a single predict() call in a worker thread, so the event loop keeps
+    ticking while the network runs.
+    """
+    def __init__(self, policy, max_batch=256, max_wait=0.002, deterministic=True):
+        self.policy = policy
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.deterministic = deterministic
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.latencies = deque(maxlen=10000)
+        self.batch_sizes = deque(maxlen=1000)
+
+    @classmethod
+    def from_checkpoint(cls, path, device="auto", **kwargs):
+        from stable_baselines3 import PPO
+        policy = PPO.load(path, device=device).policy
+        policy.set_training_mode(False)
+        return cls(policy, **kwargs)
+
+    async def predict(self, obs):
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((obs, future, time.perf_counter()))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            obs = np.stack([item[0] for item in batch])
+            try:
+                actions, _ = await loop.run_in_executor(
+                    self.executor, lambda: self.policy.predict(obs, deterministic=self.deterministic))
+            except Exception as error:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            now = time.perf_counter()
+            for (_, future, start), action in zip(batch, actions):
+                if not future.done():
+                    future.set_result(action)
+                self.latencies.append(now - start)
+            self.batch_sizes.append(len(batch))
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+# --- MATCHES ---
+
+class Match:
+    """
+    One TronGame. Each seat is a client connection or a bot ("policy" / "random").
+    A client's seat plays its latest input every tick; bots are asked for an action at the tick itself.
+    """
+    def __init__(self, match_id, server, seed=None):
+        self.id = match_id
+        self.server = server
+        self.env = TronGame(map_pool=server.map_pool)
+        self.rng = np.random.default_rng(seed)
+        self.seed = seed
+        self.seats = {agent: None for agent in self.env.possible_agents}
+        self.controls = {agent: [DEFAULT_CONTROLS[agent], TRAIL_ON, 0] for agent in self.env.possible_agents}
+        self.tick = 0
+        self.finished = False
+        self.started = asyncio.Event()
+        self.task = None  # the task running run(), set by TronServer.join
+
+    def free_seat(self):
+        return next((agent for agent, seat in self.seats.items() if seat is None), None)
+
+    def connections(self):
+        return [seat for seat in self.seats.values() if not isinstance(seat, str) and seat is not None]
+
+    def broadcast(self, message):
+        for connection in self.connections():
+            connection.send(message)
+
+    def set_control(self, agent, message):
+        control = self.controls[agent]
+        for i, key in enumerate(("move", "trail", "boost")):
+            if key in message:
+                value = int(message[key])
+                if not 0 <= value < (4 if key == "move" else 2):
+                    raise ValueError(f"{key} out of range: {value}")
+                control[i] = value
+
+    def leave(self, agent):
+        # a player who disconnects forfeits
+        self.seats[agent] = "gone"
+        if not self.finished and self.started.is_set():
+            self._finish("player_1" if agent == "player_2" else "player_2")
+        self.finished = True
+        self.started.set()
+
+    async def _bot_action(self, agent):
+        kind = self.seats[agent]
+        if kind == "policy":
+            return await self.server.inference.predict(self.env.observe(agent))
+        return self.rng.integers(ACTION_NVEC)
+
+    async def _actions(self):
+        agents = self.env.possible_agents
+        bots = [agent for agent in agents if isinstance(self.seats[agent], str)]
+        bot_actions = await asyncio.gather(*(self._bot_action(agent) for agent in bots))
+        actions = {agent: np.array(self.controls[agent]) for agent in agents}
+        actions.update(zip(bots, bot_actions))
+        for agent in agents:
+            self.controls[agent][2] = 0
+        return actions
+
+    def _finish(self, winner):
+        self.finished = True
+        self.broadcast({"type": "end", "winner": winner, "ticks": self.tick})
+        self.server.results.append(winner)
+
+    async def run(self):
+        await self.started.wait()
+        if self.finished:
+            return
+        env = self.env
+        env.reset(seed=self.seed)
+        previous = env.grid.copy()
+        self.broadcast({"type": "start", "width": env.width, "height": env.height,
+                        "grid": base64.b64encode(zlib.compress(env.grid.tobytes())).decode()})
+
+        loop = asyncio.get_running_loop()
+        interval = self.server.tick_interval
+        # ticks sit on a grid shared by every match, so their bot requests are batched together
+        tick_index = math.floor(loop.time() / interval) + 1
+        while not self.finished:
+            deadline = tick_index * interval
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+            self.server.jitter.append(loop.time() - deadline)
+            actions = await self._actions()
+            if self.finished:
+                break
+            _, _, terminations, _, _ = env.step(actions)
+            self.tick += 1
+
+            xs, ys = np.nonzero(env.grid != previous)
+            previous[xs, ys] = env.grid[xs, ys]
+            self.broadcast({"type": "state", "tick": self.tick,
+                            "changes": np.stack([xs, ys, env.grid[xs, ys]], axis=1).tolist(),
+                            "positions": dict(zip(env.possible_agents, env.positions.tolist())),
+                            "boosts": dict(zip(env.possible_agents, env.boosts.tolist()))})
+
+            if any(terminations.values()):
+                # the result follows the deaths: a head hit ends the match but kills nobody, a draw like both dying
+                alive = [a for a in env.possible_agents if env.alive[env.agent_ids[a]]]
+                self._finish(alive[0] if len(alive) == 1 else None)
+                break
+            # a match that fell behind skips the ticks it missed instead of bunching them up
+            tick_index = max(tick_index + 1, math.floor(loop.time() / interval) + 1)
+
+
+class TronServer:
+    """
+    Accepts connections, seats players into matches and runs every match as its own task.
+    Human-vs-human joins wait in a lobby until a second player asks for a human opponent.
+    """
+    def __init__(self, inference=None, tick_interval=0.05, max_matches=256, map_pool=None, stats_interval=10.0):
+        self.inference = inference
+        self.tick_interval = tick_interval
+        self.max_matches = max_matches
+        self.map_pool = map_pool
+        self.stats_interval = stats_interval
+        self.matches = {}
+        self.lobby = None
+        self.ids = itertools.count()
+        self.jitter = deque(maxlen=10000)
+        self.results = deque(maxlen=10000)
+
+    def join(self, connection, opponent):
+        if opponent == "human" and self.lobby is not None and not self.lobby.finished:
+            match, self.lobby = self.lobby, None
+        else:
+            if opponent == "policy" and self.inference is None:
+                raise ValueError("No policy loaded (start the server with --model)")
+            if opponent not in ("policy", "random", "human"):
+                raise ValueError(f"Unknown opponent {opponent!r}")
+            if len(self.matches) >= self.max_matches:
+                raise ValueError("Server full")
+            match = Match(next(self.ids), self, seed=int(np.random.SeedSequence().generate_state(1)[0]))
+            self.matches[match.id] = match
+            if opponent == "human":
+                self.lobby = match
+            else:
+                match.seats["player_2"] = opponent
+            # the loop keeps only a weak reference to tasks: the match holds its own so it is not collected mid-game
+            match.task = asyncio.create_task(self._run(match))
+
+        agent = match.free_seat()
+        match.seats[agent] = connection
+        connection.send({"type": "joined", "match": match.id, "agent": agent})
+        if match.free_seat() is None:
+            match.started.set()
+        return match, agent
+
+    async def _run(self, match):
+        try:
+            await match.run()
+        finally:
+            self.matches.pop(match.id, None)
+            if self.lobby is match:
+                self.lobby = None
+
+    async def handle(self, connection):
+        match, agent = None, None
+        try:
+            async for message in connection.messages():
+                try:
+                    kind = message.get("type")
+                    if kind == "join" and match is None:
+                        match, agent = self.join(connection, message.get("opponent", "policy"))
+                    elif kind == "action" and match is not None:
+                        match.set_control(agent, message)
+                    else:
+                        raise ValueError(f"Unexpected message {kind!r}")
+                except (ValueError, TypeError, AttributeError) as error:
+                    connection.send({"type": "error", "message": str(error)})
+        except (ConnectionError, json.JSONDecodeError):
+            pass
+        finally:
+            if match is not None:
+                match.leave(agent)
+            connection.close()
+
+    async def handle_tcp(self, reader, writer):
+        await self.handle(TcpConnection(reader, writer))
+
+    async def handle_websocket(self, websocket, *args):
+        await self.handle(WebSocketConnection(websocket))
+
+    async def report(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            line = f"matches {len(self.matches)} | tick jitter {_percentiles(self.jitter)}"
+            if self.inference is not None and self.inference.batch_sizes:
+                line += (f" | inference {_percentiles(self.inference.latencies)}, "
+                         f"mean batch {np.mean(self.inference.batch_sizes):.1f}")
+            print(line)
+
+    async def serve(self, host="127.0.0.1", port=8765, ws_port=None):
+        tasks = [asyncio.create_task(self.report())]
+        if self.inference is not None:
+            tasks.append(asyncio.create_task(self.inference.run()))
+        servers = [await asyncio.start_server(self.handle_tcp, host, port)]
+        print(f"TCP on {host}:{port}")
+        if ws_port is not None:
+            try:
+                import websockets
+            except ImportError as error:
+                raise ImportError("WebSocket support needs the websockets package: pip install websockets") from error
+            servers.append(await websockets.serve(self.handle_websocket, host, ws_port))
+            print(f"WebSocket on {host}:{ws_port}")
+        try:
+            await asyncio.gather(*(server.wait_closed() for server in servers), *tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if self.inference is not None:
+                self.inference.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless Tron match server (human vs agent over TCP / WebSocket).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ws-port", type=int, default=None, help="Also accept WebSocket clients on this port")
+    parser.add_argument("--model", default=None, help="Checkpoint (.zip) played by 'policy' opponents")
+    parser.add_argument("--device", default="auto")
+    parser.add_argument("--tick", type=float, default=0.05, help="Seconds per physics tick (play.py's MOVE_DELAY)")
+    parser.add_argument("--max-matches", type=int, default=256)
+    parser.add_argument("--max-batch", type=int, default=256, help="Most observations per policy forward pass")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="How long a batch waits for more requests")
+    parser.add_argument("--map-pool", default=None, help="Pre-generated map pool (.npy from tron_maps.py)")
+    parser.add_argument("--stats-interval", type=float, default=10.0, help="Seconds between latency reports")
+    args = parser.parse_args()
+
+    inference = None
+    if args.model:
+        inference = InferenceQueue.from_checkpoint(args.model, device=args.device, max_batch=args.max_batch,
+                                                   max_wait=args.max_wait_ms / 1000.0)
+    map_pool = None
+    if args.map_pool:
+        from tron_maps import MapPool
+        map_pool = MapPool.load(args.map_pool)
+    server = TronServer(inference, tick_interval=args.tick, max_matches=args.max_matches, map_pool=map_pool,
+                        stats_interval=args.stats_interval)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.ws_port))
+    except KeyboardInterrupt:
+        pass
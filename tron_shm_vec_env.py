@@ -0,0 +1,252 @@
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnv
+from stable_baselines3.common.vec_env.util import dict_to_obs, obs_space_info
+
+"""
+The Shared-Memory Vector Env
+
+Role: Runs TronSinglePlayerWrapper copies in worker processes without pickling observations.
+
+Key Code: class TronShmVecEnv(VecEnv):
+
+Goal: Workers write observations, rewards and dones straight into one shared-memory NumPy block.
+      The pipes only carry tiny commands ("step") and the (small) info dicts back.
+      Observations are double-buffered: the arrays returned by step() are zero-copy views that stay
+      valid for one more step, which is exactly how long SB3 holds on to them (rollout_buffer.add(_last_obs)).
+"""
+
+N_OBS_SLOTS = 2
+
+
+def _shared_arrays(blocks, layout):
+    return {key: np.ndarray(shape, dtype=dtype, buffer=blocks[key].buf) for key, (shape, dtype) in layout.items()}
+
+
+def _write_obs(buffers, keys, slot, idx, obs):
+    for key in keys:
+        buffers[key][slot, idx] = obs if key is None else obs[key]
+
+
+def _env_command(envs, cmd, data, is_wrapped):
+    env = envs[data[0]]
+    if cmd == "env_method":
+        _, name, args, kwargs = data
+        return env.get_wrapper_attr(name)(*args, **kwargs)
+    if cmd == "get_attr":
+        return env.get_wrapper_attr(data[1])
+    if cmd == "has_attr":
+        return env.has_wrapper_attr(data[1])
+    if cmd == "set_attr":
+        return setattr(env, data[1], data[2])
+    return is_wrapped(env, data[1])
+
+
+def _worker(remote, parent_remote, env_fn_wrappers, start):
+    # Import here to avoid a circular import
+    from stable_baselines3.common.env_util import is_wrapped
+
+    parent_remote.close()
+    envs = [fn() for fn in env_fn_wrappers.var]
+    remote.send((envs[0].observation_space, envs[0].action_space))
+
+    # wait for the parent to allocate the shared block, then map it
+    names, layout, keys = remote.recv()
+    # the workers share the parent's resource tracker, the parent alone unlinks the blocks in close()
+    blocks = {key: shared_memory.SharedMemory(name=name) for key, name in names.items()}
+    arrays = _shared_arrays(blocks, layout)
+    obs = {key: arrays[("obs", key)] for key in keys}
+    terminal_obs = {key: arrays[("terminal_obs", key)] for key in keys}
+    actions, rewards, dones = arrays["actions"], arrays["rewards"], arrays["dones"]
+
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == "step":
+                slot = data
+                infos, reset_infos = [], []
+                for i, env in enumerate(envs):
+                    idx = start + i
+                    observation, reward, terminated, truncated, info = env.step(actions[idx])
+                    done = terminated or truncated
+                    info["TimeLimit.truncated"] = truncated and not terminated
+                    reset_info = None
+                    if done:
+                        # final observation goes to its own block, the parent attaches it to the info
+                        _write_obs(terminal_obs, keys, 0, idx, observation)
+                        observation, reset_info = env.reset()
+                    _write_obs(obs, keys, slot, idx, observation)
+                    rewards[idx] = reward
+                    dones[idx] = done
+                    infos.append(info)
+                    reset_infos.append(reset_info)
+                remote.send((infos, reset_infos))
+            elif cmd == "reset":
+                slot, seeds, options = data
+                reset_infos = []
+                for i, env in enumerate(envs):
+                    maybe_options = {"options": options[i]} if options[i] else {}
+                    observation, reset_info = env.reset(seed=seeds[i], **maybe_options)
+                    _write_obs(obs, keys, slot, start + i, observation)
+                    reset_infos.append(reset_info)
+                remote.send(reset_infos)
+            elif cmd in ("env_method", "get_attr", "has_attr", "set_attr", "is_wrapped"):
+                # errors (e.g. AttributeError for has_attr) are sent back and re-raised in the parent
+                try:
+                    remote.send((True, _env_command(envs, cmd, data, is_wrapped)))
+                except Exception as error:
+                    remote.send((False, error))
+            elif cmd == "close":
+                for env in envs:
+                    env.close()
+                remote.close()
+                break
+            else:
+                raise NotImplementedError(f"`{cmd}` is not implemented in the worker")
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        for block in blocks.values():
+            block.close()
+
+
+class TronShmVecEnv(VecEnv):
+    """
+    Multiprocess VecEnv that shares observations, actions, rewards and dones through shared memory.
+    Each worker process runs a contiguous slice of the environments (n_workers defaults to the CPU count).
+    Supports Box and Dict observation spaces.
+    """
+    def __init__(self, env_fns, n_workers=None, start_method=None):
+        self.waiting = False
+        self.closed = False
+        n_envs = len(env_fns)
+        n_workers = min(n_workers or os.cpu_count() or 1, n_envs)
+
+        if start_method is None:
+            # Fork is not a thread safe method, same default as SubprocVecEnv
+            start_method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        ctx = mp.get_context(start_method)
+
+        # --- START WORKERS (each owns env indices [start, stop)) ---
+        bounds = np.linspace(0, n_envs, n_workers + 1).astype(int)
+        self.env_owner = []  # env index -> (worker, local index)
+        self.remotes, self.processes = [], []
+        for w in range(n_workers):
+            start, stop = bounds[w], bounds[w + 1]
+            remote, work_remote = ctx.Pipe()
+            args = (work_remote, remote, CloudpickleWrapper(env_fns[start:stop]), int(start))
+            # daemon=True: if the main process crashes, we should not cause things to hang
+            process = ctx.Process(target=_worker, args=args, daemon=True)
+            process.start()
+            work_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+            self.env_owner += [(w, i) for i in range(stop - start)]
+
+        spaces_per_worker = [remote.recv() for remote in self.remotes]
+        observation_space, action_space = spaces_per_worker[0]
+
+        # --- SHARED BLOCK ---
+        self.keys, shapes, dtypes = obs_space_info(observation_space)
+        layout = {}
+        for key in self.keys:
+            layout[("obs", key)] = ((N_OBS_SLOTS, n_envs, *shapes[key]), dtypes[key])
+            layout[("terminal_obs", key)] = ((1, n_envs, *shapes[key]), dtypes[key])
+        layout["actions"] = ((n_envs, *action_space.shape), action_space.dtype)
+        layout["rewards"] = ((n_envs,), np.float32)
+        layout["dones"] = ((n_envs,), bool)
+        self._blocks = {}
+        for key, (shape, dtype) in layout.items():
+            size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            self._blocks[key] = shared_memory.SharedMemory(create=True, size=size)
+        arrays = _shared_arrays(self._blocks, layout)
+        self._obs = {key: arrays[("obs", key)] for key in self.keys}
+        self._terminal_obs = {key: arrays[("terminal_obs", key)] for key in self.keys}
+        self._actions, self._rewards, self._dones = arrays["actions"], arrays["rewards"], arrays["dones"]
+        self._slot = 0
+
+        names = {key: block.name for key, block in self._blocks.items()}
+        for remote in self.remotes:
+            remote.send((names, layout, self.keys))
+
+        super().__init__(n_envs, observation_space, action_space)
+
+    def _obs_views(self, slot):
+        return dict_to_obs(self.observation_space, {key: self._obs[key][slot] for key in self.keys})
+
+    def reset(self):
+        self._slot = (self._slot + 1) % N_OBS_SLOTS
+        for w, remote in enumerate(self.remotes):
+            envs = [i for i, (owner, _) in enumerate(self.env_owner) if owner == w]
+            remote.send(("reset", (self._slot, [self._seeds[i] for i in envs], [self._options[i] for i in envs])))
+        self.reset_infos = [info for remote in self.remotes for info in remote.recv()]
+        # Seeds and options are only used once
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs_views(self._slot)
+
+    def step_async(self, actions):
+        self._actions[:] = np.asarray(actions).reshape(self._actions.shape)
+        self._slot = (self._slot + 1) % N_OBS_SLOTS
+        for remote in self.remotes:
+            remote.send(("step", self._slot))
+        self.waiting = True
+
+    def step_wait(self):
+        infos = []
+        for remote in self.remotes:
+            worker_infos, worker_reset_infos = remote.recv()
+            for info, reset_info in zip(worker_infos, worker_reset_infos):
+                idx = len(infos)
+                if reset_info is not None:
+                    self.reset_infos[idx] = reset_info
+                    info["terminal_observation"] = dict_to_obs(
+                        self.observation_space, {key: self._terminal_obs[key][0, idx].copy() for key in self.keys})
+                infos.append(info)
+        self.waiting = False
+        return self._obs_views(self._slot), self._rewards.copy(), self._dones.copy(), infos
+
+    def close(self):
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv()
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for process in self.processes:
+            process.join()
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self.closed = True
+
+    def _call(self, indices, cmd, *data):
+        results = []
+        for idx in self._get_indices(indices):
+            worker, local = self.env_owner[idx]
+            self.remotes[worker].send((cmd, (local, *data)))
+            ok, result = self.remotes[worker].recv()
+            if not ok:
+                raise result
+            results.append(result)
+        return results
+
+    def has_attr(self, attr_name):
+        # asked in the worker: get_attr would try to pickle bound methods (and the env with them)
+        return self._call([0], "has_attr", attr_name)[0]
+
+    def get_attr(self, attr_name, indices=None):
+        return self._call(indices, "get_attr", attr_name)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._call(indices, "set_attr", attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._call(indices, "env_method", method_name, method_args, method_kwargs)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return self._call(indices, "is_wrapped", wrapper_class)
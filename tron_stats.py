@@ -0,0 +1,96 @@
+import time
+from collections import defaultdict
+
+"""
+Step Instrumentation
+
+Role: Optional per-phase timers and event counters for TronEnv / TronBatchEnv / the single-player wrapper,
+      flushed to TensorBoard next to the PPO metrics.
+
+Key Code: class TronStats:, class TronStatsCallback(BaseCallback):
+
+Goal: Find out where a slow run spends its time. Envs built with profile=False keep stats = None
+      and skip all of this behind a single `is not None` check. TronStatsCallback is built on first access,
+      so importing TronStats never loads stable-baselines3.
+"""
+
+
+class TronStats:
+    """
+    Accumulates seconds per phase ("move", "observe", "reset", "wrapper", ...) and integer counters
+    ("steps", "resets", "deaths_wall", "deaths_trail", "head_hits", "boosts_used", ...).
+    """
+    def __init__(self):
+        self.times = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    def add_time(self, phase, start):
+        # `start` is a time.perf_counter() value taken when the phase began
+        self.times[phase] += time.perf_counter() - start
+
+    def count(self, name, n=1):
+        self.counts[name] += int(n)
+
+    def merge(self, other):
+        for phase, seconds in other.times.items():
+            self.times[phase] += seconds
+        for name, n in other.counts.items():
+            self.counts[name] += n
+
+    def pop(self):
+        # hand back everything gathered so far and start over
+        popped = TronStats()
+        popped.times, popped.counts = self.times, self.counts
+        self.times, self.counts = defaultdict(float), defaultdict(int)
+        return popped
+
+
+def _build_callback():
+    from stable_baselines3.common.callbacks import BaseCallback
+
+    class TronStatsCallback(BaseCallback):
+        """
+        Collects the envs' TronStats after every rollout (through env_method("pop_stats"), so it works with
+        DummyVecEnv, TronShmVecEnv and TronBatchEnv alike) and records them under tron/:
+        counters as totals per rollout, phase timers as microseconds per env step, plus the wall-clock
+        time of the rollout and of the PPO update that preceded it.
+        """
+        def __init__(self, verbose=0):
+            super().__init__(verbose)
+            self.rollout_start = None
+            self.rollout_end = None
+
+        def _on_rollout_start(self):
+            now = time.perf_counter()
+            if self.rollout_end is not None:
+                self.logger.record("tron/time_ppo_update_s", now - self.rollout_end)
+            self.rollout_start = now
+
+        def _on_step(self):
+            return True
+
+        def _on_rollout_end(self):
+            self.rollout_end = time.perf_counter()
+            self.logger.record("tron/time_rollout_s", self.rollout_end - self.rollout_start)
+            if not self.training_env.has_attr("pop_stats"):
+                return
+
+            stats = TronStats()
+            for env_stats in self.training_env.env_method("pop_stats"):
+                if env_stats is not None:
+                    stats.merge(env_stats)
+            steps = max(stats.counts.get("steps", 0), 1)
+            for name, n in stats.counts.items():
+                self.logger.record(f"tron/{name}", n)
+            for phase, seconds in stats.times.items():
+                self.logger.record(f"tron/time_{phase}_us_per_step", 1e6 * seconds / steps)
+
+    return TronStatsCallback
+
+
+def __getattr__(name):
+    # the SB3 callback is only built on first use, so envs that just count can import TronStats without SB3
+    if name == "TronStatsCallback":
+        globals()[name] = _build_callback()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
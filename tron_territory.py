@@ -0,0 +1,279 @@
+import numpy as np
+
+from tron_core import VAL_EMPTY, VAL_BOOST
+
+"""
+Territory Features (No Graphics)
+
+Role: Tracks, for every agent, the area it can still reach and its Voronoi territory (the cells it reaches
+      strictly before any other agent), so reward shaping and scripted bots can read them every step.
+
+Key Code: class TerritoryTracker:, flood_fill(...), voronoi(...)
+
+Goal: Keep the step loop fast. Masks are bitboards (one Python int per mask), so a full flood fill or
+      Voronoi BFS advances a whole frontier with a handful of big-int shifts. Reachable areas are patched
+      cell by cell and only re-flooded when a blocked cell may have cut a region in two (or a freed cell
+      may have joined two). Territory needs no BFS at all once the agents' regions are separated.
+
+Bit layout: cell (x, y) is bit x * (height + 1) + y. The spare bit at the end of every column is never
+            free, so shifting by +-1 cannot wrap from one column into the next.
+"""
+
+TIE = -2      # Voronoi owner of cells reached by several agents at the same distance
+NOBODY = -1   # cells no agent can reach
+
+# the 8 cells around a cell, in ring order; even entries are the 4-neighbours
+RING = [(0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)]
+
+
+def flood_fill(free, reach, stride):
+    """Grows the bitboard `reach` through the free cells of `free` until it stops changing."""
+    reach &= free
+    frontier = reach
+    while frontier:
+        frontier = ((frontier << 1) | (frontier >> 1) | (frontier << stride) | (frontier >> stride)) & free & ~reach
+        reach |= frontier
+    return reach
+
+
+def voronoi(free, seeds, stride):
+    """
+    Simultaneous BFS from every agent's seed cells through `free`.
+    Returns one bitboard per agent with the cells it reaches first; cells reached at the same
+    distance by several agents belong to nobody and stop spreading.
+    """
+    unclaimed = free
+    frontiers = [seed & free for seed in seeds]
+    owned = [0] * len(seeds)
+    while any(frontiers):
+        seen, tied = 0, 0
+        for frontier in frontiers:
+            tied |= seen & frontier
+            seen |= frontier
+        unclaimed &= ~seen
+        for i, frontier in enumerate(frontiers):
+            frontier &= ~tied
+            owned[i] |= frontier
+            frontiers[i] = ((frontier << 1) | (frontier >> 1) | (frontier << stride) | (frontier >> stride)) & unclaimed
+    return owned
+
+
+class TerritoryTracker:
+    """
+    Reachable area (free cells connected to the head) and Voronoi territory of every agent on one board.
+    Heads count as blocked, walls / trails / the board edge too; empty cells and boosts are free.
+    The env calls reset() after building a board, touch(x, y) for every grid write and update() once per step.
+    Territory is recomputed every `territory_every` updates (always when regions are separated, which is free).
+    Agents are ids 0 .. n_agents - 1; the per-agent masks and counts are lists indexed by id.
+    """
+    def __init__(self, width, height, n_agents, territory_every=1):
+        self.width = width
+        self.height = height
+        self.stride = height + 1
+        self.n_bytes = (width * self.stride + 7) // 8
+        self.agents = list(range(n_agents))
+        self.territory_every = territory_every
+        self.free = 0
+        self.heads = {}  # id -> head cell, for the agents still on the board
+        self.touched = []
+        self.reach = [0] * n_agents
+        self.single = [True] * n_agents  # reach is one connected region
+        self.area = [0] * n_agents
+        self.owned = [0] * n_agents
+        self.territory = [0] * n_agents
+        self.updates = 0
+        self.recomputes = 0
+
+    # --- BITBOARDS ---
+
+    def _bit(self, x, y):
+        return 1 << (x * self.stride + y)
+
+    def _inside(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def _neighbours(self, mask):
+        return ((mask << 1) | (mask >> 1) | (mask << self.stride) | (mask >> self.stride)) & self.free
+
+    def to_bits(self, mask):
+        """(width, height) bool array -> bitboard."""
+        padded = np.zeros((self.width, self.stride), dtype=bool)
+        padded[:, :self.height] = mask
+        return int.from_bytes(np.packbits(padded, bitorder="little").tobytes(), "little")
+
+    def to_plane(self, bits):
+        """Bitboard -> (width, height) uint8 array of 0 / 1."""
+        data = np.frombuffer(bits.to_bytes(self.n_bytes, "little"), dtype=np.uint8)
+        unpacked = np.unpackbits(data, bitorder="little", count=self.width * self.stride)
+        return unpacked.reshape(self.width, self.stride)[:, :self.height]
+
+    # --- UPDATES ---
+
+    def _heads(self, positions, alive):
+        # positions: (n_agents, 2) array, alive: (n_agents,) bool array
+        heads = {}
+        for agent in np.flatnonzero(alive).tolist():
+            x, y = int(positions[agent, 0]), int(positions[agent, 1])
+            if self._inside(x, y):
+                heads[agent] = (x, y)
+        return heads
+
+    def reset(self, grid, positions, alive):
+        self.heads = self._heads(positions, alive)
+        free = (grid == VAL_EMPTY) | (grid == VAL_BOOST)
+        for x, y in self.heads.values():
+            free[x, y] = False
+        self.free = self.to_bits(free)
+        self.touched = []
+        self.updates = 0
+        for agent in self.agents:
+            self._recompute(agent)
+        self._refresh(force=True)
+
+    def touch(self, x, y):
+        self.touched.append((x, y))
+
+    def update(self, grid, positions, alive):
+        """Brings the masks up to date after a step. Returns how many full flood fills it needed."""
+        recomputes = self.recomputes
+        old_heads = self.heads
+        self.heads = self._heads(positions, alive)
+        head_cells = set(self.heads.values())
+        cells = set(self.touched)
+        cells.update(old_heads.values(), head_cells)
+        self.touched = []
+
+        # which cells changed between free and blocked
+        blocked, freed = [], []
+        for x, y in cells:
+            if not self._inside(x, y):
+                continue
+            bit = self._bit(x, y)
+            is_free = (grid[x, y] == VAL_EMPTY or grid[x, y] == VAL_BOOST) and (x, y) not in head_cells
+            if is_free and not self.free & bit:
+                self.free |= bit
+                freed.append(bit)
+            elif not is_free and self.free & bit:
+                self.free &= ~bit
+                blocked.append((x, y, bit))
+
+        # a head that left its region (or a region that was already in pieces) needs a new flood fill
+        dirty = set()
+        for agent in self.agents:
+            head = self.heads.get(agent)
+            if head is None:
+                self.reach[agent], self.single[agent] = 0, True
+            elif head != old_heads.get(agent) and (not self.single[agent] or not self.reach[agent] & self._bit(*head)):
+                dirty.add(agent)
+
+        for x, y, bit in blocked:
+            splits = None
+            for agent in self.heads:
+                if agent in dirty or not self.reach[agent] & bit:
+                    continue
+                if splits is None:
+                    splits = self._may_split(x, y)
+                if splits:
+                    dirty.add(agent)
+                else:
+                    self.reach[agent] &= ~bit
+
+        for bit in freed:
+            adjacent = (bit << 1) | (bit >> 1) | (bit << self.stride) | (bit >> self.stride)
+            near = adjacent & self.free
+            for agent, head in self.heads.items():
+                if agent in dirty:
+                    continue
+                reach = self.reach[agent]
+                if not near & reach and not adjacent & self._bit(*head):
+                    continue
+                if near & ~reach:
+                    # the freed cell touches free cells outside the region, which may merge two regions
+                    dirty.add(agent)
+                else:
+                    self.single[agent] = self.single[agent] and (reach == 0 or bool(near & reach))
+                    self.reach[agent] = reach | bit
+
+        for agent in dirty:
+            self._recompute(agent)
+        self.updates += 1
+        self._refresh(force=self.updates % self.territory_every == 0)
+        return self.recomputes - recomputes
+
+    def _may_split(self, x, y):
+        # blocking (x, y) cannot disconnect its free 4-neighbours if they are joined around the 8-cell ring
+        ring = [self._inside(x + dx, y + dy) and bool(self.free & self._bit(x + dx, y + dy)) for dx, dy in RING]
+        if all(ring):
+            return False
+        start = ring.index(False)
+        runs, in_run, run_has_edge = 0, False, False
+        for k in range(1, 9):
+            i = (start + k) % 8
+            if ring[i]:
+                in_run = True
+                run_has_edge |= i % 2 == 0
+            elif in_run:
+                runs += run_has_edge
+                in_run, run_has_edge = False, False
+        return runs > 1
+
+    def _recompute(self, agent):
+        # full flood fill from the free cells next to the head
+        self.recomputes += 1
+        head = self.heads.get(agent)
+        seeds = self._neighbours(self._bit(*head)) if head is not None else 0
+        if not seeds:
+            self.reach[agent], self.single[agent] = 0, True
+            return
+        reach = flood_fill(self.free, seeds & -seeds, self.stride)
+        self.single[agent] = not seeds & ~reach
+        if not self.single[agent]:
+            reach = flood_fill(self.free, reach | seeds, self.stride)
+        self.reach[agent] = reach
+
+    def _refresh(self, force):
+        for agent in self.agents:
+            self.area[agent] = self.reach[agent].bit_count()
+        # regions that do not overlap are each agent's territory as they are
+        seen, overlap = 0, False
+        for agent in self.heads:
+            overlap |= bool(seen & self.reach[agent])
+            seen |= self.reach[agent]
+        if overlap and not force:
+            return
+        if overlap:
+            agents = list(self.heads)
+            seeds = [self._neighbours(self._bit(*self.heads[agent])) for agent in agents]
+            owned = dict(zip(agents, voronoi(self.free, seeds, self.stride)))
+        else:
+            owned = {agent: self.reach[agent] for agent in self.heads}
+        for agent in self.agents:
+            self.owned[agent] = owned.get(agent, 0) if agent in self.heads else 0
+            self.territory[agent] = self.owned[agent].bit_count()
+
+    # --- FEATURES ---
+
+    def features(self, agent):
+        """
+        Cell counts for `agent` and its enemies: the largest reachable area of any other agent (reachable
+        regions overlap, a sum would count shared cells several times) and the territory of all others together.
+        """
+        return {
+            "reachable_area": self.area[agent],
+            "territory": self.territory[agent],
+            "enemy_reachable_area": max((self.area[a] for a in self.agents if a != agent), default=0),
+            "enemy_territory": sum(self.territory[a] for a in self.agents if a != agent),
+        }
+
+    def owner_plane(self):
+        """(width, height) int8 array: index of the agent owning each cell, NOBODY or TIE."""
+        owner = np.full((self.width, self.height), NOBODY, dtype=np.int8)
+        seen = 0
+        for agent in self.agents:
+            owner[self.to_plane(self.owned[agent]).astype(bool)] = agent
+            seen |= self.owned[agent]
+        reachable = 0
+        for agent in self.heads:
+            reachable |= self.reach[agent]
+        owner[self.to_plane(reachable & ~seen).astype(bool)] = TIE
+        return owner
@@ -0,0 +1,107 @@
+import os
+import numpy as np
+
+"""
+Headless Rendering + Episode Export (No Window, No OpenGL)
+
+Role: Turns grids into RGB images with one palette lookup and writes episodes to GIF / MP4.
+
+Key Code: grid_to_rgb(grid), class EpisodeRecorder:
+
+Goal: Watch agents on machines without a display. Frames are stored as palette indices (the grid itself),
+      so recording is a copy per step and the file is written as fast as the encoder allows.
+"""
+
+# colours indexed by grid value (VAL_EMPTY ... player 8 trail), also uploaded to the shader in tron_renderer.py
+PALETTE = np.array([
+    [13, 13, 20],     # empty floor
+    [128, 128, 128],  # wall
+    [255, 255, 0],    # boost
+    [0, 255, 255],    # player 1 head
+    [255, 0, 51],     # player 2 head
+    [0, 128, 128],    # player 1 trail
+    [128, 0, 26],     # player 2 trail
+    [0, 255, 0],      # player 3 head
+    [0, 128, 0],      # player 3 trail
+    [255, 128, 0],    # player 4 head
+    [128, 64, 0],     # player 4 trail
+    [255, 0, 255],    # player 5 head
+    [128, 0, 128],    # player 5 trail
+    [51, 102, 255],   # player 6 head
+    [26, 51, 128],    # player 6 trail
+    [160, 255, 80],   # player 7 head
+    [80, 128, 40],    # player 7 trail
+    [255, 140, 180],  # player 8 head
+    [128, 70, 90],    # player 8 trail
+], dtype=np.uint8)
+
+
+def grid_to_image(grid, scale=1):
+    # grid is indexed [x, y]; images are [row (y), column (x)], each cell becomes a scale x scale block
+    image = grid.T
+    if scale > 1:
+        image = np.repeat(np.repeat(image, scale, axis=0), scale, axis=1)
+    return np.ascontiguousarray(image)
+
+
+def grid_to_rgb(grid, scale=1):
+    """(width, height) grid -> (height * scale, width * scale, 3) uint8 RGB image."""
+    return PALETTE[grid_to_image(grid, scale)]
+
+
+class EpisodeRecorder:
+    """
+    Collects frames of one or more episodes and writes them to `path` on close().
+    .gif is written with Pillow straight from palette indices; any other extension (.mp4, ...) goes
+    through imageio (pip install imageio[ffmpeg]).
+    """
+    def __init__(self, path, fps=20, scale=4):
+        self.path = path
+        self.fps = fps
+        self.scale = scale
+        self.frames = []
+
+    def add_grid(self, grid):
+        self.frames.append(grid_to_image(grid, self.scale))
+
+    def add_env(self, env):
+        # works with TronEnv and anything exposing it as .env (e.g. TronSinglePlayerWrapper)
+        self.add_grid(getattr(env, "env", env).grid)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def close(self):
+        if not self.frames:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if self.path.lower().endswith(".gif"):
+            self._write_gif()
+        else:
+            self._write_video()
+        self.frames = []
+
+    def _write_gif(self):
+        from PIL import Image
+        palette = PALETTE.flatten().tolist()
+        images = []
+        for frame in self.frames:
+            image = Image.frombytes("P", (frame.shape[1], frame.shape[0]), frame.tobytes())
+            image.putpalette(palette)
+            images.append(image)
+        images[0].save(self.path, save_all=True, append_images=images[1:], duration=int(1000 / self.fps), loop=0)
+
+    def _write_video(self):
+        try:
+            import imageio
+        except ImportError as error:
+            raise ImportError("Writing videos needs imageio: pip install imageio[ffmpeg] (or record to a .gif)") from error
+        with imageio.get_writer(self.path, fps=self.fps) as writer:
+            for frame in self.frames:
+                writer.append_data(PALETTE[frame])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
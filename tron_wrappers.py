@@ -0,0 +1,247 @@
+import time
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.utils import seeding
+
+from tron_env import TronEnv, VAL_EMPTY, VAL_BOOST, MOVE_DX, MOVE_DY, BOOST_NO
+from tron_maps import MapPool
+from tron_bots import get_bot, env_action
+
+"""
+Single-Player Wrapper (Gymnasium Adapter)
+
+Role: Turns the multi-agent TronEnv into the single-agent Gymnasium env PPO trains on: the learner is player 1,
+      every other player is a scripted bot.
+
+Key Code: class TronSinglePlayerWrapper(gym.Env):, class FrameRing:, make_env(...)
+
+Goal: Watching, benchmarking and worker processes get the wrapper without importing torch or stable-baselines3
+      (which train.py needs for the policy and the PPO loop).
+"""
+
+
+class FrameRing:
+    """
+    The last k frames of an observation array, stacked along its last (channel) axis, oldest first.
+    Mirrored ring buffer: each frame is written to slot i and slot i + k of a 2k-slot buffer, so the newest
+    k frames are always one contiguous slice. push() copies one frame twice and returns a read-only view;
+    the history itself is never copied. The view changes on the next push (copy it to keep it).
+    """
+    def __init__(self, shape, dtype, k):
+        self.k = k
+        self.channels = shape[-1]
+        self.buffer = np.zeros((*shape[:-1], 2 * k * self.channels), dtype=dtype)
+        # one opaque item per cell and slot: a frame write is one strided copy of whole cells, not of single bytes
+        self.cell = np.dtype((np.void, self.channels * self.buffer.itemsize))
+        self.slots = self.buffer.reshape(-1, 2 * k, self.channels).view(self.cell)[..., 0]
+        self.head = 0  # slot of the oldest frame in the window
+        self.views = []
+        for head in range(k):
+            view = self.buffer[..., head * self.channels:(head + k) * self.channels]
+            view.flags.writeable = False
+            self.views.append(view)
+
+    def _cells(self, frame):
+        return np.ascontiguousarray(frame, dtype=self.buffer.dtype).reshape(-1, self.channels).view(self.cell)[:, 0]
+
+    def reset(self, frame):
+        # a new episode starts with k copies of its first frame
+        self.slots[:] = self._cells(frame)[:, None]
+        self.head = 0
+        return self.views[0]
+
+    def push(self, frame):
+        # the oldest frame's slot (and its mirror) take the new frame, the window moves one slot on
+        cells = self._cells(frame)
+        self.slots[:, self.head] = cells
+        self.slots[:, self.head + self.k] = cells
+        self.head = (self.head + 1) % self.k
+        return self.views[self.head]
+
+
+def stacked_space(space, k):
+    # Box (or Dict of Boxes) with the last axis repeated k times
+    if isinstance(space, gym.spaces.Dict):
+        return gym.spaces.Dict({key: stacked_space(sub, k) for key, sub in space.items()})
+    low = np.broadcast_to(space.low, space.shape)
+    high = np.broadcast_to(space.high, space.shape)
+    return gym.spaces.Box(low=np.concatenate([low] * k, axis=-1), high=np.concatenate([high] * k, axis=-1),
+                          shape=(*space.shape[:-1], space.shape[-1] * k), dtype=space.dtype)
+
+
+def copy_obs(obs):
+    # an observation (or Dict of them) detached from the buffers it views
+    if isinstance(obs, dict):
+        return {key: np.array(value) for key, value in obs.items()}
+    return np.array(obs)
+
+
+class TronSinglePlayerWrapper(gym.Env):
+    """
+    Wraps the Multi-Agent TronEnv to make it look like a Single-Agent Gymnasium Env.
+    Player 2 (and every further player) is a scripted bot from tron_bots.BOTS, chosen by name
+    (a random bot by default).
+    width / height / n_players / obs_mode / view_radius / map_pool / profile / render_mode are passed through to TronEnv.
+
+    action_repeat=k plays each chosen action for up to k engine ticks (boosting on the first tick only) and hands
+    control back early when Player 1 is about to crash (the next cell straight ahead is blocked or an enemy head is
+    within DANGER_RADIUS) or has just picked up a boost. Rewards are summed over the ticks, info["ticks"] counts them.
+
+    frame_stack=k returns the last k observations (one per decision) stacked along the channel axis, for "grid"
+    and "egocentric" alike (each Dict entry is stacked). The stack is a view into a per-env FrameRing.
+    Observations are read-only views that change on the next step, except the last one of an episode (a copy).
+    """
+    metadata = TronEnv.metadata
+    DANGER_RADIUS = 2
+
+    def __init__(self, width=100, height=100, n_players=2, obs_mode="grid", view_radius=10, map_pool=None,
+                 opponent="random", action_repeat=1, frame_stack=1, profile=False, render_mode=None):
+        super().__init__()
+        if action_repeat < 1:
+            raise ValueError(f"action_repeat must be at least 1, got {action_repeat}")
+        if frame_stack < 1:
+            raise ValueError(f"frame_stack must be at least 1, got {frame_stack}")
+        self.render_mode = render_mode
+        self.action_repeat = action_repeat
+        self.opponent = opponent
+        self.bot = get_bot(opponent)
+        self.env = TronEnv(width=width, height=height, n_players=n_players, obs_mode=obs_mode,
+                           view_radius=view_radius, map_pool=map_pool, profile=profile, render_mode=render_mode)
+        self.np_random = None
+        
+        # We only expose Player 1's spaces to the RL Agent
+        self.frame_space = self.env.observation_space("player_1")
+        self.observation_space = self.frame_space
+        self.action_space = self.env.action_space("player_1")
+        self.frames = None
+        if frame_stack > 1:
+            self.observation_space = stacked_space(self.frame_space, frame_stack)
+            if isinstance(self.frame_space, gym.spaces.Dict):
+                self.frames = {key: FrameRing(space.shape, space.dtype, frame_stack)
+                               for key, space in self.frame_space.items()}
+            else:
+                self.frames = FrameRing(self.frame_space.shape, self.frame_space.dtype, frame_stack)
+        
+    def reset(self, seed=None, options=None):
+        # Wrapper RNG drives the random bot, TronEnv's RNG drives the map and turn order
+        if seed is not None:
+            self.np_random, _ = seeding.np_random(seed)
+        # 1. Reset the underlying multi-agent env
+        obs_dict, info_dict = self.env.reset(seed=seed)
+        
+        # 2. Return only Player 1's observation
+        return self._stack(obs_dict["player_1"], reset=True), info_dict.get("player_1", {})
+
+    def step(self, action):
+        stats = self.env.stats
+        if stats is None:
+            return self._step(action)
+        step_start = time.perf_counter()
+        result = self._step(action)
+        stats.add_time("wrapper_step", step_start)
+        return result
+
+    def _step(self, action):
+        # one decision = up to action_repeat ticks of the same move and trail setting
+        action = np.asarray(action)
+        total_reward, ticks = 0.0, 0
+        while True:
+            boosts = self.env.boosts[0]
+            obs, reward, terminated, truncated, info = self._tick(action)
+            total_reward += reward
+            ticks += 1
+            if terminated or truncated or ticks >= self.action_repeat:
+                break
+            if self.env.boosts[0] > boosts or self._danger_ahead():
+                break
+            action = action.copy()
+            action[2] = BOOST_NO
+        info = dict(info)
+        info["ticks"] = ticks
+        obs = self._stack(obs)
+        if terminated or truncated:
+            # VecEnvs keep the last observation (info["terminal_observation"]) and reset right away,
+            # which would rewrite the buffers behind the views
+            obs = copy_obs(obs)
+        return obs, total_reward, terminated, truncated, info
+
+    def _stack(self, obs, reset=False):
+        if self.frames is None:
+            return obs
+        if isinstance(self.frames, dict):
+            return {key: ring.reset(obs[key]) if reset else ring.push(obs[key]) for key, ring in self.frames.items()}
+        return self.frames.reset(obs) if reset else self.frames.push(obs)
+
+    def _danger_ahead(self):
+        # Player 1 should decide again: the cell straight ahead is blocked or an enemy head is close
+        env = self.env
+        x, y = (int(v) for v in env.positions[0])
+        heading = int(env.dirs[0])
+        nx, ny = x + MOVE_DX[heading], y + MOVE_DY[heading]
+        if not (0 <= nx < env.width and 0 <= ny < env.height) or env.grid[nx, ny] not in (VAL_EMPTY, VAL_BOOST):
+            return True
+        enemies = env.alive.copy()
+        enemies[0] = False
+        distance = np.abs(env.positions[enemies] - env.positions[0]).sum(axis=1)
+        return bool((distance <= self.DANGER_RADIUS).any())
+
+    def _tick(self, action):
+        # 1. AI controls Player 1, the bot controls Player 2 (and any other player)
+        actions = {"player_1": action}
+        for agent in self.env.possible_agents[1:]:
+            if self.opponent == "random":
+                p2_space = self.env.action_space(agent)
+                # Sample from MultiDiscrete properly: returns array [move, trail, boost]
+                actions[agent] = self.np_random.integers(p2_space.nvec)  # seeded through reset(seed=...)
+            else:
+                actions[agent] = env_action(self.bot, self.env, agent, self.np_random)
+        
+        # 2. Step the environment
+        obs, rewards, terms, truncs, infos = self.env.step(actions)
+
+        # 3. Extract Player 1's reward BEFORE checking if player is in obs
+        p1_reward = rewards.get("player_1", -10.0)
+        p1_terminated = terms.get("player_1", False)
+        p1_truncated = truncs.get("player_1", False)
+        p1_info = infos.get("player_1", {})
+
+        # 4. Handle Player 1 Death when the env omits its keys
+        if "player_1" not in obs:
+            return self._dead_obs(), p1_reward, True, False, p1_info
+
+        # 5. Standard Return (Player 1 is still alive)
+        return (
+            obs["player_1"], 
+            float(p1_reward), 
+            bool(p1_terminated), 
+            bool(p1_truncated), 
+            p1_info
+        )
+    
+
+    def _dead_obs(self):
+        # blank observation handed back once Player 1 is gone
+        if isinstance(self.frame_space, gym.spaces.Dict):
+            return {key: np.zeros(space.shape, dtype=space.dtype) for key, space in self.frame_space.items()}
+        return np.zeros(self.frame_space.shape, dtype=self.frame_space.dtype)
+
+    def pop_stats(self):
+        return self.env.pop_stats()
+
+    def render(self):
+        return self.env.render()
+    
+    def close(self):
+        return self.env.close()
+
+
+def make_env(obs_mode="grid", view_radius=10, map_pool_path=None, opponent="random", profile=False,
+             width=100, height=100, n_players=2, action_repeat=1, frame_stack=1):
+    # picklable env factory for worker processes: the map pool is opened (memory-mapped) inside each worker
+    def _init():
+        map_pool = MapPool.load(map_pool_path) if map_pool_path else None
+        return TronSinglePlayerWrapper(width=width, height=height, n_players=n_players, obs_mode=obs_mode,
+                                       view_radius=view_radius, map_pool=map_pool, opponent=opponent,
+                                       action_repeat=action_repeat, frame_stack=frame_stack, profile=profile)
+    return _init
@@ -1,36 +1,98 @@
+import argparse
 import time
-from stable_baselines3 import PPO
-from train import TronSinglePlayerWrapper
+import numpy as np
+from tron_wrappers import TronSinglePlayerWrapper
+from tron_video import EpisodeRecorder
+from tron_dataset import TrajectoryRecorder
 
-# 1. Load Environment
-env = TronSinglePlayerWrapper()
+parser = argparse.ArgumentParser(description="Watch (or record) a trained agent playing Tron.")
+parser.add_argument("--model", default="models/PPO/tron_v1.zip",
+                    help="Saved PPO model (.zip) or a policy exported with tron_export.py (.pt, torch only)")
+parser.add_argument("--threads", type=int, default=1, help="Torch CPU threads for an exported (.pt) policy")
+parser.add_argument("--fps", type=float, default=20, help="Playback speed in the window (0 = as fast as possible)")
+parser.add_argument("--record", default=None,
+                    help="Headless: write each game to this file instead of opening a window, "
+                         "e.g. videos/game.gif ({episode} is replaced by the game number)")
+parser.add_argument("--episodes", type=int, default=0, help="Stop after this many games (0 = forever, 1 when recording)")
+parser.add_argument("--scale", type=int, default=4, help="Pixels per cell in recordings")
+parser.add_argument("--dataset", default=None,
+                    help="Append the agent's transitions (observation, action, reward, done) to this dataset directory")
+args = parser.parse_args()
 
-# 2. Load Model
-model_path = "models/PPO/tron_v1.zip"
-model = PPO.load(model_path, env=env)
+episodes = args.episodes or (1 if args.record else 0)
+
+# 1. Load Model (torch / stable-baselines3 only load here, after the arguments are checked)
+# an exported policy decides in one TorchScript call and also tells which observations it was trained on
+runtime = None
+env_kwargs = {}
+if args.model.endswith(".pt"):
+    from tron_export import PolicyRuntime
+    runtime = PolicyRuntime(args.model, threads=args.threads)
+    env_kwargs = runtime.env_kwargs()
+
+# 2. Load Environment (no window at all when recording)
+env = TronSinglePlayerWrapper(render_mode="rgb_array" if args.record else "human", **env_kwargs)
+
+if runtime is None:
+    from stable_baselines3 import PPO
+    model = PPO.load(args.model, env=env)
 
 # 3. Play Loop
 obs, _ = env.reset()
 done = False
+episode = 0
+recorder = None
+decision_times = []
+dataset = TrajectoryRecorder(args.dataset, env.env) if args.dataset else None
+if args.record:
+    recorder = EpisodeRecorder(args.record.format(episode=episode), fps=args.fps or 20, scale=args.scale)
+    recorder.add_env(env)
 
 print("Watching trained agent play...")
 
-while not done:
-    # Predict the best action (deterministic=True creates more stable behavior)
-    action, _states = model.predict(obs, deterministic=True)
-    
-    # Step environment
-    obs, reward, done, truncated, info = env.step(action)
-    
-    # Render
-    env.render()
-    
-    # Slow it down so humans can see
-    time.sleep(0.05)
-
-    if done or truncated:
-        print("Game Finished. Starting new game...")
-        obs, _ = env.reset()
-        done = False
-
-env.close()
\ No newline at end of file
+try:
+    while True:
+        frame_start = time.perf_counter()
+        # Predict the best action (deterministic=True creates more stable behavior)
+        decision_start = time.perf_counter()
+        if runtime is not None:
+            action = runtime.act(obs)
+        else:
+            action, _states = model.predict(obs, deterministic=True)
+        decision_times.append(time.perf_counter() - decision_start)
+
+        # Step environment (the dataset keeps the observation the action was chosen from)
+        if dataset is not None:
+            dataset.add_obs(obs)
+        obs, reward, done, truncated, info = env.step(action)
+        if dataset is not None:
+            dataset.add_step(action, reward, done or truncated)
+
+        # Render (recording stores the grid, the window draws it and is paced to --fps)
+        if recorder is not None:
+            recorder.add_env(env)
+        else:
+            env.render()
+            if args.fps > 0:
+                time.sleep(max(0.0, 1.0 / args.fps - (time.perf_counter() - frame_start)))
+
+        if done or truncated:
+            episode += 1
+            print(f"Game {episode} Finished. Decisions took {1000 * np.median(decision_times):.2f} ms (median).")
+            decision_times = []
+            if recorder is not None:
+                recorder.close()
+                print(f"Saved {recorder.path}")
+            if episodes and episode >= episodes:
+                break
+            obs, _ = env.reset()
+            done = False
+            if recorder is not None:
+                recorder = EpisodeRecorder(args.record.format(episode=episode), fps=recorder.fps, scale=args.scale)
+                recorder.add_env(env)
+finally:
+    # the last, partial shard is written even when the window is closed with Ctrl+C
+    if dataset is not None:
+        dataset.close()
+        print(f"Saved {dataset.shards_written} shard(s) to {args.dataset}")
+env.close()